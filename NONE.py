@@ -1,426 +1,531 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import networkx as nx
 import numpy as np
+import contextlib
 import csv
+import itertools
 import os
-from tkinter import Tk, filedialog
 
-def read_project_data(csv_file_path):
+import cpm
+import instrument
+import longest_paths
+import parallel_cpm
+import project_model
+import validation
+import work_calendar
+import workload
+
+# Колонки файла проекта в порядке следования
+PROJECT_COLUMNS = ['Работа', 'Последователи', 'Предшественники', 'Продолжительность', 'Рабочая сила']
+
+# Количество записей CSV, разбираемых за один шаг потокового чтения
+DEFAULT_CHUNK_SIZE = 100_000
+
+def _parse_float(value):
+    """
+    Преобразование строки в число по правилам float(); None при ошибке
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def _coerce_numeric(values, column, line_numbers, log):
+    """
+    Векторное преобразование числовой колонки блока.
+    Пропуски ('-') сохраняются, некорректные значения заменяются на NaN
+    и записываются в журнал log.
+    """
+    present = (values != '-').to_numpy()
+    numeric = pd.to_numeric(values.where(present), errors='coerce').to_numpy(dtype=float)
+    
+    # to_numeric строже float() (например, 'nan' или '1_000'), поэтому
+    # подозрительные ячейки перепроверяем поштучно — их обычно единицы
+    suspect = np.flatnonzero(present & np.isnan(numeric))
+    bad = []
+    for pos in suspect.tolist():
+        parsed = _parse_float(values.iat[pos])
+        if parsed is None:
+            bad.append(pos)
+        else:
+            numeric[pos] = parsed
+    if bad:
+        log.add_rows('bad_number', line_numbers[bad], column, values.to_numpy()[bad])
+    
+    result = pd.Series(numeric, index=values.index, dtype=object)
+    result[~present] = '-'
+    return result
+
+def _parse_chunk(rows, first_line, log, extra_columns=()):
     """
-    Чтение данных проекта из CSV файла с детальной обработкой ошибок
+    Разбор блока записей CSV: маски длины строк, очистка ячеек и
+    векторное преобразование числовых колонок. Ошибки записываются в log.
     """
-    data = []
-    line_errors = []
+    lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    line_numbers = np.arange(first_line, first_line + len(rows))
+    
+    # Пустые строки пропускаем, короткие строки — ошибка
+    short = (lengths > 0) & (lengths < 5)
+    log.add_rows('short_row', line_numbers[short], values=lengths[short])
+    
+    valid = lengths >= 5
+    if not valid.any():
+        return None
+    
+    columns = PROJECT_COLUMNS + list(extra_columns)
+    chunk = pd.DataFrame(list(itertools.compress(rows, valid))).reindex(columns=range(len(columns)))
+    chunk.columns = columns
+    line_numbers = line_numbers[valid]
     
+    # Обработка ячеек - все пустые ячейки заменяем на '-'
+    for col in columns:
+        cleaned = chunk[col].fillna('').astype(str).str.strip()
+        chunk[col] = cleaned.mask(cleaned == '', '-').astype(object)
+    
+    # Замена символов для единообразия
+    chunk['Последователи'] = chunk['Последователи'].str.replace(';', ',', regex=False)
+    chunk['Предшественники'] = chunk['Предшественники'].str.replace(';', ',', regex=False)
+    
+    for col in ['Продолжительность', 'Рабочая сила'] + list(extra_columns):
+        chunk[col] = _coerce_numeric(chunk[col], col, line_numbers, log)
+    
+    chunk['ИсходнаяСтрока'] = line_numbers  # Сохраняем номер строки для отслеживания ошибок
+    return chunk
+
+def _rows_before_error(rows, first_line, issue, log, extra_columns=()):
+    """
+    Строки блока до первой по номеру строки ошибки для fail_fast. Проверки
+    блока идут по видам ошибок, поэтому первая найденная ошибка может быть
+    не самой ранней: префикс до нее разбирается повторно, пока в нем есть
+    ошибки. Возвращает разобранный префикс; журнал log очищается и содержит
+    только самую раннюю ошибку.
+    """
+    while True:
+        end = len(rows) if issue.line is None else issue.line - first_line
+        probe = validation.IssueLog(validation.Limits(default=None))
+        chunk = _parse_chunk(rows[:end], first_line, probe, extra_columns)
+        if not probe.issues:
+            break
+        issue = min(probe.issues, key=lambda found: found.line)
+    
+    log.clear()
+    with contextlib.suppress(validation.FailFast):
+        log.add(issue)
+    return chunk
+
+def _read_chunks(csv_file_path, chunk_size, extra_columns, log):
+    """
+    Генератор разобранных блоков файла по chunk_size записей (None для
+    блока без корректных строк); ошибки записываются в log по мере чтения.
+    При fail_fast последним выдается префикс блока до первой ошибки.
+    """
     with open(csv_file_path, 'r', encoding='utf-8') as file:
         reader = csv.reader(file)
-        for line_num, row in enumerate(reader, 1):
-            if len(row) == 0:  # Пропускаем пустые строки
-                continue
-                
-            if len(row) < 5:  # Минимум 5 колонок
-                line_errors.append(f"Строка {line_num}: Недостаточно колонок (ожидается 5, получено {len(row)})")
-                continue
-            
-            # Обработка строки - все пустые ячейки заменяем на '-'
-            work = row[0].strip() if len(row) > 0 and row[0].strip() != '' else '-'
-            followers = row[1].strip() if len(row) > 1 and row[1].strip() != '' else '-'
-            predecessors = row[2].strip() if len(row) > 2 and row[2].strip() != '' else '-'
-            duration = row[3].strip() if len(row) > 3 and row[3].strip() != '' else '-'
-            workforce = row[4].strip() if len(row) > 4 and row[4].strip() != '' else '-'
+        first_line = 1
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                break
             
-            # Замена символов для единообразия
-            followers = followers.replace(';', ',')
-            predecessors = predecessors.replace(';', ',')
-            
-            data.append({
-                'Работа': work,
-                'Последователи': followers,
-                'Предшественники': predecessors,
-                'Продолжительность': duration,
-                'Рабочая сила': workforce,
-                'ИсходнаяСтрока': line_num  # Сохраняем номер строки для отслеживания ошибок
-            })
-    
-    df = pd.DataFrame(data)
-    
-    # Преобразование числовых колонок с детальной обработкой ошибок
-    numeric_errors = []
-    
-    for idx, row in df.iterrows():
-        line_num = row['ИсходнаяСтрока']
-        
-        # Проверка продолжительности
-        duration_str = str(row['Продолжительность'])
-        if duration_str != '-':
             try:
-                duration_val = float(duration_str)
-                df.at[idx, 'Продолжительность'] = duration_val
-            except ValueError:
-                numeric_errors.append(f"Строка {line_num}, колонка 'Продолжительность': Некорректное числовое значение '{duration_str}'")
-                df.at[idx, 'Продолжительность'] = np.nan
-        
-        # Проверка рабочей силы
-        workforce_str = str(row['Рабочая сила'])
-        if workforce_str != '-':
-            try:
-                workforce_val = float(workforce_str)
-                df.at[idx, 'Рабочая сила'] = workforce_val
-            except ValueError:
-                numeric_errors.append(f"Строка {line_num}, колонка 'Рабочая сила': Некорректное числовое значение '{workforce_str}'")
-                df.at[idx, 'Рабочая сила'] = np.nan
+                chunk = _parse_chunk(rows, first_line, log, extra_columns)
+            except validation.FailFast as stop:
+                yield _rows_before_error(rows, first_line, stop.issue, log, extra_columns)
+                break
+            first_line += len(rows)
+            yield chunk
+
+def _concat_chunks(chunks):
+    """
+    Итоговый DataFrame из разобранных блоков
+    """
+    chunks = [chunk for chunk in chunks if chunk is not None]
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+def read_project_data(csv_file_path, chunk_size=DEFAULT_CHUNK_SIZE, extra_columns=(), limits=None):
+    """
+    Чтение данных проекта из CSV файла с детальной обработкой ошибок.
+    Файл разбирается блоками по chunk_size записей, поэтому память
+    ограничена размером блока и компактным итоговым DataFrame.
+    extra_columns — имена необязательных числовых колонок после пятой
+    (отсутствующие значения заменяются на '-').
+    Ошибки — записи validation.Issue; limits (validation.Limits) ограничивает
+    число записей каждого вида, а при fail_fast чтение останавливается на
+    первой по номеру строке с ошибкой: df содержит все строки до нее, а
+    ошибка — единственная запись.
+    """
+    log = validation.IssueLog(limits)
+    df = _concat_chunks(_read_chunks(csv_file_path, chunk_size, extra_columns, log))
     
-    return df, line_errors + numeric_errors
+    # Короткие строки перед ошибками значений, далее в порядке строк (внутри строки — в порядке колонок)
+    log.sort(key=lambda issue: (issue.code != 'short_row', issue.line))
+    errors = log.records()
+    
+    recorder = instrument.current()
+    recorder.count('tasks', len(df))
+    recorder.count('errors', validation.count(errors))
+    return df, errors
 
-def validate_csv_data(df):
+def iter_issues(csv_file_path, chunk_size=DEFAULT_CHUNK_SIZE, extra_columns=(), limits=None):
     """
-    Валидация входных данных из CSV файла с детальным выводом ошибок
+    Потоковая проверка проекта: записи validation.Issue выдаются по мере
+    обнаружения — после разбора каждого блока файла (в порядке проверок
+    блока), затем сводные записи чтения, ошибки validate_csv_data и ошибки
+    и предупреждения compile_dependencies. Этапы и остановка после этапа
+    с ошибками те же, что в load_project.
     """
-    errors = []
+    log = validation.IssueLog(limits)
+    chunks = []
+    for chunk in _read_chunks(csv_file_path, chunk_size, extra_columns, log):
+        chunks.append(chunk)
+        yield from log.drain()
+    yield from log.drain()
+    yield from log.summary()
+    if log.has_errors() and log.fail_fast:
+        return
     
+    df = _concat_chunks(chunks)
+    model = project_model.compile_model(df)
+    is_valid, errors = validate_csv_data(df, model, limits)
+    yield from errors
+    if not is_valid:
+        return
+    _, dep_errors, warnings, _ = compile_dependencies(df, model=model, limits=limits)
+    yield from dep_errors
+    yield from warnings
+
+def _numeric_column_errors(df, column, line_numbers, is_invalid, code, log):
+    """
+    Векторная проверка числовой колонки: отсутствующие значения, нечисловые
+    типы и значения, для которых is_invalid истинно. Записи создаются
+    только для отмеченных строк в пределах журнала log.
+    """
+    values = df[column]
+    missing = values.isna().to_numpy()
+    objects = values.to_numpy(dtype=object)
+    if values.dtype.kind in 'fiu':
+        is_number = ~missing
+    else:
+        is_number = np.fromiter((isinstance(value, (int, float)) for value in objects),
+                                dtype=bool, count=len(values)) & ~missing
+    numbers = pd.to_numeric(values.where(is_number), errors='coerce').to_numpy(dtype=float)
+    invalid = is_number & is_invalid(np.nan_to_num(numbers))
+    
+    log.add_rows('missing_number', line_numbers[missing], column)
+    wrong_type = ~missing & ~is_number
+    log.add_rows('bad_type', line_numbers[wrong_type], column, objects[wrong_type],
+                 describe=lambda value: type(value).__name__)
+    log.add_rows(code, line_numbers[invalid], column, objects[invalid])
+
+# Порядок колонок при выводе ошибок внутри строки
+_COLUMN_ORDER = {'Работа': 0, 'Продолжительность': 1, 'Рабочая сила': 2, 'Последователи': 3, 'Предшественники': 4}
+
+def validate_csv_data(df, model=None, limits=None):
+    """
+    Валидация входных данных из CSV файла с детальным выводом ошибок.
+    Проверки выполняются над массивами скомпилированной модели проекта
+    (project_model.compile_model); model можно передать готовой, чтобы
+    validate_dependencies использовала тот же разбор.
+    Ошибки — записи validation.Issue в пределах limits (validation.Limits).
+    """
+    log = validation.IssueLog(limits)
+    try:
+        _check_csv_data(df, model, log)
+    except validation.FailFast:
+        pass
+    
+    errors = log.records()
+    instrument.current().count('errors', validation.count(errors))
+    return not log.has_errors(), errors
+
+def _check_csv_data(df, model, log):
+    """
+    Проверки validate_csv_data с записью ошибок в журнал log
+    """
     # Проверка наличия обязательных колонок
-    required_columns = ['Работа', 'Последователи', 'Предшественники', 'Продолжительность', 'Рабочая сила']
-    for col in required_columns:
+    for col in PROJECT_COLUMNS:
         if col not in df.columns:
-            errors.append(f"Отсутствует обязательная колонка: {col}")
+            log.add(validation.Issue(None, col, 'missing_column'))
     
-    if errors:
-        return False, errors
+    if log.has_errors():
+        return
     
-    # Проверка типов данных и значений
-    for idx, row in df.iterrows():
-        line_num = row['ИсходнаяСтрока']
-        work = row['Работа']
-        
-        # Проверка идентификатора работы
-        if work == '-':
-            errors.append(f"Строка {line_num}, колонка 'Работа': Идентификатор работы не может быть '-'")
-        
-        # Проверка продолжительности
-        if pd.isna(row['Продолжительность']):
-            errors.append(f"Строка {line_num}, колонка 'Продолжительность': Отсутствует числовое значение")
-        else:
-            duration = row['Продолжительность']
-            if not isinstance(duration, (int, float)):
-                errors.append(f"Строка {line_num}, колонка 'Продолжительность': Некорректный тип данных '{type(duration).__name__}'")
-            elif duration <= 0:
-                errors.append(f"Строка {line_num}, колонка 'Продолжительность': Продолжительность должна быть положительной (получено {duration})")
-        
-        # Проверка рабочей силы
-        if pd.isna(row['Рабочая сила']):
-            errors.append(f"Строка {line_num}, колонка 'Рабочая сила': Отсутствует числовое значение")
-        else:
-            workforce = row['Рабочая сила']
-            if not isinstance(workforce, (int, float)):
-                errors.append(f"Строка {line_num}, колонка 'Рабочая сила': Некорректный тип данных '{type(workforce).__name__}'")
-            elif workforce < 0:
-                errors.append(f"Строка {line_num}, колонка 'Рабочая сила': Рабочая сила не может быть отрицательной (получено {workforce})")
-        
-        # Проверка формата последователей
-        if pd.notna(row['Последователи']) and row['Последователи'] != '' and row['Последователи'] != '-':
-            followers = str(row['Последователи']).split(',')
-            for i, follower in enumerate(followers):
-                follower_clean = follower.strip()
-                if follower_clean and follower_clean != '-':
-                    if not follower_clean.replace(' ', '').isalnum():
-                        errors.append(f"Строка {line_num}, колонка 'Последователи': Некорректный формат идентификатора '{follower}' (позиция {i+1})")
-        
-        # Проверка формата предшественников
-        if pd.notna(row['Предшественники']) and row['Предшественники'] != '' and row['Предшественники'] != '-':
-            predecessors = str(row['Предшественники']).split(',')
-            for i, predecessor in enumerate(predecessors):
-                predecessor_clean = predecessor.strip()
-                if predecessor_clean and predecessor_clean != '-':
-                    if not predecessor_clean.replace(' ', '').isalnum():
-                        errors.append(f"Строка {line_num}, колонка 'Предшественники': Некорректный формат идентификатора '{predecessor}' (позиция {i+1})")
+    if model is None:
+        model = project_model.compile_model(df)
+    lines = model.lines
+    
+    # Проверка идентификатора работы
+    log.add_rows('empty_work', lines[(df['Работа'] == '-').to_numpy()], 'Работа')
+    
+    # Проверка продолжительности и рабочей силы
+    _numeric_column_errors(df, 'Продолжительность', lines, lambda values: values <= 0,
+                           'non_positive_duration', log)
+    _numeric_column_errors(df, 'Рабочая сила', lines, lambda values: values < 0,
+                           'negative_workforce', log)
+    
+    # Проверка формата последователей и предшественников по таблице ссылок
+    # Если склеенные идентификаторы состоят из букв и цифр, поштучная проверка не нужна
+    names = model.ref_name
+    if not ''.join(names).replace(' ', '').isalnum():
+        malformed = np.flatnonzero([not name.replace(' ', '').isalnum() for name in names])
+        slots = np.where(model.ref_kind[malformed] == project_model.FOLLOWERS, 3, 4)
+        refs = malformed[np.lexsort((slots, model.ref_row[malformed]))].tolist()
+        room = log.room('bad_identifier')
+        shown = refs if room is None else refs[:room]
+        for ref in shown:
+            log.add(validation.Issue(int(lines[model.ref_row[ref]]), project_model.REFERENCE_COLUMNS[int(model.ref_kind[ref])],
+                                     'bad_identifier', model.ref_token[ref], int(model.ref_position[ref])))
+        log.skip('bad_identifier', len(refs) - len(shown))
+    
+    # Ошибки в порядке строк, внутри строки — работа, продолжительность,
+    # рабочая сила, последователи, предшественники; сортировка устойчива,
+    # поэтому позиции внутри колонки сохраняют порядок
+    log.sort(key=lambda issue: (issue.line, _COLUMN_ORDER[issue.column]))
     
     # Проверка уникальности идентификаторов работ
-    duplicate_works = df[df['Работа'].duplicated()]['Работа'].unique()
-    for work in duplicate_works:
-        duplicate_lines = df[df['Работа'] == work]['ИсходнаяСтрока'].tolist()
-        errors.append(f"Дублирование идентификатора работы '{work}' в строках: {', '.join(map(str, duplicate_lines))}")
-    
-    return len(errors) == 0, errors
+    repeated = pd.Series(model.row_node).duplicated().to_numpy()
+    if repeated.any():
+        duplicate_nodes = pd.unique(model.row_node[repeated])
+        rows = np.flatnonzero(np.isin(model.row_node, duplicate_nodes))
+        nodes = duplicate_nodes.tolist()
+        room = log.room('duplicate_work')
+        shown = nodes if room is None else nodes[:room]
+        for node in shown:
+            duplicate_lines = model.lines[rows[model.row_node[rows] == node]].tolist()
+            log.add(validation.Issue(duplicate_lines[0], 'Работа', 'duplicate_work', model.works[node], duplicate_lines))
+        log.skip('duplicate_work', len(nodes) - len(shown))
 
-def validate_dependencies(df):
+# Максимальное число циклов, выводимых при валидации зависимостей
+DEFAULT_MAX_CYCLES = 20
+
+# Число самых длинных путей (цепочек работ), выводимых в отчете
+DEFAULT_PRINTED_PATHS = 5
+
+def find_cycle_witnesses(graph, max_cycles=DEFAULT_MAX_CYCLES):
     """
-    Проверка связанности и корректности зависимостей с детальным выводом ошибок
+    Поиск циклов через сильно связные компоненты графа cpm.ProjectGraph.
+    Возвращает не более max_cycles циклов-свидетелей (по одному на компоненту,
+    индексы работ) и общее число циклических компонент.
     """
-    errors = []
-    warnings = []
-    
-    # Создаем граф зависимостей
-    G = nx.DiGraph()
-    
-    # Добавляем узлы (работы)
-    for work in df['Работа']:
-        G.add_node(work)
+    # Детерминированный порядок: по первому появлению работы в графе
+    cyclic_components = project_model.cyclic_components(graph)
     
-    # Добавляем рёбра (зависимости) с отслеживанием строк
-    edge_sources = {}  # Для отслеживания, откуда взялась зависимость
+    cycles = []
+    for component in cyclic_components[:max_cycles]:
+        cycles.append(project_model.shortest_cycle_through(graph, min(component), component))
     
-    for idx, row in df.iterrows():
-        line_num = row['ИсходнаяСтрока']
-        work = row['Работа']
-        
-        # Обрабатываем предшественников
-        if pd.notna(row['Предшественники']) and row['Предшественники'] != '' and row['Предшественники'] != '-':
-            predecessors = str(row['Предшественники']).split(',')
-            for pred in predecessors:
-                pred_clean = pred.strip()
-                if pred_clean and pred_clean != '-':
-                    if pred_clean not in G.nodes:
-                        errors.append(f"Строка {line_num}: Предшественник '{pred_clean}' для работы '{work}' не существует")
-                    else:
-                        G.add_edge(pred_clean, work)
-                        edge_sources[(pred_clean, work)] = f"строка {line_num}"
-        
-        # Обрабатываем последователей
-        if pd.notna(row['Последователи']) and row['Последователи'] != '' and row['Последователи'] != '-':
-            followers = str(row['Последователи']).split(',')
-            for follower in followers:
-                follower_clean = follower.strip()
-                if follower_clean and follower_clean != '-':
-                    if follower_clean not in G.nodes:
-                        errors.append(f"Строка {line_num}: Последователь '{follower_clean}' для работы '{work}' не существует")
-                    else:
-                        G.add_edge(work, follower_clean)
-                        edge_sources[(work, follower_clean)] = f"строка {line_num}"
-    
-    # Проверка на циклы
+    return cycles, len(cyclic_components)
+
+def validate_dependencies(df, max_cycles=DEFAULT_MAX_CYCLES, model=None, limits=None):
+    """
+    Проверка связанности и корректности зависимостей с детальным выводом ошибок.
+    Возвращает (is_valid, errors, warnings, G), где G — граф networkx.DiGraph
+    (работы и рёбра в порядке появления в файле). Проверки выполняет
+    compile_dependencies, которая возвращает граф cpm.ProjectGraph без networkx.
+    """
+    if model is None:
+        model = project_model.compile_model(df)
+    is_valid, errors, warnings, graph = compile_dependencies(df, max_cycles, model, limits)
+    G = project_model.networkx_graph(model) if graph is not None else None
+    return is_valid, errors, warnings, G
+
+def compile_dependencies(df, max_cycles=DEFAULT_MAX_CYCLES, model=None, limits=None):
+    """
+    Проверки validate_dependencies над таблицей ссылок модели проекта.
+    Граф возвращается как cpm.ProjectGraph. Начальные и конечные работы
+    передаются сообщениями активного регистратора (instrument.current()),
+    а не печатаются. Ошибки и предупреждения — записи validation.Issue в
+    пределах limits; если fail_fast остановил проверку до построения
+    графа, граф равен None.
+    """
+    recorder = instrument.current()
+    log = validation.IssueLog(limits)
+    state = {'graph': None, 'cycles': 0}
     try:
-        cycles = list(nx.simple_cycles(G))
-        for cycle in cycles:
-            cycle_info = []
-            for i in range(len(cycle)):
-                from_node = cycle[i]
-                to_node = cycle[(i + 1) % len(cycle)]
-                source = edge_sources.get((from_node, to_node), "неизвестный источник")
-                cycle_info.append(f"{from_node}->{to_node} ({source})")
-            errors.append(f"Обнаружена циклическая зависимость: {' -> '.join(cycle)}. Зависимости: {', '.join(cycle_info)}")
-    except Exception as e:
-        errors.append(f"Ошибка при проверке циклов: {e}")
+        _check_dependencies(df, max_cycles, model, log, state)
+    except validation.FailFast:
+        pass
+    
+    errors = log.records()
+    warnings = log.records(warnings=True)
+    if state['graph'] is not None:
+        recorder.count('edges', len(state['graph'].succ_idx))
+    recorder.count('cycles', state['cycles'])
+    recorder.count('errors', validation.count(errors))
+    recorder.count('warnings', len(warnings))
+    return not log.has_errors(), errors, warnings, state['graph']
+
+def _check_dependencies(df, max_cycles, model, log, state):
+    """
+    Проверки compile_dependencies с записью ошибок в журнал log;
+    граф и число циклических компонент сохраняются в state
+    """
+    recorder = instrument.current()
+    if model is None:
+        model = project_model.compile_model(df)
+    works = model.works
+    
+    # Ссылки на несуществующие работы (в порядке строк, предшественники перед последователями)
+    unknown = np.flatnonzero(model.ref_node < 0)
+    room = log.room('unknown_reference')
+    for ref in (unknown if room is None else unknown[:room]).tolist():
+        row = int(model.ref_row[ref])
+        log.add(validation.Issue(int(model.lines[row]), project_model.REFERENCE_COLUMNS[int(model.ref_kind[ref])],
+                                 'unknown_reference', model.ref_name[ref], works[model.row_node[row]]))
+    log.skip('unknown_reference', unknown.size if room is None else max(unknown.size - room, 0))
+    
+    # Граф зависимостей из существующих ссылок
+    graph = state['graph'] = project_model.build_graph(df, model)
+    edge_source = np.repeat(np.arange(len(works)), np.diff(graph.succ_ptr))
+    self_loops = edge_source[edge_source == graph.succ_idx].tolist()
+    
+    # Проверка на циклы: по одному кратчайшему циклу-свидетелю на каждую
+    # сильно связную компоненту (линейно, без перебора всех простых циклов)
+    cycles, cycles_total = find_cycle_witnesses(graph, max_cycles)
+    state['cycles'] = cycles_total
+    cycle_edges = [(cycle[i], cycle[(i + 1) % len(cycle)]) for cycle in cycles for i in range(len(cycle))]
+    edge_sources = project_model.edge_lines(model, cycle_edges + [(node, node) for node in self_loops])
+    
+    for cycle in cycles:
+        sources = [edge_sources.get((cycle[i], cycle[(i + 1) % len(cycle)])) for i in range(len(cycle))]
+        log.add(validation.Issue(None, None, 'cycle', [works[node] for node in cycle], sources))
+    if cycles_total > len(cycles):
+        log.add(validation.Issue(None, None, 'cycles_truncated', len(cycles), cycles_total))
     
     # Проверка на самозависимости
-    for node in G.nodes:
-        if G.has_edge(node, node):
-            source = edge_sources.get((node, node), "неизвестный источник")
-            errors.append(f"Работа '{node}' зависит от самой себя ({source})")
+    for node in self_loops:
+        log.add(validation.Issue(edge_sources.get((node, node)), None, 'self_loop', works[node]))
     
     # Проверка связности графа
-    if not nx.is_weakly_connected(G):
-        components = list(nx.weakly_connected_components(G))
-        component_info = []
-        for i, component in enumerate(components, 1):
-            component_info.append(f"Компонент {i}: {', '.join(sorted(component))}")
-        warnings.append(f"Граф не является слабосвязным. Обнаружено {len(components)} компонент связности:\n" + "\n".join(component_info))
+    labels = cpm.weak_components(graph)
+    roots = np.unique(labels)
+    if roots.size > 1:
+        members = np.argsort(labels, kind='stable')
+        bounds = np.searchsorted(labels[members], roots).tolist() + [len(works)]
+        components = [sorted(works[node] for node in members[bounds[i]:bounds[i + 1]].tolist())
+                      for i in range(roots.size)]
+        log.add(validation.Issue(None, None, 'disconnected', int(roots.size), components))
     
     # Проверка наличия начальных работ (без предшественников)
-    start_nodes = [node for node in G.nodes if G.in_degree(node) == 0]
+    start_nodes = [works[node] for node in np.flatnonzero(np.diff(graph.pred_ptr) == 0).tolist()]
     if not start_nodes:
-        errors.append("Не найдено начальных работ (без предшественников)")
+        log.add(validation.Issue(None, None, 'no_start'))
     else:
-        print(f"Начальные работы: {', '.join(sorted(start_nodes))}")
+        recorder.note(f"Начальные работы: {', '.join(sorted(start_nodes))}")
     
     # Проверка наличия конечных работ (без последователей)
-    end_nodes = [node for node in G.nodes if G.out_degree(node) == 0]
+    end_nodes = [works[node] for node in np.flatnonzero(np.diff(graph.succ_ptr) == 0).tolist()]
     if not end_nodes:
-        errors.append("Не найдено конечных работ (без последователей)")
+        log.add(validation.Issue(None, None, 'no_end'))
     else:
-        print(f"Конечные работы: {', '.join(sorted(end_nodes))}")
-    
-    return len(errors) == 0, errors, warnings, G
+        recorder.note(f"Конечные работы: {', '.join(sorted(end_nodes))}")
 
-def calculate_critical_path(df, G):
+def _work_column(df, column):
     """
-    Расчет критического пути
+    Отображение работа -> значение колонки (первое вхождение работы)
+    """
+    first = df.drop_duplicates('Работа')
+    return dict(zip(first['Работа'], first[column]))
+
+def calculate_critical_path(df, G, workers=1):
+    """
+    Расчет критического пути (обертка над массивным ядром cpm).
+    G — граф cpm.ProjectGraph из compile_dependencies (граф networkx из
+    validate_dependencies также принимается и компилируется по продолжительностям из df).
+    По умолчанию расчет идет в текущем процессе; с workers > 1 (или
+    workers=None — по числу ядер) крупные несвязные проекты считаются по
+    компонентам в нескольких процессах (parallel_cpm).
     """
-    # Расчет ранних сроков
-    early_start = {}
-    early_finish = {}
-    
-    # Топологическая сортировка
     try:
-        topological_order = list(nx.topological_sort(G))
-    except nx.NetworkXUnfeasible:
-        print("Ошибка: граф содержит циклы, невозможно рассчитать критический путь")
+        graph = cpm.as_project_graph(G, _work_column(df, 'Продолжительность'))
+        schedule = parallel_cpm.compute_schedule(graph, workers)
+    except cpm.CycleError:
+        instrument.current().note("Ошибка: граф содержит циклы, невозможно рассчитать критический путь")
         return None, None, None, None
     
-    # Инициализация начальных работ
-    for node in topological_order:
-        if G.in_degree(node) == 0:  # Начальная работа
-            early_start[node] = 0
-        else:
-            early_start[node] = 0
-    
-    # Расчет ранних сроков (прямой проход)
-    for node in topological_order:
-        duration = df[df['Работа'] == node]['Продолжительность'].values[0]
-        
-        # Максимальный ранний финиш среди предшественников
-        max_pred_finish = 0
-        for pred in G.predecessors(node):
-            if pred in early_finish and early_finish[pred] > max_pred_finish:
-                max_pred_finish = early_finish[pred]
-        
-        early_start[node] = max_pred_finish
-        early_finish[node] = early_start[node] + duration
-    
-    # Расчет поздних сроков
-    late_start = {}
-    late_finish = {}
-    project_duration = max(early_finish.values())
-    
-    # Инициализация конечных работ
-    for node in reversed(topological_order):
-        if G.out_degree(node) == 0:  # Конечная работа
-            late_finish[node] = project_duration
-            late_start[node] = late_finish[node] - df[df['Работа'] == node]['Продолжительность'].values[0]
-        else:
-            late_finish[node] = project_duration
-            late_start[node] = project_duration
-    
-    # Расчет поздних сроков (обратный проход)
-    for node in reversed(topological_order):
-        duration = df[df['Работа'] == node]['Продолжительность'].values[0]
-        
-        # Минимальный поздний старт среди последователей
-        min_succ_start = project_duration
-        for succ in G.successors(node):
-            if succ in late_start and late_start[succ] < min_succ_start:
-                min_succ_start = late_start[succ]
-        
-        late_finish[node] = min_succ_start
-        late_start[node] = late_finish[node] - duration
-    
-    # Расчет резервов и определение критического пути
-    critical_path = []
-    total_slack = {}
+    works = graph.works
+    early_start = dict(zip(works, schedule.early_start.tolist()))
+    early_finish = dict(zip(works, schedule.early_finish.tolist()))
+    total_slack = dict(zip(works, schedule.total_slack.tolist()))
     
-    for node in topological_order:
-        slack = late_start[node] - early_start[node]
-        total_slack[node] = slack
-        if abs(slack) < 1e-9:  # Учет погрешности вычислений
-            critical_path.append(node)
+    # Критические работы в топологическом порядке
+    is_critical = cpm.critical_mask(schedule)
+    critical_path = [works[node] for node in schedule.order.tolist() if is_critical[node]]
     
     return early_start, early_finish, critical_path, total_slack
 
-def create_gantt_chart(df, early_start, early_finish, critical_path):
+def create_gantt_chart(df, early_start, early_finish, critical_path, profile=None, output_path=None, graph=None,
+                       start_date=None):
     """
-    Создание улучшенной диаграммы Ганта с графиком рабочей силы
+    Создание улучшенной диаграммы Ганта с графиком рабочей силы (gantt.py).
+    Если задан output_path, рисунок сохраняется в файл (PNG/SVG/PDF по
+    расширению) без дисплея, иначе показывается окно plt.show().
+    graph — граф из compile_dependencies для стрелок зависимостей; без
+    него граф строится по df. start_date — дата начала проекта, если сроки
+    заданы в календарных днях (work_calendar): по оси времени откладываются даты.
     """
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12))
-    
-    # Цвета
-    critical_color = '#ff6b6b'  # Красный для критического пути
-    normal_color = '#4ecdc4'    # Бирюзовый для обычных работ
-    workforce_color = '#45b7d1' # Синий для рабочей силы
-    
-    # Сортировка работ для красивого отображения
-    sorted_works = sorted(df['Работа'].unique())
-    y_positions = range(len(sorted_works))
-    
-    # Диаграмма Ганта
-    for i, work in enumerate(sorted_works):
-        start = early_start[work]
-        finish = early_finish[work]
-        duration = finish - start
-        
-        # Выбор цвета в зависимости от критичности
-        color = critical_color if work in critical_path else normal_color
-        
-        # Прямоугольник для работы
-        rect = patches.Rectangle((start, i-0.3), duration, 0.6, 
-                               linewidth=2, edgecolor='darkgray', 
-                               facecolor=color, alpha=0.8)
-        ax1.add_patch(rect)
-        
-        # Подпись работы и длительности
-        ax1.text(start + duration/2, i, f'{work}\n({int(duration)})', 
-                ha='center', va='center', fontweight='bold', fontsize=9)
-        
-        # Стрелки зависимостей (только для критического пути)
-        if work in critical_path:
-            predecessors_str = df[df['Работа'] == work]['Предшественники'].values[0]
-            if pd.notna(predecessors_str) and predecessors_str != '' and predecessors_str != '-':
-                predecessors = str(predecessors_str).split(',')
-                for pred_clean in predecessors:
-                    pred_clean = pred_clean.strip()
-                    if pred_clean and pred_clean in critical_path and pred_clean in early_finish:
-                        # Рисуем стрелку от предшественника к текущей работе
-                        ax1.annotate('', xy=(start, i), 
-                                   xytext=(early_finish[pred_clean], sorted_works.index(pred_clean)),
-                                   arrowprops=dict(arrowstyle='->', color='red', lw=2, alpha=0.7))
-    
-    ax1.set_xlabel('Время (дни)', fontsize=12)
-    ax1.set_ylabel('Работы', fontsize=12)
-    ax1.set_title('Диаграмма Ганта с критическим путем', fontsize=14, fontweight='bold')
-    ax1.set_yticks(y_positions)
-    ax1.set_yticklabels(sorted_works)
-    ax1.grid(True, alpha=0.3)
-    ax1.set_xlim(0, max(early_finish.values()) + 2)
-    
-    # Легенда
-    critical_patch = patches.Patch(color=critical_color, label='Критический путь')
-    normal_patch = patches.Patch(color=normal_color, label='Обычные работы')
-    ax1.legend(handles=[critical_patch, normal_patch], loc='upper right')
-    
-    # График загрузки рабочей силы
-    project_duration = int(max(early_finish.values()))
-    workforce_over_time = [0] * (project_duration + 2)  # +2 для запаса
-    
-    for work in sorted_works:
-        start = int(early_start[work])
-        finish = int(early_finish[work])
-        workforce = df[df['Работа'] == work]['Рабочая сила'].values[0]
-        
-        for day in range(start, finish):
-            if day < len(workforce_over_time):
-                workforce_over_time[day] += workforce
-    
-    # Создание графика рабочей силы
-    days = range(project_duration + 1)
-    workforce_values = workforce_over_time[:project_duration + 1]
-    
-    ax2.bar(days, workforce_values, color=workforce_color, alpha=0.7, edgecolor='darkblue', linewidth=0.5)
-    ax2.plot(days, workforce_values, color='darkblue', linewidth=2, marker='o', markersize=4)
-    
-    ax2.set_xlabel('Время (дни)', fontsize=12)
-    ax2.set_ylabel('Рабочая сила', fontsize=12)
-    ax2.set_title('Загрузка рабочей силы по времени', fontsize=14, fontweight='bold')
-    ax2.grid(True, alpha=0.3)
-    ax2.set_xticks(range(0, project_duration + 1, max(1, project_duration // 10)))
-    ax2.set_xlim(0, project_duration)
-    
-    plt.tight_layout()
-    plt.show()
-    
-    return fig
+    import gantt  # matplotlib загружается только при построении диаграммы
+    
+    if profile is None:
+        profile = build_workforce_profile(df, early_start, early_finish)
+    if graph is None:
+        graph = project_model.build_graph(df, project_model.compile_model(df))
+    return gantt.create_gantt_chart(df, early_start, early_finish, critical_path, profile, graph, output_path,
+                                    start_date)
 
-def calculate_workforce_stats(df, early_start, early_finish, total_duration):
+def build_workforce_profile(df, early_start, early_finish):
     """
-    Расчет статистики по рабочей силе
+    Профиль загрузки рабочей силы по ранним срокам работ
     """
-    max_workforce = 0
-    for day in range(int(total_duration) + 1):
-        daily_workforce = 0
-        for work in df['Работа']:
-            start = early_start[work]
-            finish = early_finish[work]
-            if start <= day < finish:
-                workforce = df[df['Работа'] == work]['Рабочая сила'].values[0]
-                daily_workforce += workforce
-        if daily_workforce > max_workforce:
-            max_workforce = daily_workforce
-    
-    return max_workforce
+    works = df.drop_duplicates('Работа')
+    starts = works['Работа'].map(early_start).to_numpy(dtype=float)
+    finishes = works['Работа'].map(early_finish).to_numpy(dtype=float)
+    return workload.build_profile(starts, finishes, works['Рабочая сила'].to_numpy(dtype=float))
+
+def calculate_workforce_stats(df, early_start, early_finish, total_duration, profile=None):
+    """
+    Расчет статистики по рабочей силе (максимальная одновременная загрузка)
+    """
+    if profile is None:
+        profile = build_workforce_profile(df, early_start, early_finish)
+    return profile.peak
+
+def load_project(csv_file_path, extra_columns=(), limits=None):
+    """
+    Чтение и полная валидация проекта без вывода на экран.
+    Возвращает (df, G, errors, warnings), где G — граф cpm.ProjectGraph;
+    при ошибках G равен None. limits (validation.Limits) ограничивает
+    число записей об ошибках; при fail_fast проект отклоняется после
+    первого этапа с ошибкой.
+    """
+    df, read_errors = read_project_data(csv_file_path, extra_columns=extra_columns, limits=limits)
+    if read_errors and limits is not None and limits.fail_fast:
+        return df, None, read_errors, []
+    model = project_model.compile_model(df)
+    is_valid, errors = validate_csv_data(df, model, limits)
+    errors = read_errors + errors
+    if not is_valid:
+        return df, None, errors, []
+    
+    is_deps_valid, dep_errors, warnings, G = compile_dependencies(df, model=model, limits=limits)
+    if not is_deps_valid:
+        return df, None, errors + dep_errors, warnings
+    return df, G, errors, warnings
+
+def compile_project(df, G):
+    """
+    Массивное представление проверенного проекта: граф cpm и рабочая сила работ
+    """
+    first = df.drop_duplicates('Работа').set_index('Работа')
+    graph = cpm.as_project_graph(G, first['Продолжительность'].astype(float))
+    workforce = first['Рабочая сила'].astype(float).reindex(graph.works).to_numpy()
+    return graph, workforce
 
 def select_csv_file():
     """
     Диалоговое окно для выбора CSV файла
     """
+    from tkinter import Tk, filedialog  # Tk нужен только интерактивному запуску
+    
     root = Tk()
     root.withdraw()
     file_path = filedialog.askopenfilename(
@@ -430,32 +535,20 @@ def select_csv_file():
     root.destroy()
     return file_path
 
-def main():
+def analyze_project(csv_file_path, recorder, calendars=None, workers=1):
     """
-    Основная функция для демонстрации работы
+    Этапы 2-8 анализа выбранного файла с замером через recorder.
+    С календарями calendars (work_calendar.WorkCalendars) расписание,
+    диаграмма и загрузка строятся в датах. workers передается в
+    calculate_critical_path.
     """
-    print("=" * 70)
-    print("АНАЛИЗ ПРОЕКТНЫХ ДАННЫХ ИЗ CSV ФАЙЛА")
-    print("=" * 70)
-    
-    # Выбор файла через диалоговое окно
-    print("\n1. ВЫБОР ФАЙЛА:")
-    print("-" * 50)
-    
-    csv_file_path = select_csv_file()
-    
-    if not csv_file_path:
-        print("Файл не выбран. Программа завершена.")
-        return
-    
-    print(f"Выбран файл: {csv_file_path}")
-    
     # Чтение данных из CSV
     print(f"\n2. ЧТЕНИЕ ДАННЫХ ИЗ ФАЙЛА:")
     print("-" * 50)
     
     try:
-        df, read_errors = read_project_data(csv_file_path)
+        with recorder.stage('read'):
+            df, read_errors = read_project_data(csv_file_path)
         print(f"Прочитано {len(df)} работ")
         
         if read_errors:
@@ -470,7 +563,9 @@ def main():
     # Валидация CSV данных
     print("\n3. ВАЛИДАЦИЯ ДАННЫХ ИЗ CSV:")
     print("-" * 50)
-    is_valid, errors = validate_csv_data(df)
+    with recorder.stage('validate_csv'):
+        model = project_model.compile_model(df)
+        is_valid, errors = validate_csv_data(df, model)
     
     if is_valid and not read_errors:
         print("✓ Данные CSV прошли валидацию успешно")
@@ -487,7 +582,10 @@ def main():
     # Валидация зависимостей
     print("\n4. ВАЛИДАЦИЯ ЗАВИСИМОСТЕЙ:")
     print("-" * 50)
-    is_deps_valid, dep_errors, warnings, G = validate_dependencies(df)
+    with recorder.stage('validate_dependencies'):
+        is_deps_valid, dep_errors, warnings, G = compile_dependencies(df, model=model)
+    for message in recorder.take_messages():
+        print(message)
     
     if is_deps_valid:
         print("✓ Зависимости прошли валидацию успешно")
@@ -508,46 +606,142 @@ def main():
     # Расчет критического пути
     print("\n5. РАСЧЕТ КРИТИЧЕСКОГО ПУТИ:")
     print("-" * 50)
-    early_start, early_finish, critical_path, total_slack = calculate_critical_path(df, G)
+    with recorder.stage('critical_path'):
+        early_start, early_finish, critical_path, total_slack = calculate_critical_path(df, G, workers)
+    for message in recorder.take_messages():
+        print(message)
     
     if critical_path:
         print(f"Критический путь: {' → '.join(critical_path)}")
         critical_duration = sum(df[df['Работа'].isin(critical_path)]['Продолжительность'])
         print(f"Длина критического пути: {critical_duration} дней")
+        
+        # Цепочки работ: критические (резерв 0) и ближайшие к ним почти критические
+        print("Самые длинные пути (резерв пути, дней):")
+        for path in longest_paths.top_paths(cpm.as_project_graph(G, _work_column(df, 'Продолжительность')),
+                                            DEFAULT_PRINTED_PATHS):
+            print(f"  {path.slack:>6.1f}  {' → '.join(path.works)}")
     else:
         print("Не удалось рассчитать критический путь")
         return
     
+    durations = _work_column(df, 'Продолжительность')
+    
+    # Календарное расписание: сроки в календарных днях от даты начала проекта
+    dated = None
+    if calendars is not None:
+        graph = cpm.as_project_graph(G, durations)
+        with recorder.stage('calendar'):
+            dated = work_calendar.dated_schedule(graph, calendars)
+            early_start = dict(zip(graph.works, dated.early_start.tolist()))
+            early_finish = dict(zip(graph.works, dated.early_finish.tolist()))
+            total_slack = dict(zip(graph.works, dated.total_slack.tolist()))
+            start_dates = dict(zip(graph.works, calendars.to_dates(dated.early_start).astype(str)))
+            finish_dates = dict(zip(graph.works, calendars.to_dates(dated.early_finish, finish=True).astype(str)))
+        # С календарями бригад критические работы определяются по календарному резерву
+        is_dated_critical = np.abs(dated.total_slack) < cpm.CRITICAL_EPS
+        critical_path = [graph.works[node] for node in dated.order.tolist() if is_dated_critical[node]]
+        print(f"Календарь: начало {calendars.start}, окончание "
+              f"{calendars.to_dates(dated.project_duration, finish=True)}")
+    
     # Вывод расписания
     print("\n6. РАСПИСАНИЕ РАБОТ:")
     print("-" * 50)
-    print(f"{'Работа':<5} {'Начало':<8} {'Окончание':<10} {'Длит.':<6} {'Резерв':<8} {'Критич.':<8}")
+    if dated is None:
+        print(f"{'Работа':<5} {'Начало':<8} {'Окончание':<10} {'Длит.':<6} {'Резерв':<8} {'Критич.':<8}")
+    else:
+        print(f"{'Работа':<5} {'Начало':<11} {'Окончание':<11} {'Длит.':<6} {'Резерв':<8} {'Критич.':<8}")
     print("-" * 60)
+    critical_set = set(critical_path)
     for work in df['Работа']:
-        is_critical = "Да" if work in critical_path else "Нет"
+        is_critical = "Да" if work in critical_set else "Нет"
         slack = total_slack.get(work, 0)
-        print(f"{work:<5} {early_start[work]:<8.1f} {early_finish[work]:<10.1f} "
-              f"{df[df['Работа'] == work]['Продолжительность'].values[0]:<6.1f} "
-              f"{slack:<8.1f} {is_critical:<8}")
+        if dated is None:
+            print(f"{work:<5} {early_start[work]:<8.1f} {early_finish[work]:<10.1f} "
+                  f"{durations[work]:<6.1f} "
+                  f"{slack:<8.1f} {is_critical:<8}")
+        else:
+            print(f"{work:<5} {start_dates[work]:<11} {finish_dates[work]:<11} "
+                  f"{durations[work]:<6.1f} "
+                  f"{slack:<8.1f} {is_critical:<8}")
     
     # Создание диаграмм
     print("\n7. СОЗДАНИЕ ДИАГРАММ:")
     print("-" * 50)
-    fig = create_gantt_chart(df, early_start, early_finish, critical_path)
+    with recorder.stage('workforce'):
+        if dated is None:
+            profile = build_workforce_profile(df, early_start, early_finish)
+        else:
+            workforce = _work_column(df, 'Рабочая сила')
+            profile = work_calendar.build_profile(graph, dated, [workforce[work] for work in graph.works], calendars)
+    with recorder.stage('chart'):
+        fig = create_gantt_chart(df, early_start, early_finish, critical_path, profile, graph=G,
+                                 start_date=None if dated is None else calendars.start)
     
     # Дополнительная информация
     print("\n8. ДОПОЛНИТЕЛЬНАЯ ИНФОРМАЦИЯ:")
     print("-" * 50)
     total_duration = max(early_finish.values())
     total_workforce = df['Рабочая сила'].sum()
-    max_workforce = calculate_workforce_stats(df, early_start, early_finish, total_duration)
+    max_workforce = calculate_workforce_stats(df, early_start, early_finish, total_duration, profile)
     
     print(f"Общая продолжительность проекта: {total_duration:.1f} дней")
     print(f"Общая требуемая рабочая сила: {total_workforce:.1f} человеко-дней")
     print(f"Максимальная одновременная загрузка: {max_workforce:.1f} человек")
+    print(f"Средняя загрузка: {profile.mean:.1f} человек")
+    if dated is None:
+        peak_intervals = ', '.join(f"{begin:g}–{end:g}" for begin, end in profile.peak_intervals)
+        print(f"Интервалы пиковой загрузки (дни): {peak_intervals}")
+    else:
+        peak_intervals = ', '.join(f"{calendars.to_dates(begin)}–{calendars.to_dates(end, finish=True)}"
+                                   for begin, end in profile.peak_intervals)
+        print(f"Интервалы пиковой загрузки: {peak_intervals}")
     print(f"Количество критических работ: {len(critical_path)}")
     print(f"Количество обычных работ: {len(df) - len(critical_path)}")
 
+def main(report_path=None, trace_path=None, memory=False, calendar_path=None, workers=1):
+    """
+    Основная функция для демонстрации работы.
+    В конце выводится время этапов и счетчики; report_path и trace_path
+    сохраняют отчет (JSON) и трассу (chrome://tracing) в файлы,
+    memory=True добавляет пик памяти этапов (tracemalloc).
+    calendar_path — JSON файл рабочих календарей (work_calendar): сроки
+    выводятся в датах. workers — число процессов расчета критического пути.
+    """
+    print("=" * 70)
+    print("АНАЛИЗ ПРОЕКТНЫХ ДАННЫХ ИЗ CSV ФАЙЛА")
+    print("=" * 70)
+    
+    # Выбор файла через диалоговое окно
+    print("\n1. ВЫБОР ФАЙЛА:")
+    print("-" * 50)
+    
+    csv_file_path = select_csv_file()
+    
+    if not csv_file_path:
+        print("Файл не выбран. Программа завершена.")
+        return
+    
+    print(f"Выбран файл: {csv_file_path}")
+    calendars = work_calendar.WorkCalendars.from_file(calendar_path) if calendar_path else None
+    
+    recorder = instrument.Recorder(memory=memory)
+    with instrument.recording(recorder):
+        analyze_project(csv_file_path, recorder, calendars, workers)
+    
+    # Замеры этапов
+    print("\n9. ПРОИЗВОДИТЕЛЬНОСТЬ:")
+    print("-" * 50)
+    report = recorder.report()
+    print(instrument.format_report(report))
+    if report_path:
+        recorder.write_report(report_path)
+        print(f"Отчет сохранен: {report_path}")
+    if trace_path:
+        recorder.write_trace(trace_path)
+        print(f"Трасса сохранена: {trace_path}")
+
 # Запуск основной функции
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(os.environ.get('GANTT_REPORT'), os.environ.get('GANTT_TRACE'), bool(os.environ.get('GANTT_PROFILE_MEMORY')),
+         os.environ.get('GANTT_CALENDAR'), int(os.environ.get('GANTT_WORKERS') or 1))
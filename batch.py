@@ -0,0 +1,330 @@
+"""
+Пакетный (неинтерактивный) расчет расписаний для множества CSV файлов.
+
+Каждый файл проходит чтение -> validate_csv_data -> validate_dependencies ->
+calculate_critical_path в отдельном рабочем процессе; повторно
+обрабатываемые файлы берутся из дискового кэша проверенных проектов
+(cache.py). Зависший файл прерывается по тайм-ауту, процесс заменяется
+новым, остальная очередь продолжает обрабатываться.
+
+Пример:
+    python batch.py "projects/*.csv" --output results --format csv --timeout 60
+    python batch.py exports/ --max-errors 20 --fail-fast
+"""
+import argparse
+import contextlib
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+import NONE
+import cache
+import columnar
+import cpm
+import validation
+import workload
+
+SCHEDULE_FIELDS = ['Работа', 'Раннее начало', 'Раннее окончание', 'Позднее начало',
+                   'Позднее окончание', 'Продолжительность', 'Рабочая сила', 'Резерв', 'Критическая']
+
+# Колоночные форматы: расписание пишется из массивов модулем columnar
+COLUMNAR_FORMATS = tuple(sorted(columnar.EXTENSIONS))
+
+
+def expand_inputs(patterns):
+    """
+    Раскрытие путей, масок и каталогов в упорядоченный список CSV файлов
+    """
+    files = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, '*.csv')))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for path in matches:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                files.append(path)
+    return files
+
+
+def _output_names(files):
+    """
+    Уникальные имена выходных файлов по именам исходных файлов
+    """
+    names = []
+    used = {}
+    for path in files:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        count = used.get(stem, 0)
+        used[stem] = count + 1
+        names.append(stem if count == 0 else f"{stem}_{count}")
+    return names
+
+
+def schedule_project(csv_file_path, chart_path=None, use_cache=True, cache_dir=None, export_path=None,
+                     export_format='parquet', limits=None):
+    """
+    Полный расчет одного проекта без вывода на экран и без диалогов.
+    Если задан chart_path, диаграмма Ганта сохраняется в этот файл
+    (для диаграммы нужна таблица проекта, поэтому кэш не используется).
+    С export_path расписание и профиль рабочей силы записываются в
+    колоночные файлы (columnar.export_project) вместо записей result['schedule'].
+    limits (validation.Limits) ограничивает записи об ошибках валидации.
+    """
+    started = time.perf_counter()
+    result = {'file': csv_file_path, 'status': 'ok', 'errors': [], 'warnings': [],
+              'tasks': 0, 'project_duration': None, 'critical_path': [], 'schedule': []}
+
+    try:
+        if chart_path is None:
+            project = cache.load_compiled(csv_file_path, use_cache=use_cache, directory=cache_dir, limits=limits)
+            graph, workforce, errors, warnings = project.graph, project.workforce, project.errors, project.warnings
+            rows = project.rows
+        else:
+            df, G, errors, warnings = NONE.load_project(csv_file_path, limits=limits)
+            graph, workforce = NONE.compile_project(df, G) if G is not None else (None, None)
+            rows = len(df)
+        result['tasks'] = rows
+        result['errors'].extend(errors)
+        result['warnings'].extend(warnings)
+        if graph is None:
+            result['status'] = 'invalid'
+            return result
+
+        schedule = cpm.compute_schedule(graph)
+    except Exception as e:
+        result['status'] = 'error'
+        result['errors'].append(f"Критическая ошибка: {e}")
+        return result
+    finally:
+        result['elapsed'] = time.perf_counter() - started
+
+    works = graph.works
+    is_critical = cpm.critical_mask(schedule)
+    if export_path is None:
+        columns = zip(works, schedule.early_start.tolist(), schedule.early_finish.tolist(),
+                      schedule.late_start.tolist(), schedule.late_finish.tolist(), graph.durations.tolist(),
+                      workforce.tolist(), schedule.total_slack.tolist(), is_critical.tolist())
+        result['schedule'] = [dict(zip(SCHEDULE_FIELDS, row)) for row in columns]
+    else:
+        try:
+            profile = workload.build_profile(schedule.early_start, schedule.early_finish, workforce)
+            columnar.export_project(export_path, graph, schedule, workforce, profile, export_format)
+        except Exception as e:
+            result['status'] = 'error'
+            result['errors'].append(f"Не удалось записать расписание: {e}")
+    result['project_duration'] = schedule.project_duration
+    result['critical_path'] = [works[node] for node in schedule.order.tolist() if is_critical[node]]
+
+    if chart_path is not None:
+        try:
+            early_start = dict(zip(works, schedule.early_start.tolist()))
+            early_finish = dict(zip(works, schedule.early_finish.tolist()))
+            NONE.create_gantt_chart(df, early_start, early_finish, result['critical_path'],
+                                    output_path=chart_path, graph=graph)
+        except Exception as e:
+            result['warnings'].append(f"Не удалось построить диаграмму: {e}")
+    return result
+
+
+def write_result(result, output_dir, name, fmt):
+    """
+    Запись расписания и отчета об ошибках одного проекта
+    """
+    if fmt == 'json':
+        result = dict(result, errors=validation.messages(result['errors']),
+                      warnings=validation.messages(result['warnings']))
+        with open(os.path.join(output_dir, f"{name}.json"), 'w', encoding='utf-8') as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+        return
+    # В колоночных форматах расписание уже записано schedule_project
+
+    if result['schedule']:
+        with open(os.path.join(output_dir, f"{name}.schedule.csv"), 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=SCHEDULE_FIELDS)
+            writer.writeheader()
+            writer.writerows(result['schedule'])
+
+    if result['errors'] or result['warnings']:
+        with open(os.path.join(output_dir, f"{name}.errors.csv"), 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['Тип', 'Сообщение'])
+            writer.writerows(('Ошибка', message) for message in result['errors'])
+            writer.writerows(('Предупреждение', message) for message in result['warnings'])
+
+
+def _summarize(result):
+    """
+    Краткая запись о проекте для сводного отчета
+    """
+    record = {key: result.get(key) for key in ('file', 'status', 'tasks', 'project_duration', 'elapsed')}
+    record['errors'] = validation.count(result['errors'])
+    return record
+
+
+def _worker(conn, output_dir, fmt, chart_format, use_cache, cache_dir, limits):
+    """
+    Цикл рабочего процесса: получает (путь, имя), возвращает краткую запись
+    """
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        path, name = task
+        chart_path = os.path.join(output_dir, f"{name}.{chart_format}") if chart_format else None
+        export_path = os.path.join(output_dir, name) if fmt in COLUMNAR_FORMATS else None
+        result = schedule_project(path, chart_path, use_cache, cache_dir, export_path, fmt, limits)
+        write_result(result, output_dir, name, fmt)
+        conn.send(_summarize(result))
+
+
+class _Slot:
+    """
+    Рабочий процесс пула и текущее задание
+    """
+
+    def __init__(self, context, worker_args):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child_conn,) + worker_args, daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.task = None
+        self.started = None
+        self.deadline = None
+
+
+def run_batch(files, output_dir, fmt='json', workers=None, timeout=None, chart_format=None,
+              use_cache=True, cache_dir=None, limits=None):
+    """
+    Обработка списка файлов в пуле процессов с тайм-аутом на файл
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+    context = multiprocessing.get_context()
+    queue = deque(zip(files, _output_names(files)))
+    worker_args = (output_dir, fmt, chart_format, use_cache, cache_dir, limits)
+    slots = [_Slot(context, worker_args) for _ in range(workers)]
+    records = []
+    started = time.perf_counter()
+
+    def fail(slot, status, message):
+        path, name = slot.task
+        result = {'file': path, 'status': status, 'errors': [message], 'warnings': [],
+                  'tasks': 0, 'project_duration': None, 'critical_path': [], 'schedule': [],
+                  'elapsed': time.monotonic() - slot.started}
+        write_result(result, output_dir, name, fmt)
+        records.append(_summarize(result))
+
+    try:
+        while queue or any(slot.task for slot in slots):
+            for slot in slots:
+                if slot.task is None and queue:
+                    slot.task = queue.popleft()
+                    slot.started = time.monotonic()
+                    slot.deadline = slot.started + timeout if timeout else None
+                    slot.conn.send(slot.task)
+
+            busy = [slot for slot in slots if slot.task]
+            deadlines = [slot.deadline for slot in busy if slot.deadline is not None]
+            wait_time = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            ready = wait([slot.conn for slot in busy], timeout=wait_time)
+
+            for i, slot in enumerate(slots):
+                if not slot.task:
+                    continue
+                if slot.conn in ready:
+                    try:
+                        records.append(slot.conn.recv())
+                        slot.task = None
+                        continue
+                    except EOFError:
+                        fail(slot, 'error', "Рабочий процесс аварийно завершился")
+                elif slot.deadline is not None and time.monotonic() >= slot.deadline:
+                    fail(slot, 'timeout', f"Превышено время обработки ({timeout} с)")
+                else:
+                    continue
+                # Процесс завис или упал — заменяем его новым
+                slot.process.terminate()
+                slot.process.join()
+                slots[i] = _Slot(context, worker_args)
+    finally:
+        for slot in slots:
+            if slot.process.is_alive():
+                with contextlib.suppress(OSError):
+                    slot.conn.send(None)
+            slot.process.join(timeout=1)
+            if slot.process.is_alive():
+                slot.process.terminate()
+
+    elapsed = time.perf_counter() - started
+    statuses = [record['status'] for record in records]
+    summary = {
+        'files': len(records),
+        'ok': statuses.count('ok'),
+        'invalid': statuses.count('invalid'),
+        'error': statuses.count('error'),
+        'timeout': statuses.count('timeout'),
+        'tasks': sum(record['tasks'] or 0 for record in records),
+        'elapsed': elapsed,
+        'files_per_second': len(records) / elapsed if elapsed > 0 else 0.0,
+        'projects': sorted(records, key=lambda record: record['file']),
+    }
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as file:
+        json.dump(summary, file, ensure_ascii=False, indent=2)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный расчет критического пути для CSV файлов проектов")
+    parser.add_argument('inputs', nargs='+', help="CSV файлы, маски (glob) или каталоги")
+    parser.add_argument('-o', '--output', default='results', help="каталог для результатов (по умолчанию results)")
+    parser.add_argument('-f', '--format', choices=['json', 'csv', *COLUMNAR_FORMATS], default='json',
+                        help="формат результатов (parquet и arrow требуют pyarrow)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="число рабочих процессов (по умолчанию — число ядер)")
+    parser.add_argument('-t', '--timeout', type=float, default=None, help="тайм-аут на один файл, секунд")
+    parser.add_argument('--chart', choices=['png', 'svg', 'pdf'], default=None, help="сохранять диаграмму Ганта в указанном формате")
+    parser.add_argument('--max-errors', type=int, default=validation.DEFAULT_CAP,
+                        help=f"сколько записей каждого вида ошибок сохранять (по умолчанию {validation.DEFAULT_CAP})")
+    parser.add_argument('--fail-fast', action='store_true', help="прекращать проверку файла на первой ошибке")
+    cache.add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    args = parse_args(argv)
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("Не найдено ни одного файла для обработки")
+        return 2
+
+    if args.clear_cache:
+        cache.clear(args.cache_dir)
+    limits = validation.Limits(default=args.max_errors, fail_fast=args.fail_fast)
+    summary = run_batch(files, args.output, args.format, args.workers, args.timeout, args.chart,
+                        not args.no_cache, args.cache_dir, limits)
+
+    print(f"Обработано файлов: {summary['files']} за {summary['elapsed']:.2f} с "
+          f"({summary['files_per_second']:.1f} файлов/с, {summary['tasks']} работ)")
+    print(f"Успешно: {summary['ok']}, с ошибками данных: {summary['invalid']}, "
+          f"сбоев: {summary['error']}, тайм-аутов: {summary['timeout']}")
+    for record in summary['projects']:
+        if record['status'] != 'ok':
+            print(f"  ✗ {record['file']}: {record['status']} ({record['errors']} ошибок)")
+
+    return 0 if summary['ok'] == summary['files'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Набор тестов производительности по этапам конвейера NONE.py.
+
+Для каждой формы графа и размера создается синтетический проект
+(synthetic.py), затем замеряются этапы: чтение (read_project_data),
+валидация данных (validate_csv_data), проверка и компиляция зависимостей
+(compile_dependencies), критический путь (calculate_critical_path),
+профиль рабочей силы и диаграмма Ганта в файл. Время — лучшее из
+нескольких повторов (реальное и процессорное), память — пик выделений
+этапа по tracemalloc в отдельном проходе. Отдельно замеряется время
+холодного импорта модулей (NONE, cpm, cache) в новом интерпретаторе и
+проверяется, что при этом не загружаются matplotlib, networkx и tkinter.
+Результаты сохраняются в JSON и могут сравниваться с предыдущим запуском.
+
+Пример:
+    python benchmark.py --sizes 100 1000 10000 100000 --shapes layered chain
+    python benchmark.py --compare benchmarks/bench-20250101-120000.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import NONE
+import project_model
+import synthetic
+import validation
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000)
+DEFAULT_OUTPUT_DIR = 'benchmarks'
+
+# Этапы конвейера в порядке выполнения
+STAGES = ['read', 'validate_csv', 'compile_dependencies', 'critical_path', 'workforce', 'chart']
+
+# Прежние имена этапов в сохраненных результатах
+RENAMED_STAGES = {'validate_dependencies': 'compile_dependencies'}
+
+# Отношение времени к базовому запуску, начиная с которого этап считается замедлившимся
+DEFAULT_THRESHOLD = 1.25
+
+# Этапы короче этого времени (секунд) не сравниваются: в них преобладает шум
+MIN_COMPARE_SECONDS = 0.05
+
+# Модули, время холодного импорта которых отслеживается
+IMPORT_MODULES = ('NONE', 'cpm', 'cache')
+
+# Пакеты, которые расчетная часть не должна загружать при импорте
+HEAVY_MODULES = ('matplotlib', 'networkx', 'tkinter')
+
+
+def _pipeline(csv_file_path, chart_path, skip):
+    """
+    Генератор этапов конвейера: перед каждым этапом отдает его имя, после
+    последнего — счетчики (работы, рёбра, ошибки). Этапы, которые не могут
+    выполняться из-за ошибок данных, пропускаются.
+    """
+    counters = {'tasks': 0, 'edges': 0, 'errors': 0}
+
+    yield 'read'
+    df, read_errors = NONE.read_project_data(csv_file_path)
+    counters['tasks'] = len(df)
+    counters['errors'] += validation.count(read_errors)
+
+    yield 'validate_csv'
+    model = project_model.compile_model(df)
+    is_valid, errors = NONE.validate_csv_data(df, model)
+    counters['errors'] += validation.count(errors)
+    if not is_valid:
+        return counters
+
+    yield 'compile_dependencies'
+    is_deps_valid, dep_errors, _, G = NONE.compile_dependencies(df, model=model)
+    counters['errors'] += validation.count(dep_errors)
+    counters['edges'] = len(G.succ_idx)
+    if not is_deps_valid:
+        return counters
+
+    yield 'critical_path'
+    early_start, early_finish, critical_path, _ = NONE.calculate_critical_path(df, G)
+
+    yield 'workforce'
+    profile = NONE.build_workforce_profile(df, early_start, early_finish)
+
+    if 'chart' not in skip:
+        yield 'chart'
+        NONE.create_gantt_chart(df, early_start, early_finish, critical_path, profile, output_path=chart_path,
+                                graph=G)
+    return counters
+
+
+def _run_once(csv_file_path, chart_path, skip, trace_memory):
+    """
+    Один проход конвейера: {этап: (реальное время, процессорное время, пик памяти)} и счетчики
+    """
+    stages = {}
+    pipeline = _pipeline(csv_file_path, chart_path, skip)
+    stage = next(pipeline)
+    while True:
+        if trace_memory:
+            tracemalloc.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            next_stage = next(pipeline)
+        except StopIteration as stop:
+            next_stage, counters = None, stop.value
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        stages[stage] = (wall, cpu, peak)
+        if next_stage is None:
+            return stages, counters
+        stage = next_stage
+
+
+def benchmark_project(csv_file_path, repeats=3, memory=True, skip=()):
+    """
+    Замер всех этапов для одного файла: лучшее время из repeats повторов и пик памяти
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        chart_path = os.path.join(tmp, 'chart.png')
+        timings = [_run_once(csv_file_path, chart_path, skip, False) for _ in range(max(1, repeats))]
+        peaks = _run_once(csv_file_path, chart_path, skip, True)[0] if memory else {}
+
+    counters = timings[0][1]
+    results = []
+    for stage in timings[0][0]:
+        results.append({
+            'stage': stage,
+            'wall': min(run[stage][0] for run, _ in timings),
+            'cpu': min(run[stage][1] for run, _ in timings),
+            'peak_memory': peaks[stage][2] if stage in peaks else None,
+        })
+    return results, counters
+
+
+def import_time(module, repeats=5):
+    """
+    Холодный импорт модуля в новом интерпретаторе: лучшее время из repeats
+    запусков и список загруженных при этом тяжелых пакетов (HEAVY_MODULES)
+    """
+    code = (f"import sys, time\nstarted = time.perf_counter()\nimport {module}\n"
+            f"print(time.perf_counter() - started)\n"
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    best, heavy = None, []
+    for _ in range(max(1, repeats)):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split('\n')
+        elapsed = float(output[0])
+        best = elapsed if best is None else min(best, elapsed)
+        heavy = [name for name in output[1].split(',') if name]
+    return best, heavy
+
+
+def environment():
+    """
+    Сведения об окружении запуска для сопоставления результатов
+    """
+    import matplotlib
+    import networkx
+    import pandas
+
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'matplotlib': matplotlib.__version__,
+        'networkx': networkx.__version__,
+    }
+    with contextlib.suppress(OSError, subprocess.SubprocessError):
+        info['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                        cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    return info
+
+
+def run_suite(sizes=DEFAULT_SIZES, shapes=('layered',), components=1, errors=None, seed=0,
+              repeats=3, memory=True, skip=(), data_dir=None, progress=None, imports=IMPORT_MODULES):
+    """
+    Полный набор: время холодного импорта модулей (записи с формой 'import'),
+    генерация (или повторное использование) данных и замер этапов
+    """
+    results = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'environment': environment(), 'runs': []}
+    for module in imports:
+        wall, heavy = import_time(module, max(repeats, 3))
+        record = {'stage': module, 'wall': wall, 'cpu': None, 'peak_memory': None, 'shape': 'import',
+                  'size': 0, 'tasks': 0, 'edges': 0, 'errors': 0, 'heavy_modules': heavy}
+        results['runs'].append(record)
+        if progress:
+            progress(record)
+
+    with contextlib.ExitStack() as stack:
+        if data_dir is None:
+            data_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(data_dir, exist_ok=True)
+        error_suffix = ''.join(f"_{kind}{count}" for kind, count in sorted((errors or {}).items()))
+
+        for shape in shapes:
+            for size in sizes:
+                path = os.path.join(data_dir, f"{shape}_{size}_c{components}_s{seed}{error_suffix}.csv")
+                if not os.path.exists(path):
+                    rows = synthetic.generate_project(size, shape, components, errors, seed)
+                    synthetic.write_project(path, rows)
+
+                stages, counters = benchmark_project(path, repeats, memory, skip)
+                for record in stages:
+                    record.update(shape=shape, size=size, **counters)
+                    results['runs'].append(record)
+                    if progress:
+                        progress(record)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Сравнение с базовым запуском: список (форма, размер, этап, было, стало, отношение, замедление)
+    """
+    base = {(run['shape'], run['size'], RENAMED_STAGES.get(run['stage'], run['stage'])): run
+            for run in baseline['runs']}
+    rows = []
+    for run in results['runs']:
+        before = base.get((run['shape'], run['size'], run['stage']))
+        if before is None:
+            continue
+        ratio = run['wall'] / before['wall'] if before['wall'] > 0 else float('inf')
+        regression = ratio >= threshold and max(run['wall'], before['wall']) >= MIN_COMPARE_SECONDS
+        # Загрузка тяжелых пакетов при импорте — регрессия независимо от времени
+        regression = regression or bool(run.get('heavy_modules'))
+        rows.append((run['shape'], run['size'], run['stage'], before['wall'], run['wall'], ratio, regression))
+    return rows
+
+
+def _format_memory(value):
+    return '—' if value is None else f"{value / 2**20:.1f}"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Замер производительности этапов конвейера на синтетических проектах")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="размеры проектов (число работ)")
+    parser.add_argument('--shapes', nargs='+', choices=synthetic.SHAPES, default=['layered'], help="формы графа")
+    parser.add_argument('--components', type=int, default=1, help="число независимых компонент графа")
+    parser.add_argument('--error', action='append', metavar='ВИД[:N]', help="внести ошибку в данные (см. synthetic.py)")
+    parser.add_argument('-s', '--seed', type=int, default=0, help="зерно генератора данных")
+    parser.add_argument('-r', '--repeats', type=int, default=3, help="число повторов замера времени")
+    parser.add_argument('--no-memory', action='store_true', help="не замерять пик памяти (прохода с tracemalloc)")
+    parser.add_argument('--skip', nargs='+', choices=['chart'], default=[], help="пропустить этапы")
+    parser.add_argument('--imports', nargs='*', default=list(IMPORT_MODULES),
+                        help="модули для замера холодного импорта (без значений — не замерять)")
+    parser.add_argument('--data-dir', default=None, help="каталог для сгенерированных файлов (повторно используются)")
+    parser.add_argument('-o', '--output', default=None, help=f"файл результатов (по умолчанию {DEFAULT_OUTPUT_DIR}/bench-<время>.json)")
+    parser.add_argument('--compare', default=None, help="файл результатов базового запуска для сравнения")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="порог замедления для сравнения")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    args = parse_args(argv)
+
+    print(f"{'Форма':<8} {'Работ':>8} {'Рёбер':>9} {'Этап':<22} {'Время, с':>9} {'CPU, с':>9} {'Пик, МБ':>8}")
+    print("-" * 80)
+
+    def progress(record):
+        cpu = '—' if record['cpu'] is None else f"{record['cpu']:.4f}"
+        heavy = record.get('heavy_modules')
+        note = f"  ✗ загружены: {', '.join(heavy)}" if heavy else ''
+        print(f"{record['shape']:<8} {record['size']:>8} {record['edges']:>9} {record['stage']:<22} "
+              f"{record['wall']:>9.4f} {cpu:>9} {_format_memory(record['peak_memory']):>8}{note}", flush=True)
+
+    results = run_suite(args.sizes, args.shapes, args.components, synthetic.parse_errors(args.error), args.seed,
+                        args.repeats, not args.no_memory, args.skip, args.data_dir, progress, args.imports)
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        rows = compare(results, baseline, args.threshold)
+        print(f"\nСравнение с {args.compare}:")
+        print(f"{'Форма':<8} {'Работ':>8} {'Этап':<22} {'Было, с':>9} {'Стало, с':>9} {'Отношение':>10}")
+        for shape, size, stage, before, after, ratio, regression in rows:
+            mark = '  ✗ замедление' if regression else ''
+            print(f"{shape:<8} {size:>8} {stage:<22} {before:>9.4f} {after:>9.4f} {ratio:>10.2f}{mark}")
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Дисковый кэш прочитанных и проверенных проектов.
+
+Ключ записи — SHA-256 содержимого CSV файла вместе с версией формата кэша,
+списком дополнительных колонок и ограничениями записей об ошибках
+(validation.Limits). Запись — каталог с массивами .npy (продолжительности,
+рабочая сила, CSR-списки смежности, дополнительные колонки), которые
+загружаются через отображение в память, и meta.json с идентификаторами
+работ и результатами валидации (записи validation.Issue списками полей). Повторный запуск по тому
+же файлу пропускает чтение и валидацию целиком.
+
+Размер кэша ограничен: при превышении удаляются записи, которые дольше
+всего не использовались (время последнего использования — mtime meta.json).
+
+Пример:
+    python cache.py           # число записей и размер
+    python cache.py --clear
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+
+import cpm
+import validation
+
+# Версия формата записи: меняется при любом изменении разбора, валидации
+# или состава сохраняемых массивов, чтобы старые записи не использовались
+CACHE_VERSION = 2
+
+# Каталог и предельный размер кэша по умолчанию (переопределяются
+# переменными окружения GANTT_CACHE_DIR и GANTT_CACHE_SIZE в байтах)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'gantt')
+DEFAULT_CACHE_SIZE = 512 * 2**20
+
+# Размер блока при хешировании файла
+HASH_BLOCK_SIZE = 2**20
+
+GRAPH_ARRAYS = ['durations', 'pred_ptr', 'pred_idx', 'succ_ptr', 'succ_idx']
+
+CompiledProject = namedtuple('CompiledProject', [
+    'graph',       # cpm.ProjectGraph или None, если проект не прошел валидацию
+    'workforce',   # float64[n] рабочая сила работ
+    'extra',       # словарь колонка -> float64[n] (NaN для пропусков '-')
+    'errors',      # ошибки чтения и валидации
+    'warnings',    # предупреждения валидации зависимостей
+    'rows',        # число записей в файле
+    'key',         # ключ записи кэша
+    'cached',      # True, если проект загружен из кэша
+])
+
+
+def cache_dir():
+    """
+    Каталог кэша с учетом переменной окружения GANTT_CACHE_DIR
+    """
+    return os.environ.get('GANTT_CACHE_DIR') or DEFAULT_CACHE_DIR
+
+
+def cache_size_limit():
+    """
+    Предельный размер кэша в байтах с учетом переменной окружения GANTT_CACHE_SIZE
+    """
+    value = os.environ.get('GANTT_CACHE_SIZE')
+    return int(value) if value else DEFAULT_CACHE_SIZE
+
+
+def cache_key(csv_file_path, extra_columns=(), limits=None):
+    """
+    Ключ записи: хеш содержимого файла, версии формата, дополнительных
+    колонок и ограничений записей об ошибках
+    """
+    limits = list(limits or validation.Limits())
+    digest = hashlib.sha256()
+    digest.update(f"gantt-cache-{CACHE_VERSION}\0{json.dumps(list(extra_columns))}\0".encode('utf-8'))
+    digest.update(f"{json.dumps(limits, sort_keys=True)}\0".encode('utf-8'))
+    with open(csv_file_path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compile_extra(df, works, extra_columns):
+    """
+    Дополнительные колонки в виде массивов в порядке works (NaN для '-' и отсутствующих колонок)
+    """
+    first = df.drop_duplicates('Работа').set_index('Работа').reindex(works)
+    extra = {}
+    for column in extra_columns:
+        if column in first.columns:
+            extra[column] = first[column].where(first[column] != '-').astype(float).to_numpy()
+        else:
+            extra[column] = np.full(len(works), np.nan)
+    return extra
+
+
+def compile_csv(csv_file_path, extra_columns=(), limits=None):
+    """
+    Чтение, валидация и компиляция проекта без кэша
+    """
+    import NONE  # pandas нужен только при промахе кэша
+    
+    df, G, errors, warnings = NONE.load_project(csv_file_path, extra_columns=extra_columns, limits=limits)
+    if G is None:
+        return None, None, {}, errors, warnings, len(df)
+    graph, workforce = NONE.compile_project(df, G)
+    return graph, workforce, compile_extra(df, graph.works, extra_columns), errors, warnings, len(df)
+
+
+def _write_entry(directory, key, graph, workforce, extra, errors, warnings, rows):
+    """
+    Атомарная запись: каталог собирается во временном месте и переименовывается
+    """
+    staging = tempfile.mkdtemp(prefix=f".{key[:16]}-", dir=directory)
+    try:
+        meta = {'version': CACHE_VERSION, 'valid': graph is not None,
+                'errors': validation.dump(errors), 'warnings': validation.dump(warnings), 'rows': rows,
+                'extra': list(extra)}
+        if graph is not None:
+            meta['works'] = graph.works
+            for name in GRAPH_ARRAYS:
+                np.save(os.path.join(staging, f"{name}.npy"), getattr(graph, name))
+            np.save(os.path.join(staging, 'workforce.npy'), workforce)
+            for i, column in enumerate(extra):
+                np.save(os.path.join(staging, f"extra{i}.npy"), extra[column])
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as file:
+            json.dump(meta, file, ensure_ascii=False)
+        os.replace(staging, os.path.join(directory, key))
+    except OSError:
+        # Запись уже создана другим процессом или диск недоступен — кэш необязателен
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _read_entry(path):
+    """
+    Загрузка записи; массивы отображаются в память только для чтения
+    """
+    with open(os.path.join(path, 'meta.json'), encoding='utf-8') as file:
+        meta = json.load(file)
+    if meta.get('version') != CACHE_VERSION:
+        return None
+    if not meta['valid']:
+        return (None, None, {}, validation.restore(meta['errors']), validation.restore(meta['warnings']),
+                meta['rows'])
+
+    def load(name):
+        # Обычное представление ndarray над отображением файла: без копирования
+        # и без накладных расходов np.memmap на каждую выборку
+        return np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+
+    works = meta['works']
+    graph = cpm.ProjectGraph(works=works, index={work: i for i, work in enumerate(works)},
+                             **{name: load(name) for name in GRAPH_ARRAYS})
+    extra = {column: load(f"extra{i}") for i, column in enumerate(meta['extra'])}
+    return (graph, load('workforce'), extra, validation.restore(meta['errors']), validation.restore(meta['warnings']),
+            meta['rows'])
+
+
+def load_compiled(csv_file_path, extra_columns=(), use_cache=True, directory=None, size_limit=None, limits=None):
+    """
+    Скомпилированный проект из кэша или, при промахе, из CSV с записью в кэш.
+    use_cache=False выполняет полный разбор, не читая и не изменяя кэш.
+    limits (validation.Limits) — ограничения записей об ошибках валидации.
+    """
+    if not use_cache:
+        return CompiledProject(*compile_csv(csv_file_path, extra_columns, limits), key=None, cached=False)
+
+    directory = directory or cache_dir()
+    key = cache_key(csv_file_path, extra_columns, limits)
+    path = os.path.join(directory, key)
+
+    entry = None
+    if os.path.isdir(path):
+        try:
+            entry = _read_entry(path)
+        except (OSError, ValueError, KeyError):
+            entry = None
+    if entry is not None:
+        # Отметка последнего использования для вытеснения LRU
+        with contextlib.suppress(OSError):
+            os.utime(os.path.join(path, 'meta.json'))
+        return CompiledProject(*entry, key=key, cached=True)
+
+    entry = compile_csv(csv_file_path, extra_columns, limits)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        shutil.rmtree(path, ignore_errors=True)
+        _write_entry(directory, key, *entry)
+        evict(directory, size_limit)
+    except OSError:
+        pass
+    return CompiledProject(*entry, key=key, cached=False)
+
+
+def _entries(directory):
+    """
+    Записи кэша: (время последнего использования, размер, путь)
+    """
+    entries = []
+    with contextlib.suppress(FileNotFoundError):
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            try:
+                used = os.stat(os.path.join(path, 'meta.json')).st_mtime
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+            except OSError:
+                continue
+            entries.append((used, size, path))
+    return entries
+
+
+def evict(directory=None, size_limit=None):
+    """
+    Удаление давно не использованных записей, пока размер кэша превышает предел
+    """
+    directory = directory or cache_dir()
+    size_limit = cache_size_limit() if size_limit is None else size_limit
+    entries = sorted(_entries(directory))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= size_limit:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear(directory=None):
+    """
+    Полная очистка кэша; возвращает число удаленных записей
+    """
+    directory = directory or cache_dir()
+    entries = _entries(directory)
+    for _, _, path in entries:
+        shutil.rmtree(path, ignore_errors=True)
+    return len(entries)
+
+
+def add_cache_arguments(parser):
+    """
+    Общие параметры командной строки для управления кэшем
+    """
+    parser.add_argument('--no-cache', action='store_true', help="не использовать кэш проектов")
+    parser.add_argument('--clear-cache', action='store_true', help="очистить кэш проектов перед запуском")
+    parser.add_argument('--cache-dir', default=None, help=f"каталог кэша (по умолчанию {DEFAULT_CACHE_DIR})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Управление кэшем проверенных проектов")
+    parser.add_argument('--clear', action='store_true', help="удалить все записи")
+    parser.add_argument('--cache-dir', default=None, help=f"каталог кэша (по умолчанию {DEFAULT_CACHE_DIR})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    args = parse_args(argv)
+    directory = args.cache_dir or cache_dir()
+    if args.clear:
+        print(f"Удалено записей: {clear(directory)}")
+    entries = _entries(directory)
+    print(f"Кэш: {directory}")
+    print(f"Записей: {len(entries)}, размер: {sum(size for _, size, _ in entries) / 2**20:.1f} МБ "
+          f"(предел {cache_size_limit() / 2**20:.0f} МБ)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
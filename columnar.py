@@ -0,0 +1,316 @@
+"""
+Колоночный экспорт и импорт расписаний (Apache Arrow / Parquet).
+
+Расписание (работа, ES, EF, LS, LF, полный резерв, признак критической
+работы, продолжительность, рабочая сила, номер в топологическом порядке)
+и дневной профиль рабочей силы записываются в отдельные таблицы прямо из
+массивов расчета: числовые колонки передаются в Arrow без копирования,
+построчный DataFrame не создается. Формат определяется расширением
+файла: .parquet — Parquet (сжатие, чтение BI-системами), .arrow / .feather —
+файл Arrow IPC, который читается через отображение в память без
+копирования: колонки расписания становятся представлениями NumPy над
+файлом.
+
+pyarrow — необязательная зависимость, загружается при первом обращении.
+
+Пример:
+    python columnar.py export DATA.csv -o results/DATA --format arrow
+    python columnar.py compare old.schedule.arrow new.schedule.arrow
+"""
+import argparse
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+import cache
+import cpm
+import workload
+
+# Версия формата таблиц (метаданные схемы)
+FORMAT_VERSION = '1'
+
+# Расширения файлов по формату
+EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow'}
+ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc')
+
+SCHEDULE_COLUMNS = ['work', 'early_start', 'early_finish', 'late_start', 'late_finish', 'total_slack',
+                    'critical', 'duration', 'workforce', 'rank']
+
+StoredSchedule = namedtuple('StoredSchedule', [
+    'works',       # идентификаторы работ (порядок строк таблицы)
+    'schedule',    # cpm.Schedule; массивы — представления над колонками таблицы
+    'critical',    # bool[n] признак критической работы
+    'durations',   # float64[n]
+    'workforce',   # float64[n]
+    'metadata',    # словарь метаданных таблицы (срок проекта, дата начала, версия)
+])
+
+ScheduleDiff = namedtuple('ScheduleDiff', [
+    'works',                  # общие работы двух расписаний
+    'early_start_delta',      # float64[k] изменение раннего начала (после - до)
+    'early_finish_delta',     # float64[k]
+    'slack_delta',            # float64[k] изменение полного резерва
+    'became_critical',        # работы, ставшие критическими
+    'no_longer_critical',     # работы, переставшие быть критическими
+    'added',                  # работы, которых не было в первом расписании
+    'removed',                # работы, которых нет во втором расписании
+    'project_duration_delta',
+])
+
+
+def _arrow():
+    """
+    Загрузка pyarrow (необязательная зависимость)
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Для экспорта в Parquet/Arrow нужен пакет pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def _is_arrow(path):
+    return os.path.splitext(path)[1].lower() in ARROW_SUFFIXES
+
+
+def _write_table(table, path):
+    """
+    Запись таблицы одним блоком: колонки файла Arrow не дробятся на части
+    и при чтении отображаются в память целиком
+    """
+    pa = _arrow()
+    if _is_arrow(path):
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    else:
+        pa.parquet.write_table(table, path)
+
+
+def _read_table(path):
+    """
+    Чтение таблицы: файл Arrow — через отображение в память без копирования
+    """
+    pa = _arrow()
+    if _is_arrow(path):
+        return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return pa.parquet.read_table(path, memory_map=True)
+
+
+def _column(table, name):
+    """
+    Колонка таблицы как массив NumPy; колонка из одного блока без
+    пропусков отдается без копирования (кроме битовых bool-колонок)
+    """
+    column = table.column(name)
+    chunk = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+    return chunk.to_numpy(zero_copy_only=False)
+
+
+def _metadata(table):
+    return {key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()}
+
+
+def schedule_table(graph, schedule, workforce):
+    """
+    Таблица Arrow расписания из массивов расчета. schedule — cpm.Schedule
+    или work_calendar.DatedSchedule (тогда в метаданные попадает дата начала).
+    """
+    pa = _arrow()
+    n = len(graph.works)
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.asarray(schedule.order, dtype=np.int64)] = np.arange(n)
+    columns = [
+        pa.array(graph.works, type=pa.string()),
+        pa.array(np.asarray(schedule.early_start, dtype=np.float64)),
+        pa.array(np.asarray(schedule.early_finish, dtype=np.float64)),
+        pa.array(np.asarray(schedule.late_start, dtype=np.float64)),
+        pa.array(np.asarray(schedule.late_finish, dtype=np.float64)),
+        pa.array(np.asarray(schedule.total_slack, dtype=np.float64)),
+        pa.array(np.abs(schedule.total_slack) < cpm.CRITICAL_EPS),
+        pa.array(np.asarray(graph.durations, dtype=np.float64)),
+        pa.array(np.asarray(workforce, dtype=np.float64)),
+        pa.array(rank),
+    ]
+    metadata = {'kind': 'schedule', 'version': FORMAT_VERSION,
+                'project_duration': repr(float(schedule.project_duration))}
+    if getattr(schedule, 'start', None) is not None:
+        metadata['start'] = str(schedule.start)
+    return pa.Table.from_arrays(columns, names=SCHEDULE_COLUMNS, metadata=metadata)
+
+
+def workforce_table(profile, start=None):
+    """
+    Таблица Arrow дневного профиля рабочей силы (workload.WorkforceProfile);
+    с датой начала проекта start добавляется колонка дат
+    """
+    pa = _arrow()
+    days = np.arange(profile.daily.size, dtype=np.int64)
+    columns = [pa.array(days), pa.array(np.asarray(profile.daily, dtype=np.float64))]
+    names = ['day', 'workforce']
+    if start is not None:
+        columns.append(pa.array(np.datetime64(start, 'D') + days))
+        names.append('date')
+    metadata = {'kind': 'workforce', 'version': FORMAT_VERSION,
+                'peak': repr(float(profile.peak)), 'mean': repr(float(profile.mean))}
+    return pa.Table.from_arrays(columns, names=names, metadata=metadata)
+
+
+def write_schedule(path, graph, schedule, workforce):
+    """
+    Запись расписания в файл Parquet или Arrow (по расширению path)
+    """
+    _write_table(schedule_table(graph, schedule, workforce), path)
+
+
+def write_workforce(path, profile, start=None):
+    """
+    Запись дневного профиля рабочей силы в файл Parquet или Arrow
+    """
+    _write_table(workforce_table(profile, start), path)
+
+
+def export_project(base_path, graph, schedule, workforce, profile, fmt='parquet'):
+    """
+    Запись расписания и профиля рабочей силы рядом: base_path.schedule.<ext>
+    и base_path.workforce.<ext>. Возвращает пути записанных файлов.
+    """
+    extension = EXTENSIONS[fmt]
+    schedule_path = f"{base_path}.schedule.{extension}"
+    workforce_path = f"{base_path}.workforce.{extension}"
+    write_schedule(schedule_path, graph, schedule, workforce)
+    write_workforce(workforce_path, profile, getattr(schedule, 'start', None))
+    return schedule_path, workforce_path
+
+
+def read_schedule(path):
+    """
+    Загрузка расписания из файла Parquet или Arrow. Для файла Arrow
+    числовые массивы — представления над отображенным в память файлом.
+    """
+    table = _read_table(path)
+    metadata = _metadata(table)
+    if metadata.get('kind') != 'schedule':
+        raise ValueError(f"Файл '{path}' не содержит таблицу расписания")
+
+    rank = _column(table, 'rank')
+    order = np.empty(rank.size, dtype=np.int64)
+    order[rank] = np.arange(rank.size)
+    schedule = cpm.Schedule(
+        order=order,
+        early_start=_column(table, 'early_start'),
+        early_finish=_column(table, 'early_finish'),
+        late_start=_column(table, 'late_start'),
+        late_finish=_column(table, 'late_finish'),
+        total_slack=_column(table, 'total_slack'),
+        project_duration=float(metadata['project_duration']),
+    )
+    return StoredSchedule(
+        works=table.column('work').to_pylist(),
+        schedule=schedule,
+        critical=_column(table, 'critical'),
+        durations=_column(table, 'duration'),
+        workforce=_column(table, 'workforce'),
+        metadata=metadata,
+    )
+
+
+def read_workforce(path):
+    """
+    Дневной профиль рабочей силы из файла Parquet или Arrow
+    """
+    table = _read_table(path)
+    if _metadata(table).get('kind') != 'workforce':
+        raise ValueError(f"Файл '{path}' не содержит профиль рабочей силы")
+    return _column(table, 'workforce')
+
+
+def compare_schedules(before, after):
+    """
+    Сравнение двух сохраненных расписаний (StoredSchedule) по общим работам
+    """
+    works_before = np.asarray(before.works, dtype=object).astype(str)
+    works_after = np.asarray(after.works, dtype=object).astype(str)
+    common, i, j = np.intersect1d(works_before, works_after, assume_unique=True, return_indices=True)
+    old, new = before.schedule, after.schedule
+    critical_before, critical_after = before.critical[i], after.critical[j]
+    return ScheduleDiff(
+        works=common.tolist(),
+        early_start_delta=new.early_start[j] - old.early_start[i],
+        early_finish_delta=new.early_finish[j] - old.early_finish[i],
+        slack_delta=new.total_slack[j] - old.total_slack[i],
+        became_critical=common[critical_after & ~critical_before].tolist(),
+        no_longer_critical=common[critical_before & ~critical_after].tolist(),
+        added=np.setdiff1d(works_after, works_before, assume_unique=True).tolist(),
+        removed=np.setdiff1d(works_before, works_after, assume_unique=True).tolist(),
+        project_duration_delta=new.project_duration - old.project_duration,
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Колоночный экспорт расписаний (Parquet / Arrow) и их сравнение")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="расчет проекта и запись расписания и профиля рабочей силы")
+    export.add_argument('csv_file', help="CSV файл проекта")
+    export.add_argument('-o', '--output', default=None,
+                        help="путь без расширения (по умолчанию — рядом с CSV файлом)")
+    export.add_argument('-f', '--format', choices=sorted(EXTENSIONS), default='parquet', help="формат файлов")
+    cache.add_cache_arguments(export)
+    compare = commands.add_parser('compare', help="сравнение двух сохраненных расписаний")
+    compare.add_argument('before', help="файл расписания до изменений")
+    compare.add_argument('after', help="файл расписания после изменений")
+    compare.add_argument('--top', type=int, default=15, help="сколько работ с наибольшим сдвигом выводить")
+    return parser.parse_args(argv)
+
+
+def _export(args):
+    if args.clear_cache:
+        cache.clear(args.cache_dir)
+    project = cache.load_compiled(args.csv_file, use_cache=not args.no_cache, directory=args.cache_dir)
+    if project.graph is None:
+        print("✗ Невозможно рассчитать расписание:")
+        for i, error in enumerate(project.errors, 1):
+            print(f"  {i}. {error}")
+        return 1
+
+    schedule = cpm.compute_schedule(project.graph)
+    profile = workload.build_profile(schedule.early_start, schedule.early_finish, project.workforce)
+    base_path = args.output or os.path.splitext(args.csv_file)[0]
+    for path in export_project(base_path, project.graph, schedule, project.workforce, profile, args.format):
+        print(f"Сохранено: {path}")
+    return 0
+
+
+def _compare(args):
+    before, after = read_schedule(args.before), read_schedule(args.after)
+    diff = compare_schedules(before, after)
+    print(f"Длительность проекта: {before.schedule.project_duration:.1f} → {after.schedule.project_duration:.1f} "
+          f"({diff.project_duration_delta:+.1f})")
+    print(f"Добавлено работ: {len(diff.added)}, удалено: {len(diff.removed)}")
+    if diff.became_critical:
+        print(f"Стали критическими: {', '.join(diff.became_critical)}")
+    if diff.no_longer_critical:
+        print(f"Перестали быть критическими: {', '.join(diff.no_longer_critical)}")
+
+    moved = np.flatnonzero(diff.early_start_delta != 0)
+    if moved.size:
+        print(f"\n{'Работа':<10} {'Сдвиг начала':<14} {'Сдвиг окончания':<16} {'Изм. резерва':<12}")
+        for k in moved[np.argsort(-np.abs(diff.early_start_delta[moved]), kind='stable')][:args.top]:
+            print(f"{diff.works[k]:<10} {diff.early_start_delta[k]:<+14.1f} {diff.early_finish_delta[k]:<+16.1f} "
+                  f"{diff.slack_delta[k]:<+12.1f}")
+    return 0
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    args = parse_args(argv)
+    return _export(args) if args.command == 'export' else _compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+"""
+Вычислительное ядро метода критического пути (CPM) на массивах NumPy.
+
+Работы интернируются в целые индексы 0..n-1, продолжительности хранятся
+в непрерывном массиве, а предшественники и последователи — в формате CSR
+(массив смещений + массив индексов).
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# Погрешность, в пределах которой резерв считается нулевым
+CRITICAL_EPS = 1e-9
+
+# Наименьшая ширина топологического уровня, который обрабатывается одной
+# векторной операцией; узкие уровни быстрее пройти по работам
+WAVEFRONT_MIN_WIDTH = 32
+
+ProjectGraph = namedtuple('ProjectGraph', [
+    'works',      # список идентификаторов работ (индекс -> идентификатор)
+    'index',      # словарь идентификатор -> индекс
+    'durations',  # float64[n] продолжительности
+    'pred_ptr',   # int64[n+1] смещения списков предшественников
+    'pred_idx',   # int64[m] индексы предшественников
+    'succ_ptr',   # int64[n+1] смещения списков последователей
+    'succ_idx',   # int64[m] индексы последователей
+])
+
+Schedule = namedtuple('Schedule', [
+    'order',             # int64[n] топологический порядок
+    'early_start',       # float64[n]
+    'early_finish',      # float64[n]
+    'late_start',        # float64[n]
+    'late_finish',       # float64[n]
+    'total_slack',       # float64[n]
+    'project_duration',  # float
+])
+
+
+class CycleError(ValueError):
+    """
+    Граф зависимостей содержит цикл, расчет расписания невозможен
+    """
+
+
+def intern_works(works):
+    """
+    Интернирование идентификаторов работ в целые индексы (первое вхождение)
+    """
+    index = {}
+    for work in works:
+        if work not in index:
+            index[work] = len(index)
+    return list(index), index
+
+
+def _csr(rows, cols, n):
+    """
+    Упаковка списка рёбер в CSR с сохранением исходного порядка рёбер
+    """
+    order = np.argsort(rows, kind='stable')
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=ptr[1:])
+    return ptr, cols[order].astype(np.int64, copy=False)
+
+
+def gather(ptr, idx, nodes):
+    """
+    Конкатенация CSR-списков для набора узлов (в порядке узлов)
+    """
+    starts = ptr[nodes]
+    counts = ptr[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return idx[offsets + np.arange(total, dtype=np.int64)]
+
+
+def build_graph(works, durations, sources, targets):
+    """
+    Сборка графа проекта из индексов рёбер (повторяющиеся рёбра отбрасываются)
+    """
+    works = list(works)
+    n = len(works)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+
+    if sources.size:
+        # Удаляем дубликаты рёбер, сохраняя порядок первого появления
+        _, first = np.unique(sources * n + targets, return_index=True)
+        first.sort()
+        sources = sources[first]
+        targets = targets[first]
+
+    succ_ptr, succ_idx = _csr(sources, targets, n)
+    pred_ptr, pred_idx = _csr(targets, sources, n)
+
+    return ProjectGraph(
+        works=works,
+        index={work: i for i, work in enumerate(works)},
+        durations=np.ascontiguousarray(durations, dtype=np.float64),
+        pred_ptr=pred_ptr,
+        pred_idx=pred_idx,
+        succ_ptr=succ_ptr,
+        succ_idx=succ_idx,
+    )
+
+
+def graph_from_networkx(G, durations):
+    """
+    Компиляция графа networkx; durations — отображение работа -> продолжительность
+    """
+    works = list(G.nodes)
+    index = {work: i for i, work in enumerate(works)}
+    edges = np.array([(index[u], index[v]) for u, v in G.edges], dtype=np.int64).reshape(-1, 2)
+    duration_values = np.array([durations[work] for work in works], dtype=np.float64)
+    return build_graph(works, duration_values, edges[:, 0], edges[:, 1])
+
+
+def as_project_graph(G, durations):
+    """
+    Граф cpm.ProjectGraph как есть; граф networkx компилируется через graph_from_networkx
+    """
+    if isinstance(G, ProjectGraph):
+        return G
+    return graph_from_networkx(G, durations)
+
+
+def subgraph(graph, nodes, works=None):
+    """
+    Подграф на работах nodes, замкнутых по рёбрам (например, компонента
+    связности). Локальные индексы — позиции в nodes; порядок списков
+    смежности сохраняется. works — идентификаторы локальных работ
+    (по умолчанию берутся из graph.works).
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    local = np.full(len(graph.works), -1, dtype=np.int64)
+    local[nodes] = np.arange(nodes.size)
+
+    def restrict(ptr, idx):
+        counts = ptr[nodes + 1] - ptr[nodes]
+        sub_ptr = np.zeros(nodes.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=sub_ptr[1:])
+        return sub_ptr, local[gather(ptr, idx, nodes)]
+
+    pred_ptr, pred_idx = restrict(graph.pred_ptr, graph.pred_idx)
+    succ_ptr, succ_idx = restrict(graph.succ_ptr, graph.succ_idx)
+    if works is None:
+        works = [graph.works[node] for node in nodes.tolist()]
+    return ProjectGraph(
+        works=works,
+        index={work: i for i, work in enumerate(works)},
+        durations=np.ascontiguousarray(graph.durations[nodes], dtype=np.float64),
+        pred_ptr=pred_ptr,
+        pred_idx=pred_idx,
+        succ_ptr=succ_ptr,
+        succ_idx=succ_idx,
+    )
+
+
+def weak_components(graph):
+    """
+    Метки слабосвязных компонент (метка — наименьший индекс работы компоненты).
+    Векторное объединение деревьев с перевешиванием корней и сжатием путей.
+    """
+    n = len(graph.works)
+    parent = np.arange(n, dtype=np.int64)
+    sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(graph.succ_ptr))
+    targets = graph.succ_idx
+    while True:
+        root_s, root_t = parent[sources], parent[targets]
+        differ = root_s != root_t
+        if not differ.any():
+            return parent
+        low = np.minimum(root_s[differ], root_t[differ])
+        high = np.maximum(root_s[differ], root_t[differ])
+        np.minimum.at(parent, high, low)
+        # Сжатие путей до корней
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def topological_generations(graph):
+    """
+    Топологические уровни графа (тот же порядок, что у nx.topological_generations)
+    """
+    n = len(graph.works)
+    indegree = np.diff(graph.pred_ptr)
+    current = np.flatnonzero(indegree == 0)
+    generations = []
+    visited = 0
+
+    while current.size:
+        generations.append(current)
+        visited += current.size
+        children = gather(graph.succ_ptr, graph.succ_idx, current)
+        if not children.size:
+            break
+        np.subtract.at(indegree, children, 1)
+        ready = children[indegree[children] == 0]
+        # Узел попадает в следующий уровень в момент последнего уменьшения
+        # степени захода, поэтому упорядочиваем по последнему вхождению
+        _, last = np.unique(ready[::-1], return_index=True)
+        current = ready[np.sort(ready.size - 1 - last)]
+
+    if visited != n:
+        raise CycleError("граф содержит циклы")
+    return generations
+
+
+def topological_order(graph):
+    """
+    Топологический порядок работ
+    """
+    generations = topological_generations(graph)
+    if not generations:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(generations)
+
+
+def forward_pass(graph, order):
+    """
+    Прямой проход: ранние сроки начала и окончания
+    """
+    pred_ptr, pred_idx, durations = graph.pred_ptr, graph.pred_idx, graph.durations
+    early_start = np.zeros(len(durations))
+    early_finish = np.zeros(len(durations))
+
+    for node in order:
+        start, end = pred_ptr[node], pred_ptr[node + 1]
+        if start != end:
+            early_start[node] = max(early_finish[pred_idx[start:end]].max(), 0.0)
+        early_finish[node] = early_start[node] + durations[node]
+
+    return early_start, early_finish
+
+
+def backward_pass(graph, order, project_duration):
+    """
+    Обратный проход: поздние сроки начала и окончания
+    """
+    succ_ptr, succ_idx, durations = graph.succ_ptr, graph.succ_idx, graph.durations
+    late_finish = np.full(len(durations), float(project_duration))
+    late_start = np.empty(len(durations))
+
+    for node in order[::-1]:
+        start, end = succ_ptr[node], succ_ptr[node + 1]
+        if start != end:
+            late_finish[node] = min(late_start[succ_idx[start:end]].min(), project_duration)
+        late_start[node] = late_finish[node] - durations[node]
+
+    return late_start, late_finish
+
+
+def _segment_starts(ptr, nodes):
+    """
+    Смещения CSR-списков nodes в результате gather и маска непустых списков
+    """
+    counts = ptr[nodes + 1] - ptr[nodes]
+    return (np.cumsum(counts) - counts)[counts > 0], counts > 0
+
+
+def forward_levels(graph, generations):
+    """
+    Прямой проход по топологическим уровням (волновой фронт): широкий
+    уровень обрабатывается одной векторной операцией, так как работы
+    уровня не зависят друг от друга. Результат совпадает с forward_pass.
+    """
+    pred_ptr, pred_idx, durations = graph.pred_ptr, graph.pred_idx, graph.durations
+    early_start = np.zeros(len(durations))
+    early_finish = np.zeros(len(durations))
+
+    for level in generations:
+        if level.size < WAVEFRONT_MIN_WIDTH:
+            for node in level.tolist():
+                start, end = pred_ptr[node], pred_ptr[node + 1]
+                if start != end:
+                    early_start[node] = max(early_finish[pred_idx[start:end]].max(), 0.0)
+                early_finish[node] = early_start[node] + durations[node]
+            continue
+        offsets, has_preds = _segment_starts(pred_ptr, level)
+        if offsets.size:
+            finishes = early_finish[gather(pred_ptr, pred_idx, level)]
+            early_start[level[has_preds]] = np.maximum(np.maximum.reduceat(finishes, offsets), 0.0)
+        early_finish[level] = early_start[level] + durations[level]
+
+    return early_start, early_finish
+
+
+def backward_levels(graph, generations, project_duration):
+    """
+    Обратный проход по топологическим уровням в обратном порядке
+    """
+    succ_ptr, succ_idx, durations = graph.succ_ptr, graph.succ_idx, graph.durations
+    late_finish = np.full(len(durations), float(project_duration))
+    late_start = np.empty(len(durations))
+
+    for level in generations[::-1]:
+        if level.size < WAVEFRONT_MIN_WIDTH:
+            for node in level.tolist()[::-1]:
+                start, end = succ_ptr[node], succ_ptr[node + 1]
+                if start != end:
+                    late_finish[node] = min(late_start[succ_idx[start:end]].min(), project_duration)
+                late_start[node] = late_finish[node] - durations[node]
+            continue
+        offsets, has_succs = _segment_starts(succ_ptr, level)
+        if offsets.size:
+            starts = late_start[gather(succ_ptr, succ_idx, level)]
+            late_finish[level[has_succs]] = np.minimum(np.minimum.reduceat(starts, offsets), project_duration)
+        late_start[level] = late_finish[level] - durations[level]
+
+    return late_start, late_finish
+
+
+def compute_schedule(graph, order=None, project_duration=None):
+    """
+    Полный расчет CPM: ES/EF/LS/LF и полный резерв в виде массивов.
+    Без order проходы идут по топологическим уровням (forward_levels),
+    с заданным порядком — по работам. project_duration задает срок
+    окончания для обратного прохода (по умолчанию — наибольшее раннее
+    окончание), например общий срок при расчете отдельных компонент графа.
+    """
+    if order is None:
+        generations = topological_generations(graph)
+        order = np.concatenate(generations) if generations else np.empty(0, dtype=np.int64)
+        early_start, early_finish = forward_levels(graph, generations)
+    else:
+        generations = None
+        early_start, early_finish = forward_pass(graph, order)
+
+    if project_duration is None:
+        project_duration = float(early_finish.max()) if early_finish.size else 0.0
+    if generations is None:
+        late_start, late_finish = backward_pass(graph, order, project_duration)
+    else:
+        late_start, late_finish = backward_levels(graph, generations, project_duration)
+
+    return Schedule(
+        order=order,
+        early_start=early_start,
+        early_finish=early_finish,
+        late_start=late_start,
+        late_finish=late_finish,
+        total_slack=late_start - early_start,
+        project_duration=project_duration,
+    )
+
+
+def critical_mask(schedule):
+    """
+    Маска критических работ (нулевой резерв с учетом погрешности)
+    """
+    return np.abs(schedule.total_slack) < CRITICAL_EPS
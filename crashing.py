@@ -0,0 +1,340 @@
+"""
+Сокращение срока проекта с минимальными затратами (crashing).
+
+Для работы задаются минимальная продолжительность и дополнительные
+затраты на сокращение до нее (колонки 6-7 CSV файла); затраты растут
+линейно с сокращением. Кривая «срок — затраты» строится по шагам
+(Филлипс–Десси): на каждом шаге все критические пути сокращаются на
+одинаковую величину, а сокращаемые работы — минимальный разрез сети
+критических работ (максимальный поток, алгоритм Диница) с пропускной
+способностью работы, равной стоимости сокращения на день. Разрез может
+пересекать работу в обратном направлении: ранее сокращенная работа тогда
+удлиняется обратно, и ее затраты возвращаются. Расписание между шагами
+не пересчитывается целиком — правки продолжительностей распространяются
+инкрементально (incremental.IncrementalSchedule).
+
+Пример:
+    python crashing.py DATA.csv --days 5
+"""
+import argparse
+import sys
+from collections import deque, namedtuple
+
+import numpy as np
+
+import cache
+import cpm
+import incremental
+
+# Необязательные колонки параметров сокращения (после пятой)
+CRASH_COLUMNS = ['Минимальная продолжительность', 'Стоимость сокращения']
+
+# Погрешность сравнения потоков и пропускных способностей
+FLOW_EPS = 1e-9
+
+# Источник и сток сети критических работ
+SOURCE = 0
+SINK = 1
+
+CrashPoint = namedtuple('CrashPoint', [
+    'project_duration',  # срок проекта
+    'cost',              # суммарные затраты на сокращение
+    'slope',             # затраты на день сокращения на шаге, ведущем к точке
+    'plan',              # словарь работа -> продолжительность для сокращенных работ
+])
+
+
+def crash_parameters(graph, extra):
+    """
+    Минимальные продолжительности и затраты на полное сокращение из колонок
+    CRASH_COLUMNS (cache.compile_extra). Пропущенная минимальная
+    продолжительность ('-') означает, что работа не сокращается.
+    """
+    normal = np.asarray(graph.durations, dtype=np.float64)
+    crash_durations = extra.get(CRASH_COLUMNS[0])
+    crash_costs = extra.get(CRASH_COLUMNS[1])
+    crash_durations = normal.copy() if crash_durations is None else np.where(np.isnan(crash_durations), normal, crash_durations)
+    crash_costs = np.zeros(len(normal)) if crash_costs is None else np.where(np.isnan(crash_costs), 0.0, crash_costs)
+    return crash_durations, crash_costs
+
+
+def validate_crash(works, durations, crash_durations, crash_costs):
+    """
+    Проверка параметров сокращения: 0 < минимальная <= нормальная, затраты >= 0
+    """
+    errors = []
+    bad = ~((crash_durations > 0) & (crash_durations <= durations) & (crash_costs >= 0))
+    for i in np.flatnonzero(bad):
+        errors.append(f"Работа '{works[i]}': параметры сокращения должны удовлетворять 0 < минимальная <= "
+                      f"нормальная продолжительность и затраты >= 0 (получено {crash_durations[i]}, "
+                      f"{durations[i]}, {crash_costs[i]})")
+    return errors
+
+
+class FlowNetwork:
+    """
+    Сеть для максимального потока (алгоритм Диница). Рёбра хранятся в
+    плоских списках; обратное ребро ребра e имеет номер e ^ 1.
+    """
+
+    def __init__(self, n):
+        self.head = [-1] * n
+        self.to = []
+        self.cap = []
+        self.next = []
+
+    def add_edge(self, u, v, capacity):
+        for a, b, c in ((u, v, capacity), (v, u, 0.0)):
+            self.to.append(b)
+            self.cap.append(c)
+            self.next.append(self.head[a])
+            self.head[a] = len(self.to) - 1
+
+    def _levels(self, source):
+        """
+        Уровни вершин остаточной сети (поиск в ширину); -1 — недостижима
+        """
+        to, cap, nxt = self.to, self.cap, self.next
+        level = [-1] * len(self.head)
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            e = self.head[node]
+            while e != -1:
+                if cap[e] > FLOW_EPS and level[to[e]] < 0:
+                    level[to[e]] = level[node] + 1
+                    queue.append(to[e])
+                e = nxt[e]
+        return level
+
+    def _augment(self, source, sink, level, cursor):
+        """
+        Один увеличивающий путь в слоистой сети (итеративный поиск в
+        глубину: критические цепочки бывают длиннее предела рекурсии)
+        """
+        to, cap, nxt = self.to, self.cap, self.next
+        path = []
+        node = source
+        while True:
+            if node == sink:
+                pushed = min(cap[e] for e in path)
+                for e in path:
+                    cap[e] -= pushed
+                    cap[e ^ 1] += pushed
+                return pushed
+            e = cursor[node]
+            while e != -1 and not (cap[e] > FLOW_EPS and level[to[e]] == level[node] + 1):
+                e = nxt[e]
+            cursor[node] = e
+            if e != -1:
+                path.append(e)
+                node = to[e]
+                continue
+            # Тупик: вершина исключается из слоистой сети, возврат на шаг
+            level[node] = -1
+            if not path:
+                return 0.0
+            e = path.pop()
+            node = to[e ^ 1]
+            cursor[node] = nxt[e]
+
+    def max_flow(self, source, sink):
+        total = 0.0
+        while True:
+            level = self._levels(source)
+            if level[sink] < 0:
+                return total
+            cursor = list(self.head)
+            while True:
+                pushed = self._augment(source, sink, level, cursor)
+                if pushed <= FLOW_EPS:
+                    break
+                total += pushed
+
+    def source_side(self, source):
+        """
+        Маска вершин, достижимых из источника в остаточной сети (сторона разреза)
+        """
+        return [level >= 0 for level in self._levels(source)]
+
+
+def _minimum_cut(state, critical, slopes, crash_durations, normal):
+    """
+    Минимальный разрез сети критических работ. Работа v — ребро
+    вход(v) -> выход(v) с пропускной способностью «стоимость дня
+    сокращения» (бесконечной, если работа уже сокращена до минимума);
+    критические зависимости, начала и концы критических путей —
+    бесконечные рёбра. Возвращает работы, пересекаемые разрезом в прямом
+    и обратном направлении, или None, если конечного разреза нет.
+    """
+    durations = state.durations
+    position = {node: k for k, node in enumerate(critical)}
+    crashable = [durations[v] - crash_durations[v] > cpm.CRITICAL_EPS for v in critical]
+    infinite = 1.0 + sum(slopes[v] for v, ok in zip(critical, crashable) if ok)
+
+    network = FlowNetwork(2 * len(critical) + 2)
+    for k, v in enumerate(critical):
+        network.add_edge(2 * k + 2, 2 * k + 3, slopes[v] if crashable[k] else infinite)
+        if state.early_start[v] < cpm.CRITICAL_EPS:
+            network.add_edge(SOURCE, 2 * k + 2, infinite)
+        if state.tail[v] < cpm.CRITICAL_EPS:
+            network.add_edge(2 * k + 3, SINK, infinite)
+        for succ in state.succ[v]:
+            # Зависимость на критическом пути: последователь критический и начинается сразу
+            if succ in position and abs(state.early_finish[v] - state.early_start[succ]) < cpm.CRITICAL_EPS:
+                network.add_edge(2 * k + 3, 2 * position[succ] + 2, infinite)
+
+    if network.max_flow(SOURCE, SINK) >= infinite - FLOW_EPS:
+        return None
+    side = network.source_side(SOURCE)
+    forward = [v for k, v in enumerate(critical) if side[2 * k + 2] and not side[2 * k + 3]]
+    backward = [v for k, v in enumerate(critical) if side[2 * k + 3] and not side[2 * k + 2]
+                and durations[v] < normal[v] - cpm.CRITICAL_EPS]
+    return forward, backward
+
+
+def crash_steps(graph, crash_durations, crash_costs, schedule=None, target=None, step=None):
+    """
+    Генератор точек кривой «срок — затраты», начиная с нормального
+    расписания. Без step точки — изломы кривой (между ними затраты
+    линейны); step ограничивает сокращение на шаге, например 1 день.
+    Генерация останавливается на сроке target или когда найдется
+    критический путь без сокращаемых работ.
+    """
+    normal = np.asarray(graph.durations, dtype=np.float64)
+    crash_durations = np.asarray(crash_durations, dtype=np.float64)
+    ranges = normal - crash_durations
+    slopes = np.divide(crash_costs, ranges, out=np.zeros(len(normal)), where=ranges > cpm.CRITICAL_EPS).tolist()
+    state = incremental.IncrementalSchedule(graph, schedule=schedule)
+    works = state.works
+
+    cost = 0.0
+    project_duration = state.project_duration
+    yield CrashPoint(project_duration=project_duration, cost=0.0, slope=0.0, plan={})
+
+    while target is None or project_duration > target + cpm.CRITICAL_EPS:
+        slack = state.total_slack
+        critical = np.flatnonzero(np.abs(slack) < cpm.CRITICAL_EPS).tolist()
+        cut = _minimum_cut(state, critical, slopes, crash_durations, normal)
+        if cut is None:
+            return
+        forward, backward = cut
+
+        # Шаг ограничен запасом сокращения и удлинения работ разреза и
+        # наименьшим резервом: некритический путь не должен стать длиннее нового срока
+        limits = [state.durations[v] - crash_durations[v] for v in forward]
+        limits += [normal[v] - state.durations[v] for v in backward]
+        positive = slack[slack >= cpm.CRITICAL_EPS]
+        if positive.size:
+            limits.append(float(positive.min()))
+        if step is not None:
+            limits.append(step)
+        if target is not None:
+            limits.append(project_duration - target)
+        delta = min(limits)
+
+        changes = {works[v]: state.durations[v] - delta for v in forward}
+        changes.update({works[v]: state.durations[v] + delta for v in backward})
+        state.set_durations(changes)
+        if backward and state.project_duration > project_duration - delta + cpm.CRITICAL_EPS:
+            # Удлинение вывело вперед путь с малым резервом — шаг без удлинения
+            state.set_durations({works[v]: state.durations[v] - delta for v in backward})
+            backward = []
+
+        slope = sum(slopes[v] for v in forward) - sum(slopes[v] for v in backward)
+        cost += slope * delta
+        project_duration = state.project_duration
+        crashed = np.flatnonzero(state.durations < normal - cpm.CRITICAL_EPS).tolist()
+        yield CrashPoint(project_duration=project_duration, cost=cost, slope=slope,
+                         plan={works[v]: float(state.durations[v]) for v in crashed})
+
+
+def time_cost_curve(graph, crash_durations, crash_costs, schedule=None, target=None, step=None):
+    """
+    Кривая «срок — затраты» списком точек CrashPoint
+    """
+    return list(crash_steps(graph, crash_durations, crash_costs, schedule, target, step))
+
+
+def cheapest_reduction(graph, crash_durations, crash_costs, days, schedule=None):
+    """
+    Самый дешевый план сокращения срока проекта на days дней: последняя
+    точка кривой (если сократить на days нельзя — наибольшее возможное сокращение)
+    """
+    if schedule is None:
+        schedule = cpm.compute_schedule(graph)
+    target = schedule.project_duration - days
+    point = None
+    for point in crash_steps(graph, crash_durations, crash_costs, schedule, target=target):
+        pass
+    return point
+
+
+def load_project(csv_file_path, use_cache=True, cache_dir=None):
+    """
+    Чтение и валидация проекта с параметрами сокращения; возвращает граф,
+    минимальные продолжительности, затраты и ошибки
+    """
+    project = cache.load_compiled(csv_file_path, CRASH_COLUMNS, use_cache=use_cache, directory=cache_dir)
+    graph, errors = project.graph, project.errors
+    if graph is None:
+        return None, None, None, errors
+
+    crash_durations, crash_costs = crash_parameters(graph, project.extra)
+    crash_errors = validate_crash(graph.works, np.asarray(graph.durations), crash_durations, crash_costs)
+    if crash_errors:
+        return None, None, None, errors + crash_errors
+    return graph, crash_durations, crash_costs, errors
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Сокращение срока проекта с минимальными затратами")
+    parser.add_argument('csv_file', help="CSV файл проекта с колонками 6-7 (минимальная продолжительность, "
+                                         "затраты на сокращение до нее)")
+    parser.add_argument('-d', '--days', type=float, default=None,
+                        help="на сколько дней сократить срок (по умолчанию — до предела)")
+    parser.add_argument('--step', type=float, default=1.0,
+                        help="шаг кривой, дней (по умолчанию 1; 0 — только точки излома)")
+    cache.add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    args = parse_args(argv)
+    if args.clear_cache:
+        cache.clear(args.cache_dir)
+    graph, crash_durations, crash_costs, errors = load_project(args.csv_file, use_cache=not args.no_cache,
+                                                              cache_dir=args.cache_dir)
+    if graph is None:
+        print("✗ Невозможно выполнить сокращение:")
+        for i, error in enumerate(errors, 1):
+            print(f"  {i}. {error}")
+        return 1
+
+    schedule = cpm.compute_schedule(graph)
+    target = None if args.days is None else schedule.project_duration - args.days
+    curve = time_cost_curve(graph, crash_durations, crash_costs, schedule, target=target, step=args.step or None)
+
+    print(f"Нормальная длительность проекта: {schedule.project_duration:.1f} дней")
+    print(f"\n{'Срок':<8} {'Затраты':<12} {'За день':<10} Сокращено работ")
+    print("-" * 50)
+    for point in curve:
+        print(f"{point.project_duration:<8.1f} {point.cost:<12.2f} {point.slope:<10.2f} {len(point.plan)}")
+
+    final = curve[-1]
+    if target is not None and final.project_duration > target + cpm.CRITICAL_EPS:
+        print(f"\n⚠ Сократить срок на {args.days:g} дней нельзя: предел — "
+              f"{schedule.project_duration - final.project_duration:g} дней")
+    if final.plan:
+        print(f"\nПлан сокращения до {final.project_duration:.1f} дней (затраты {final.cost:.2f}):")
+        for work, duration in final.plan.items():
+            print(f"  {work:<8} {graph.durations[graph.index[work]]:g} → {duration:g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
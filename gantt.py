@@ -0,0 +1,168 @@
+"""
+Отрисовка диаграммы Ганта и графика загрузки рабочей силы (matplotlib).
+
+Модуль загружается NONE.create_gantt_chart только при построении
+диаграммы, поэтому расчетная часть NONE.py импортируется без matplotlib.
+pyplot подключается лишь для интерактивного окна; сохранение в файл идет
+через Figure без GUI-бэкенда.
+"""
+import matplotlib.dates as mdates
+import matplotlib.patches as patches
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+
+# Минимальная высота строки диаграммы Ганта в пикселях: если работ больше,
+# чем помещается строк такой высоты, соседние работы объединяются в сводные строки
+MIN_ROW_PIXELS = 2
+
+# Минимальная высота строки в пикселях, при которой выводятся подписи
+LABEL_ROW_PIXELS = 14
+
+# Минимальная ширина дня в пикселях для столбчатого графика рабочей силы
+BAR_DAY_PIXELS = 4
+
+
+def _bar_vertices(starts, finishes, rows, height):
+    """
+    Вершины прямоугольников полос (n x 4 x 2) для PolyCollection
+    """
+    verts = np.empty((len(starts), 4, 2))
+    verts[:, 0, 0] = verts[:, 3, 0] = starts
+    verts[:, 1, 0] = verts[:, 2, 0] = finishes
+    verts[:, 0, 1] = verts[:, 1, 1] = rows - height / 2
+    verts[:, 2, 1] = verts[:, 3, 1] = rows + height / 2
+    return verts
+
+
+def create_gantt_chart(df, early_start, early_finish, critical_path, profile, graph, output_path=None,
+                       start_date=None):
+    """
+    Создание улучшенной диаграммы Ганта с графиком рабочей силы.
+    Стрелки зависимостей берутся из графа cpm.ProjectGraph (graph).
+    С датой начала проекта start_date сроки — календарные дни от нее
+    (work_calendar.dated_schedule), и по оси времени откладываются даты.
+    Если задан output_path, рисунок сохраняется в файл (PNG/SVG/PDF по
+    расширению) без дисплея, иначе показывается окно plt.show().
+    """
+    if output_path is None:
+        import matplotlib.pyplot as plt
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12))
+    else:
+        # Неинтерактивная отрисовка: Figure без pyplot и GUI-бэкенда
+        fig = Figure(figsize=(16, 12))
+        ax1, ax2 = fig.subplots(2, 1)
+    
+    # Цвета
+    critical_color = '#ff6b6b'  # Красный для критического пути
+    normal_color = '#4ecdc4'    # Бирюзовый для обычных работ
+    workforce_color = '#45b7d1' # Синий для рабочей силы
+    
+    # Сортировка работ для красивого отображения
+    sorted_works = sorted(df['Работа'].unique())
+    row_of = {work: i for i, work in enumerate(sorted_works)}
+    critical_set = set(critical_path)
+    # Начало оси времени: 0 или дата начала проекта в единицах дат matplotlib (дни)
+    origin = 0.0 if start_date is None else float(mdates.date2num(np.datetime64(start_date, 'D')))
+    starts = origin + np.array([early_start[work] for work in sorted_works], dtype=float)
+    finishes = origin + np.array([early_finish[work] for work in sorted_works], dtype=float)
+    is_critical = np.array([work in critical_set for work in sorted_works], dtype=bool)
+    
+    # Уровень детализации: если строк больше, чем пикселей по высоте осей,
+    # соседние работы объединяются в сводные строки
+    axis_pixels = ax1.get_position().height * fig.get_figheight() * fig.dpi
+    group = max(1, -(-len(sorted_works) // max(1, int(axis_pixels // MIN_ROW_PIXELS))))
+    rows = np.arange(len(sorted_works)) // group
+    row_count = int(rows[-1]) + 1 if len(rows) else 0
+    row_pixels = axis_pixels / max(row_count, 1)
+    detailed = group == 1 and row_pixels >= LABEL_ROW_PIXELS
+    
+    # Диаграмма Ганта: все полосы одной коллекцией, критические поверх обычных
+    draw_order = np.argsort(is_critical, kind='stable')
+    bars = PolyCollection(_bar_vertices(starts[draw_order], finishes[draw_order], rows[draw_order], 0.6),
+                          facecolors=np.where(is_critical[draw_order], critical_color, normal_color),
+                          edgecolors='darkgray', linewidths=2 if detailed else 0, alpha=0.8)
+    ax1.add_collection(bars)
+    
+    # Подписи работ и длительностей — только если строки достаточно высокие
+    if detailed:
+        for i, work in enumerate(sorted_works):
+            duration = graph.durations[graph.index[work]]
+            ax1.text((starts[i] + finishes[i])/2, i, f'{work}\n({duration:g})',
+                    ha='center', va='center', fontweight='bold', fontsize=9)
+    
+    # Стрелки зависимостей (только для критического пути) одной коллекцией линий
+    segments = []
+    for work in critical_path:
+        node = graph.index[work]
+        for pred in graph.pred_idx[graph.pred_ptr[node]:graph.pred_ptr[node + 1]].tolist():
+            pred_work = graph.works[pred]
+            if pred_work in critical_set and pred_work in early_finish:
+                segments.append(((origin + early_finish[pred_work], rows[row_of[pred_work]]),
+                                 (origin + early_start[work], rows[row_of[work]])))
+    if segments:
+        line_width = 2 if detailed else 0.5
+        ax1.add_collection(LineCollection(segments, colors='red', linewidths=line_width, alpha=0.7))
+        heads = np.array([end for _, end in segments])
+        ax1.scatter(heads[:, 0], heads[:, 1], marker='>', color='red', s=12 * line_width ** 2, alpha=0.7, zorder=3)
+    
+    time_label = 'Время (дни)' if start_date is None else 'Дата'
+    ax1.set_xlabel(time_label, fontsize=12)
+    ax1.set_ylabel('Работы', fontsize=12)
+    ax1.set_title('Диаграмма Ганта с критическим путем', fontsize=14, fontweight='bold')
+    
+    # Подписи оси работ: для сводных строк — диапазон работ, с прореживанием
+    tick_step = max(1, -(-row_count // max(1, int(axis_pixels // LABEL_ROW_PIXELS))))
+    tick_rows = np.arange(0, row_count, tick_step)
+    if group == 1:
+        tick_labels = [sorted_works[row] for row in tick_rows]
+    else:
+        tick_labels = [f"{sorted_works[row * group]}…{sorted_works[min((row + 1) * group, len(sorted_works)) - 1]}"
+                       for row in tick_rows]
+    ax1.set_yticks(tick_rows)
+    ax1.set_yticklabels(tick_labels)
+    ax1.grid(True, alpha=0.3)
+    ax1.set_xlim(origin, origin + max(early_finish.values()) + 2)
+    ax1.set_ylim(-0.7, row_count - 0.3)
+    
+    # Легенда
+    critical_patch = patches.Patch(color=critical_color, label='Критический путь')
+    normal_patch = patches.Patch(color=normal_color, label='Обычные работы')
+    ax1.legend(handles=[critical_patch, normal_patch], loc='upper right')
+    
+    # График загрузки рабочей силы
+    project_duration = int(max(early_finish.values()))
+    
+    # Создание графика рабочей силы
+    days = origin + np.arange(profile.daily.size)
+    workforce_values = profile.daily
+    
+    axis_width = ax2.get_position().width * fig.get_figwidth() * fig.dpi
+    if days.size * BAR_DAY_PIXELS <= axis_width:
+        ax2.bar(days, workforce_values, color=workforce_color, alpha=0.7, edgecolor='darkblue', linewidth=0.5)
+        ax2.plot(days, workforce_values, color='darkblue', linewidth=2, marker='o', markersize=4)
+    else:
+        # Длинный горизонт: ступенчатая заливка вместо столбца на каждый день
+        ax2.fill_between(days, workforce_values, step='mid', color=workforce_color, alpha=0.7)
+        ax2.step(days, workforce_values, where='mid', color='darkblue', linewidth=1)
+    
+    ax2.set_xlabel(time_label, fontsize=12)
+    ax2.set_ylabel('Рабочая сила', fontsize=12)
+    ax2.set_title('Загрузка рабочей силы по времени', fontsize=14, fontweight='bold')
+    ax2.grid(True, alpha=0.3)
+    if start_date is None:
+        ax2.set_xticks(range(0, project_duration + 1, max(1, project_duration // 10)))
+    else:
+        for ax in (ax1, ax2):
+            locator = mdates.AutoDateLocator()
+            ax.xaxis.set_major_locator(locator)
+            ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+    ax2.set_xlim(origin, origin + project_duration)
+    
+    fig.tight_layout()
+    if output_path is None:
+        plt.show()
+    else:
+        fig.savefig(output_path)
+    
+    return fig
@@ -0,0 +1,300 @@
+"""
+Инкрементальный пересчет критического пути для сценариев «что если».
+
+Расписание хранится постоянно: ранние сроки (ES/EF) и «хвост» работы —
+длина самого длинного пути от ее окончания до конца проекта. Поздние сроки
+выражаются через хвост: LF = T - хвост, поэтому правка затрагивает ES/EF
+только в нисходящем конусе измененной работы, а хвосты — только в восходящем.
+Топологический порядок поддерживается алгоритмом Пирса–Келли, который
+заодно проверяет новое ребро на цикл.
+"""
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+import cpm
+
+EditResult = namedtuple('EditResult', [
+    'changed',           # работы с измененными ES/EF или LS/LF (относительно конца проекта)
+    'critical_path',     # критические работы в топологическом порядке
+    'project_duration',  # длительность проекта после правки
+])
+
+
+class IncrementalSchedule:
+    """
+    Постоянное расписание проекта с правками продолжительности,
+    рабочей силы и зависимостей
+    """
+
+    def __init__(self, graph, workforce=None, schedule=None):
+        if schedule is None:
+            schedule = cpm.compute_schedule(graph)
+
+        n = len(graph.works)
+        self.works = list(graph.works)
+        self.index = dict(graph.index)
+        self.durations = graph.durations.copy()
+        self.workforce = np.zeros(n) if workforce is None else np.asarray(workforce, dtype=np.float64).copy()
+
+        # Списки смежности изменяемы, в отличие от CSR
+        self.pred = [graph.pred_idx[graph.pred_ptr[i]:graph.pred_ptr[i + 1]].tolist() for i in range(n)]
+        self.succ = [graph.succ_idx[graph.succ_ptr[i]:graph.succ_ptr[i + 1]].tolist() for i in range(n)]
+
+        self.order = np.asarray(schedule.order, dtype=np.int64).copy()
+        self.position = np.empty(n, dtype=np.int64)
+        self.position[self.order] = np.arange(n)
+
+        self.early_start = schedule.early_start.copy()
+        self.early_finish = schedule.early_finish.copy()
+        self.tail = schedule.project_duration - schedule.late_finish
+
+    @classmethod
+    def from_dataframe(cls, df, G):
+        """
+        Построение по результатам validate_dependencies (df и граф G) тем же
+        преобразованием, что и NONE.compile_project
+        """
+        import NONE  # pandas нужен только при построении по DataFrame
+
+        graph, workforce = NONE.compile_project(df, G)
+        return cls(graph, workforce)
+
+    # ------------------------------------------------------------------
+    # Текущее состояние
+
+    @property
+    def project_duration(self):
+        return float(self.early_finish.max()) if self.early_finish.size else 0.0
+
+    @property
+    def late_finish(self):
+        return self.project_duration - self.tail
+
+    @property
+    def late_start(self):
+        return self.late_finish - self.durations
+
+    @property
+    def total_slack(self):
+        return self.late_start - self.early_start
+
+    def critical_path(self):
+        """
+        Критические работы в топологическом порядке
+        """
+        is_critical = np.abs(self.total_slack) < cpm.CRITICAL_EPS
+        return [self.works[node] for node in self.order[is_critical[self.order]].tolist()]
+
+    def schedule(self):
+        """
+        Снимок расписания в формате cpm.Schedule
+        """
+        late_finish = self.late_finish
+        late_start = late_finish - self.durations
+        return cpm.Schedule(
+            order=self.order.copy(),
+            early_start=self.early_start.copy(),
+            early_finish=self.early_finish.copy(),
+            late_start=late_start,
+            late_finish=late_finish,
+            total_slack=late_start - self.early_start,
+            project_duration=self.project_duration,
+        )
+
+    # ------------------------------------------------------------------
+    # Правки
+
+    def set_duration(self, work, duration):
+        """
+        Изменение продолжительности работы
+        """
+        node = self._node(work)
+        if duration <= 0:
+            raise ValueError(f"Продолжительность должна быть положительной (получено {duration})")
+        self.durations[node] = duration
+        changed = self._propagate_forward([node])
+        changed |= self._propagate_backward(self.pred[node])
+        changed.add(node)
+        return self._result(changed)
+
+    def set_durations(self, durations):
+        """
+        Изменение продолжительности нескольких работ (словарь работа ->
+        продолжительность) с одним пересчетом объединенных конусов
+        """
+        nodes = [self._node(work) for work in durations]
+        for work, duration in durations.items():
+            if duration <= 0:
+                raise ValueError(f"Продолжительность работы '{work}' должна быть положительной (получено {duration})")
+        self.durations[nodes] = list(durations.values())
+        changed = self._propagate_forward(nodes)
+        changed |= self._propagate_backward([pred for node in nodes for pred in self.pred[node]])
+        changed.update(nodes)
+        return self._result(changed)
+
+    def set_workforce(self, work, workforce):
+        """
+        Изменение рабочей силы работы (сроки не меняются)
+        """
+        node = self._node(work)
+        if workforce < 0:
+            raise ValueError(f"Рабочая сила не может быть отрицательной (получено {workforce})")
+        self.workforce[node] = workforce
+        return self._result(set())
+
+    def add_dependency(self, pred_work, succ_work):
+        """
+        Добавление зависимости pred_work -> succ_work с проверкой на цикл
+        """
+        u, v = self._node(pred_work), self._node(succ_work)
+        if v in self.succ[u]:
+            return self._result(set())
+
+        self._reorder_for_edge(u, v)
+        self.succ[u].append(v)
+        self.pred[v].append(u)
+
+        changed = self._propagate_forward([v])
+        changed |= self._propagate_backward([u])
+        return self._result(changed)
+
+    def remove_dependency(self, pred_work, succ_work):
+        """
+        Удаление зависимости pred_work -> succ_work
+        """
+        u, v = self._node(pred_work), self._node(succ_work)
+        if v not in self.succ[u]:
+            raise ValueError(f"Зависимость {pred_work}->{succ_work} не существует")
+
+        # Топологический порядок при удалении ребра остается корректным
+        self.succ[u].remove(v)
+        self.pred[v].remove(u)
+
+        changed = self._propagate_forward([v])
+        changed |= self._propagate_backward([u])
+        return self._result(changed)
+
+    # ------------------------------------------------------------------
+    # Внутренние операции
+
+    def _node(self, work):
+        try:
+            return self.index[work]
+        except KeyError:
+            raise ValueError(f"Работа '{work}' не существует") from None
+
+    def _result(self, changed):
+        changed = sorted(changed, key=self.position.__getitem__)
+        return EditResult(
+            changed=[self.works[node] for node in changed],
+            critical_path=self.critical_path(),
+            project_duration=self.project_duration,
+        )
+
+    def _propagate_forward(self, seeds):
+        """
+        Пересчет ES/EF в нисходящем конусе seeds в топологическом порядке
+        """
+        early_start, early_finish, durations = self.early_start, self.early_finish, self.durations
+        position = self.position
+        heap = [(position[node], node) for node in set(seeds)]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        changed = set()
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            start = max([early_finish[p] for p in self.pred[node]], default=0.0)
+            start = max(start, 0.0)
+            finish = start + durations[node]
+            if start == early_start[node] and finish == early_finish[node]:
+                continue
+
+            early_start[node] = start
+            early_finish[node] = finish
+            changed.add(node)
+            for succ in self.succ[node]:
+                if succ not in queued:
+                    queued.add(succ)
+                    heapq.heappush(heap, (position[succ], succ))
+
+        return changed
+
+    def _propagate_backward(self, seeds):
+        """
+        Пересчет хвостов (LS/LF относительно конца проекта) в восходящем конусе seeds
+        """
+        tail, durations = self.tail, self.durations
+        position = self.position
+        heap = [(-position[node], node) for node in set(seeds)]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        changed = set()
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            value = max([durations[s] + tail[s] for s in self.succ[node]], default=0.0)
+            if value == tail[node]:
+                continue
+
+            tail[node] = value
+            changed.add(node)
+            for pred in self.pred[node]:
+                if pred not in queued:
+                    queued.add(pred)
+                    heapq.heappush(heap, (-position[pred], pred))
+
+        return changed
+
+    def _reorder_for_edge(self, u, v):
+        """
+        Алгоритм Пирса–Келли: локальное исправление топологического порядка
+        перед вставкой ребра u -> v; CycleError, если ребро замыкает цикл
+        """
+        position = self.position
+        lower, upper = position[v], position[u]
+        if u == v:
+            raise cpm.CycleError(f"Работа '{self.works[u]}' не может зависеть от самой себя")
+        if lower > upper:
+            return
+
+        # Прямой поиск от v в пределах позиций <= upper
+        parent = {v: None}
+        stack = [v]
+        forward = []
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            for succ in self.succ[node]:
+                if succ == u:
+                    cycle = [u]
+                    while node is not None:
+                        cycle.append(node)
+                        node = parent[node]
+                    names = [self.works[i] for i in [u] + cycle[::-1][:-1]]
+                    raise cpm.CycleError("Зависимость создает цикл: " + " -> ".join(names + [names[0]]))
+                if succ not in parent and position[succ] <= upper:
+                    parent[succ] = node
+                    stack.append(succ)
+
+        # Обратный поиск от u в пределах позиций >= lower
+        seen = {u}
+        stack = [u]
+        backward = []
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            for pred in self.pred[node]:
+                if pred not in seen and position[pred] >= lower:
+                    seen.add(pred)
+                    stack.append(pred)
+
+        # Предшественники u встают перед потомками v на освободившиеся позиции
+        backward.sort(key=position.__getitem__)
+        forward.sort(key=position.__getitem__)
+        nodes = np.array(backward + forward, dtype=np.int64)
+        slots = np.sort(position[nodes])
+        position[nodes] = slots
+        self.order[slots] = nodes
@@ -0,0 +1,225 @@
+"""
+Инструментирование этапов расчета: время, память, счетчики и сообщения.
+
+Активный регистратор хранится в контекстной переменной: библиотечные
+функции NONE.py обращаются к current() и отмечают счетчики (работы, рёбра,
+найденные циклы, ошибки) и информационные сообщения, не печатая их. Пока
+регистратор не включен через recording(), используется пустой
+регистратор, вызовы которого ничего не делают.
+
+Пример:
+    recorder = instrument.Recorder(memory=True)
+    with instrument.recording(recorder):
+        with recorder.stage('read'):
+            df, errors = NONE.read_project_data(path)
+    recorder.write_report('report.json')
+    recorder.write_trace('trace.json')   # chrome://tracing, Perfetto
+"""
+import contextlib
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Множитель ru_maxrss до байтов: Linux сообщает килобайты, macOS — байты
+_MAXRSS_SCALE = 1 if sys.platform == 'darwin' else 1024
+
+
+def _max_rss():
+    """
+    Наибольший резидентный размер процесса с момента запуска, байт (None, если недоступно)
+    """
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_SCALE
+
+
+class Recorder:
+    """
+    Регистратор этапов: реальное и процессорное время, пик памяти,
+    счетчики и сообщения. memory=True включает tracemalloc (заметно
+    замедляет выполнение), без него память оценивается по пику RSS процесса.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.stages = []
+        self.counters = {}
+        self.messages = []
+        self._active = []
+        self._peaks = []
+        self._taken = 0
+        self._origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Замер этапа; этапы могут быть вложенными
+        """
+        record = {'name': name, 'depth': len(self._active), 'start': time.perf_counter() - self._origin,
+                  'wall': None, 'cpu': None, 'peak_memory': None, 'max_rss': None, 'counters': {}}
+        self.stages.append(record)
+        self._active.append(record)
+
+        started_tracing = False
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            else:
+                # Пик внешнего этапа до начала вложенного сохраняется перед сбросом
+                self._fold_peak()
+                if hasattr(tracemalloc, 'reset_peak'):
+                    tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            self._peaks.append(base)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall'] = time.perf_counter() - wall
+            record['cpu'] = time.process_time() - cpu
+            record['max_rss'] = _max_rss()
+            if self.memory:
+                self._fold_peak()
+                peak = self._peaks.pop()
+                record['peak_memory'] = max(peak - base, 0)
+                # Пик вложенного этапа входит в пик внешнего
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                if started_tracing:
+                    tracemalloc.stop()
+            self._active.pop()
+
+    def _fold_peak(self):
+        """
+        Учет пика tracemalloc с последнего сброса в пике текущего этапа
+        """
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+
+    def count(self, name, value=1):
+        """
+        Прибавить value к счетчику текущего этапа и к итоговому счетчику
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+        if self._active:
+            counters = self._active[-1]['counters']
+            counters[name] = counters.get(name, 0) + value
+
+    def note(self, message):
+        """
+        Информационное сообщение (вместо печати в библиотечном коде)
+        """
+        stage = self._active[-1]['name'] if self._active else None
+        self.messages.append({'stage': stage, 'time': time.perf_counter() - self._origin, 'message': message})
+
+    def take_messages(self):
+        """
+        Сообщения, появившиеся после предыдущего вызова (для вывода по ходу работы)
+        """
+        messages = [item['message'] for item in self.messages[self._taken:]]
+        self._taken = len(self.messages)
+        return messages
+
+    def report(self):
+        """
+        Структурированный отчет: этапы, итоговые счетчики и сообщения
+        """
+        return {
+            'total_wall': time.perf_counter() - self._origin,
+            'stages': [dict(record, counters=dict(record['counters'])) for record in self.stages],
+            'counters': dict(self.counters),
+            'messages': list(self.messages),
+        }
+
+    def write_report(self, path):
+        """
+        Запись отчета в JSON
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, ensure_ascii=False, indent=2)
+
+    def write_trace(self, path):
+        """
+        Запись трассы в формате Trace Event (chrome://tracing, Perfetto)
+        """
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        for record in self.stages:
+            if record['wall'] is None:
+                continue
+            args = dict(record['counters'], cpu=record['cpu'])
+            if record['peak_memory'] is not None:
+                args['peak_memory'] = record['peak_memory']
+            events.append({'name': record['name'], 'ph': 'X', 'pid': pid, 'tid': tid,
+                           'ts': record['start'] * 1e6, 'dur': record['wall'] * 1e6, 'args': args})
+        for item in self.messages:
+            events.append({'name': item['message'], 'ph': 'i', 's': 't', 'pid': pid, 'tid': tid,
+                           'ts': item['time'] * 1e6})
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file, ensure_ascii=False)
+
+
+class _NullRecorder:
+    """
+    Пустой регистратор: используется, когда инструментирование выключено
+    """
+    _nothing = contextlib.nullcontext()
+
+    def stage(self, name):
+        return self._nothing
+
+    def count(self, name, value=1):
+        pass
+
+    def note(self, message):
+        pass
+
+
+NULL_RECORDER = _NullRecorder()
+
+_current = contextvars.ContextVar('gantt_recorder', default=NULL_RECORDER)
+
+
+def current():
+    """
+    Активный регистратор (пустой, если инструментирование не включено)
+    """
+    return _current.get()
+
+
+@contextlib.contextmanager
+def recording(recorder):
+    """
+    Сделать recorder активным в пределах блока
+    """
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+def format_report(report):
+    """
+    Текстовая таблица этапов отчета
+    """
+    lines = [f"{'Этап':<28} {'Время, с':>9} {'CPU, с':>9} {'Пик, МБ':>8}  Счетчики", "-" * 80]
+    for record in report['stages']:
+        if record['wall'] is None:
+            continue
+        memory = '—' if record['peak_memory'] is None else f"{record['peak_memory'] / 2**20:.1f}"
+        counters = ', '.join(f"{name}={value:g}" for name, value in record['counters'].items())
+        name = '  ' * record['depth'] + record['name']
+        lines.append(f"{name:<28} {record['wall']:>9.4f} {record['cpu']:>9.4f} {memory:>8}  {counters}")
+    return '\n'.join(lines)
@@ -0,0 +1,139 @@
+"""
+Ранжированные самые длинные пути графа проекта (критические и почти критические).
+
+Путь — цепочка работ от начальной работы (без предшественников) до
+конечной (без последователей); его длина — сумма продолжительностей работ,
+резерв пути — срок проекта минус длина. Критические пути — пути с нулевым
+резервом; их может быть несколько, и плоский список работ с нулевым
+резервом из calculate_critical_path путем в общем случае не является.
+
+Пути перечисляются лениво в порядке убывания длины поиском по лучшему
+первому: состояние — начало пути, приоритет — его длина плюс самый
+длинный «хвост» от последней работы до конца проекта (динамическое
+программирование по DAG; совпадает со сроком проекта минус позднее
+начало CPM). Оценка точная, поэтому каждое раскрытое состояние
+продолжается хотя бы одним путем не короче текущего порога, а работа
+пропорциональна числу выданных путей и их длине, даже если всего путей
+в графе миллионы.
+
+Пример:
+    python longest_paths.py DATA.csv -k 10 --max-slack 3
+"""
+import argparse
+import heapq
+import itertools
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+import cache
+import cpm
+
+RankedPath = namedtuple('RankedPath', [
+    'length',   # сумма продолжительностей работ пути
+    'slack',    # срок проекта минус длина пути
+    'nodes',    # индексы работ пути от начальной до конечной
+    'works',    # идентификаторы работ пути
+    'edges',    # зависимости пути: список пар (предшественник, последователь)
+])
+
+
+def ranked_paths(graph, schedule=None, max_slack=None):
+    """
+    Генератор путей в порядке убывания длины (при равенстве — в порядке
+    обнаружения). max_slack ограничивает резерв выдаваемых путей: 0 —
+    только критические пути (с погрешностью cpm.CRITICAL_EPS).
+    """
+    if schedule is None:
+        schedule = cpm.compute_schedule(graph)
+    durations = graph.durations
+    # Самый длинный путь от работы (включительно) до конца проекта
+    tails = schedule.project_duration - schedule.late_start
+    succ_ptr, succ_idx = graph.succ_ptr, graph.succ_idx
+    project_duration = schedule.project_duration
+    threshold = None if max_slack is None else project_duration - max_slack - cpm.CRITICAL_EPS
+
+    # Состояние: (-оценка, номер, длина начала пути, работа, состояние-родитель)
+    counter = itertools.count()
+    heap = []
+    for node in np.flatnonzero(np.diff(graph.pred_ptr) == 0).tolist():
+        heap.append((-float(tails[node]), next(counter), float(durations[node]), node, None))
+    heapq.heapify(heap)
+
+    while heap:
+        bound, _, length, node, parent = heapq.heappop(heap)
+        if threshold is not None and -bound < threshold:
+            return
+        start, end = succ_ptr[node], succ_ptr[node + 1]
+        if start == end:
+            nodes = []
+            state = (node, parent)
+            while state is not None:
+                nodes.append(state[0])
+                state = state[1]
+            nodes.reverse()
+            works = [graph.works[i] for i in nodes]
+            yield RankedPath(length=length, slack=project_duration - length, nodes=nodes,
+                             works=works, edges=list(zip(works, works[1:])))
+            continue
+        state = (node, parent)
+        for succ in succ_idx[start:end].tolist():
+            succ_length = length + float(durations[succ])
+            succ_bound = length + float(tails[succ])
+            if threshold is None or succ_bound >= threshold:
+                heapq.heappush(heap, (-succ_bound, next(counter), succ_length, succ, state))
+
+
+def top_paths(graph, k, schedule=None, max_slack=None):
+    """
+    Не более k самых длинных путей
+    """
+    return list(itertools.islice(ranked_paths(graph, schedule, max_slack), k))
+
+
+def critical_paths(graph, schedule=None, limit=None):
+    """
+    Критические пути (нулевой резерв) как цепочки работ; limit ограничивает их число
+    """
+    paths = ranked_paths(graph, schedule, max_slack=0.0)
+    return list(paths if limit is None else itertools.islice(paths, limit))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Критические и почти критические пути проекта")
+    parser.add_argument('csv_file', help="CSV файл проекта")
+    parser.add_argument('-k', '--top', type=int, default=10, help="число выводимых путей (по умолчанию 10)")
+    parser.add_argument('--max-slack', type=float, default=None,
+                        help="выводить только пути с резервом не больше заданного, дней")
+    cache.add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    args = parse_args(argv)
+    if args.clear_cache:
+        cache.clear(args.cache_dir)
+    project = cache.load_compiled(args.csv_file, use_cache=not args.no_cache, directory=args.cache_dir)
+    if project.graph is None:
+        print("✗ Невозможно построить пути:")
+        for i, error in enumerate(project.errors, 1):
+            print(f"  {i}. {error}")
+        return 1
+
+    schedule = cpm.compute_schedule(project.graph)
+    print(f"Длительность проекта: {schedule.project_duration:.1f} дней")
+    print(f"\n{'№':<4} {'Длина':<8} {'Резерв':<8} Путь")
+    print("-" * 60)
+    for i, path in enumerate(ranked_paths(project.graph, schedule, args.max_slack), 1):
+        if i > args.top:
+            break
+        print(f"{i:<4} {path.length:<8.1f} {path.slack:<8.1f} {' → '.join(path.works)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
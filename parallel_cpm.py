@@ -0,0 +1,218 @@
+"""
+Параллельный расчет CPM по компонентам слабой связности.
+
+Компоненты графа не связаны зависимостями, поэтому их расписания
+считаются независимо. Компоненты распределяются по рабочим процессам
+(жадно, по числу работ и рёбер), массивы графа и результатов лежат в
+разделяемой памяти (multiprocessing.shared_memory) и не копируются
+через каналы. Расчет идет в две фазы: после прямого прохода каждый
+процесс сообщает срок своей части, общий срок проекта (максимум)
+возвращается всем процессам, и обратный проход считает поздние сроки и
+резервы относительно общего срока.
+
+Проект с одной компонентой считается в текущем процессе волновым
+фронтом по топологическим уровням (cpm.compute_schedule).
+
+Пример:
+    schedule = parallel_cpm.compute_schedule(graph, workers=16)
+"""
+import contextlib
+import heapq
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import cpm
+
+# Проекты меньше этого числа работ считаются в текущем процессе:
+# запуск процессов и копирование в разделяемую память дороже расчета
+PARALLEL_MIN_TASKS = 50_000
+
+GRAPH_ARRAYS = ('durations', 'pred_ptr', 'pred_idx', 'succ_ptr', 'succ_idx')
+RESULT_ARRAYS = ('early_start', 'early_finish', 'late_start', 'late_finish', 'level', 'rank')
+
+
+def _share(arrays):
+    """
+    Копирование массивов в блоки разделяемой памяти. Возвращает блоки,
+    описание {имя: (имя блока, тип, форма)} для рабочих процессов и
+    массивы-представления блоков.
+    """
+    blocks = []
+    spec = {}
+    views = {}
+    try:
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            views[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            views[name][...] = array
+            spec[name] = (block.name, array.dtype.str, array.shape)
+    except BaseException:
+        views.clear()
+        _release(blocks)
+        raise
+    return blocks, spec, views
+
+
+def _attach(spec):
+    """
+    Подключение к блокам разделяемой памяти по описанию из _share
+    """
+    blocks = []
+    arrays = {}
+    for name, (block_name, dtype, shape) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return blocks, arrays
+
+
+def _release(blocks, unlink=True):
+    """
+    Закрытие (и удаление) блоков разделяемой памяти; представления
+    блоков к этому моменту должны быть освобождены
+    """
+    for block in blocks:
+        with contextlib.suppress(OSError):
+            block.close()
+            if unlink:
+                block.unlink()
+
+
+def _partition(labels, weights, parts):
+    """
+    Распределение компонент по parts частям: самая тяжелая компонента —
+    в наименее загруженную часть. Возвращает номер части каждой работы.
+    """
+    roots = np.unique(labels)
+    loads = np.bincount(labels, weights=weights)[roots]
+    heap = [(0.0, part) for part in range(parts)]
+    assigned = np.empty(len(loads), dtype=np.int64)
+    for component in np.argsort(-loads, kind='stable').tolist():
+        load, part = heapq.heappop(heap)
+        assigned[component] = part
+        heapq.heappush(heap, (load + loads[component], part))
+    return assigned[np.searchsorted(roots, labels)]
+
+
+def _worker(conn, spec, part):
+    """
+    Расчет расписания работ одной части: прямой проход, ожидание общего
+    срока проекта, обратный проход. Результаты записываются в разделяемую память.
+    """
+    blocks, arrays = _attach(spec)
+    try:
+        n = len(arrays['durations'])
+        graph = cpm.ProjectGraph(works=range(n), index={}, **{name: arrays[name] for name in GRAPH_ARRAYS})
+        nodes = np.flatnonzero(arrays['part'] == part)
+        local = cpm.subgraph(graph, nodes, works=range(nodes.size))
+        try:
+            generations = cpm.topological_generations(local)
+        except cpm.CycleError as e:
+            conn.send(('cycle', str(e)))
+            return
+
+        early_start, early_finish = cpm.forward_levels(local, generations)
+        arrays['early_start'][nodes] = early_start
+        arrays['early_finish'][nodes] = early_finish
+        rank = 0
+        for level, members in enumerate(generations):
+            arrays['level'][nodes[members]] = level
+            arrays['rank'][nodes[members]] = np.arange(rank, rank + members.size)
+            rank += members.size
+        conn.send(('forward', float(early_finish.max()) if early_finish.size else 0.0))
+
+        try:
+            project_duration = conn.recv()
+        except EOFError:
+            return  # расчет прерван ошибкой в другой части
+        late_start, late_finish = cpm.backward_levels(local, generations, project_duration)
+        arrays['late_start'][nodes] = late_start
+        arrays['late_finish'][nodes] = late_finish
+        conn.send(('done', None))
+    finally:
+        arrays.clear()
+        _release(blocks, unlink=False)
+        conn.close()
+
+
+def _receive(conn, process):
+    """
+    Сообщение рабочего процесса; аварийное завершение процесса — RuntimeError
+    """
+    try:
+        kind, value = conn.recv()
+    except EOFError:
+        raise RuntimeError(f"Рабочий процесс расчета CPM аварийно завершился (код {process.exitcode})") from None
+    if kind == 'cycle':
+        raise cpm.CycleError(value)
+    return value
+
+
+def compute_schedule(graph, workers=None, min_tasks=PARALLEL_MIN_TASKS):
+    """
+    Расчет CPM с распределением компонент слабой связности по workers
+    процессам (по умолчанию — по числу ядер). Сроки и резервы совпадают с
+    cpm.compute_schedule; в порядке order работы одного топологического
+    уровня сгруппированы по частям графа.
+    """
+    n = len(graph.works)
+    workers = workers or os.cpu_count() or 1
+    # Демонические процессы (например, рабочие процессы batch.py) не могут порождать дочерние
+    if workers <= 1 or n < min_tasks or multiprocessing.current_process().daemon:
+        return cpm.compute_schedule(graph)
+
+    labels = cpm.weak_components(graph)
+    components = np.unique(labels).size
+    if components == 1:
+        return cpm.compute_schedule(graph)
+
+    parts = min(workers, components)
+    weights = 1.0 + np.diff(graph.succ_ptr)
+    arrays = {name: np.asarray(getattr(graph, name)) for name in GRAPH_ARRAYS}
+    arrays['part'] = _partition(labels, weights, parts)
+    for name in RESULT_ARRAYS:
+        arrays[name] = np.zeros(n, dtype=np.int64 if name in ('level', 'rank') else np.float64)
+
+    context = multiprocessing.get_context()
+    blocks, spec, views = _share(arrays)
+    processes = []
+    try:
+        for part in range(parts):
+            conn, child_conn = context.Pipe()
+            process = context.Process(target=_worker, args=(child_conn, spec, part), daemon=True)
+            process.start()
+            child_conn.close()
+            processes.append((conn, process))
+
+        project_duration = max(_receive(conn, process) for conn, process in processes)
+        for conn, _ in processes:
+            conn.send(project_duration)
+        for conn, process in processes:
+            _receive(conn, process)
+
+        result = {name: views[name].copy() for name in RESULT_ARRAYS}
+    finally:
+        for conn, process in processes:
+            conn.close()
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        views.clear()
+        _release(blocks)
+
+    # Общий топологический порядок: по уровням, внутри уровня — по частям
+    order = np.lexsort((result['rank'], arrays['part'], result['level']))
+    return cpm.Schedule(
+        order=order,
+        early_start=result['early_start'],
+        early_finish=result['early_finish'],
+        late_start=result['late_start'],
+        late_finish=result['late_finish'],
+        total_slack=result['late_start'] - result['early_start'],
+        project_duration=project_duration,
+    )
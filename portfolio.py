@@ -0,0 +1,292 @@
+"""
+Портфель проектов с общим пулом рабочей силы.
+
+Каждый проект портфеля рассчитывается независимо (кэш проверенных
+проектов, CPM, дневной профиль рабочей силы) в пуле процессов; процессы
+возвращают только компактные дневные профили. Общий профиль — сумма
+профилей проектов, сдвинутых на дни начала проектов, на общей шкале дней.
+Дни, в которых общая загрузка превышает общую численность (capacity),
+объединяются в конфликты с перечнем проектов, дающих загрузку.
+
+Выравнивание идет на уровне проектов: проекты по порядку (день начала,
+затем порядок перечисления) сдвигаются на самый ранний день, с которого их
+профиль помещается в остаток численности. Поиск сдвига перескакивает
+заведомо недопустимые сдвиги: при нарушении в день t следующий кандидат —
+ближайший сдвиг, при котором на день t приходится день проекта с
+загрузкой не выше остатка. Проект, который сам по себе превышает
+численность, заранее выравнивается по работам в своем процессе
+(leveling.level_resources).
+
+Пример:
+    python portfolio.py "projects/*.csv" --capacity 400 --workers 8
+"""
+import argparse
+import functools
+import multiprocessing
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import cache
+import cpm
+import leveling
+import workload
+
+# Погрешность сравнения загрузки с численностью
+CAPACITY_EPS = 1e-9
+
+ProjectPlan = namedtuple('ProjectPlan', [
+    'path',              # путь к CSV файлу проекта
+    'status',            # 'ok', 'invalid' (ошибки данных) или 'error'
+    'errors',            # сообщения об ошибках
+    'tasks',             # число работ
+    'project_duration',  # длительность проекта (после выравнивания по работам, если оно было)
+    'daily',             # float64[days] средняя загрузка по дням от начала проекта
+    'leveled',           # проект выровнен по работам, так как сам превышает численность
+])
+
+Conflict = namedtuple('Conflict', [
+    'begin',     # первый день конфликта
+    'end',       # день после последнего дня конфликта
+    'peak',      # наибольшая общая загрузка в конфликте
+    'projects',  # пути проектов с загрузкой в конфликте, по убыванию вклада
+])
+
+PortfolioResult = namedtuple('PortfolioResult', [
+    'projects',           # список ProjectPlan в порядке перечисления
+    'release',            # float64[p] дни начала проектов без выравнивания
+    'combined',           # float64[days] общий профиль без выравнивания
+    'conflicts',          # конфликты общего профиля с численностью
+    'offsets',            # float64[p] дни начала после выравнивания (без численности — release)
+    'leveled_combined',   # float64[days] общий профиль после выравнивания
+    'duration',           # срок портфеля без выравнивания
+    'leveled_duration',   # срок портфеля после выравнивания
+])
+
+
+def plan_project(path, capacity=None, use_cache=True, cache_dir=None):
+    """
+    Расчет одного проекта портфеля: CPM и дневной профиль рабочей силы.
+    Если профиль проекта сам превышает capacity, проект выравнивается по работам.
+    """
+    try:
+        project = cache.load_compiled(path, use_cache=use_cache, directory=cache_dir)
+        graph, workforce = project.graph, project.workforce
+        if graph is None:
+            return ProjectPlan(path, 'invalid', project.errors, project.rows, 0.0, np.zeros(0), False)
+
+        schedule = cpm.compute_schedule(graph)
+        starts, finishes, duration = schedule.early_start, schedule.early_finish, schedule.project_duration
+        daily = workload.daily_load(starts, finishes, workforce, int(np.ceil(duration)))
+        leveled = False
+        if capacity is not None and daily.size and daily.max() > capacity + CAPACITY_EPS:
+            result = leveling.level_resources(graph, workforce, capacity, schedule)
+            duration = result.project_duration
+            daily = workload.daily_load(result.start, result.finish, workforce, int(np.ceil(duration)))
+            leveled = True
+        return ProjectPlan(path, 'ok', [], len(graph.works), float(duration), daily, leveled)
+    except (ValueError, OSError) as e:
+        # cpm.CycleError и превышение численности одной работой — подклассы ValueError
+        return ProjectPlan(path, 'error', [f"Ошибка расчета: {e}"], 0, 0.0, np.zeros(0), False)
+
+
+def plan_projects(paths, capacity=None, workers=None, use_cache=True, cache_dir=None):
+    """
+    Расчет проектов портфеля в workers процессах (по умолчанию — по числу ядер)
+    """
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    task = functools.partial(plan_project, capacity=capacity, use_cache=use_cache, cache_dir=cache_dir)
+    # Демонические процессы (например, рабочие процессы batch.py) не могут порождать дочерние
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        return [task(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(task, paths, chunksize=max(1, len(paths) // (4 * workers))))
+
+
+def combine(profiles, offsets, days=None):
+    """
+    Общий профиль: сумма дневных профилей, сдвинутых на целые дни offsets
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    ends = offsets + np.array([profile.size for profile in profiles], dtype=np.int64)
+    if days is None:
+        days = int(ends.max(initial=0))
+    combined = np.zeros(days)
+    for profile, offset, end in zip(profiles, offsets.tolist(), ends.tolist()):
+        combined[offset:end] += profile
+    return combined
+
+
+def find_conflicts(combined, capacity, profiles, offsets, paths):
+    """
+    Серии дней с общей загрузкой выше capacity и проекты, загружающие их
+    """
+    over = combined > capacity + CAPACITY_EPS
+    edges = np.diff(np.concatenate([[False], over, [False]]).astype(np.int8))
+    begins = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if not begins.size:
+        return []
+
+    # Вклад проекта в каждую серию — по префиксным суммам его профиля
+    contribution = np.zeros((begins.size, len(profiles)))
+    for p, (profile, offset) in enumerate(zip(profiles, np.asarray(offsets, dtype=np.int64).tolist())):
+        if not profile.size:
+            continue
+        prefix = np.concatenate([[0.0], np.cumsum(profile)])
+        lo = np.clip(begins - offset, 0, profile.size)
+        hi = np.clip(ends - offset, 0, profile.size)
+        contribution[:, p] = prefix[hi] - prefix[lo]
+
+    conflicts = []
+    for k, (begin, end) in enumerate(zip(begins.tolist(), ends.tolist())):
+        order = np.argsort(-contribution[k], kind='stable')
+        projects = [paths[p] for p in order.tolist() if contribution[k, p] > CAPACITY_EPS]
+        conflicts.append(Conflict(begin, end, float(combined[begin:end].max()), projects))
+    return conflicts
+
+
+def _skip(residual, profile, offset, index):
+    """
+    Ближайший сдвиг после offset, при котором на день нарушения
+    offset + index приходится день проекта с загрузкой не выше остатка
+    """
+    day = offset + index
+    fits = np.flatnonzero(profile[:index] <= residual[day] + CAPACITY_EPS)
+    return day - int(fits[-1]) if fits.size else day + 1
+
+
+def _earliest_fit(residual, profile, release):
+    """
+    Самый ранний сдвиг >= release, при котором profile помещается в residual.
+    При нарушении в день t кандидаты, ставящие на день t дни проекта с
+    загрузкой выше остатка, пропускаются все сразу. Кандидаты также
+    ограничены сдвигами, при которых пиковый день проекта попадает на день
+    с остатком не ниже пика.
+    """
+    length = profile.size
+    peak_day = int(profile.argmax())
+    candidates = np.flatnonzero(residual[release + peak_day:] + CAPACITY_EPS >= profile[peak_day]) + release
+    offset = int(candidates[0])
+    while True:
+        bad = np.flatnonzero(profile > residual[offset:offset + length] + CAPACITY_EPS)
+        if not bad.size:
+            return offset
+        # Безопасный скачок дает любое нарушение; берется больший из скачков
+        # по первому и последнему нарушению
+        offset = max(_skip(residual, profile, offset, int(bad[0])), _skip(residual, profile, offset, int(bad[-1])))
+        offset = int(candidates[np.searchsorted(candidates, offset)])
+
+
+def level_portfolio(profiles, release, capacity):
+    """
+    Сдвиги проектов, при которых общий профиль не превышает capacity.
+    Проекты размещаются по дню начала, затем по порядку перечисления;
+    профиль, который сам превышает capacity, размещается без проверки.
+    """
+    release = np.asarray(release, dtype=np.int64)
+    lengths = np.array([profile.size for profile in profiles], dtype=np.int64)
+    # Последовательное размещение всегда помещается в сумму длительностей
+    residual = np.full(int(release.max(initial=0) + lengths.sum()) + 1, float(capacity))
+    offsets = release.copy()
+    for p in np.lexsort((np.arange(len(profiles)), release)).tolist():
+        profile = profiles[p]
+        if not profile.size:
+            continue
+        if profile.max() <= capacity + CAPACITY_EPS:
+            offsets[p] = _earliest_fit(residual, profile, int(release[p]))
+        residual[offsets[p]:offsets[p] + profile.size] -= profile
+    return offsets
+
+
+def analyze_portfolio(paths, capacity=None, release=None, workers=None, use_cache=True, cache_dir=None):
+    """
+    Портфель проектов: расчет проектов в пуле процессов, общий профиль
+    рабочей силы, конфликты с численностью capacity и выравнивание
+    сдвигом проектов. release — дни начала проектов (по умолчанию 0).
+    """
+    plans = plan_projects(paths, capacity, workers, use_cache, cache_dir)
+    profiles = [plan.daily for plan in plans]
+    durations = np.array([plan.project_duration for plan in plans])
+    release = np.zeros(len(plans), dtype=np.int64) if release is None else np.asarray(release, dtype=np.int64)
+
+    combined = combine(profiles, release)
+    if capacity is None:
+        conflicts, offsets, leveled_combined = [], release, combined
+    else:
+        conflicts = find_conflicts(combined, capacity, profiles, release, paths)
+        offsets = level_portfolio(profiles, release, capacity) if conflicts else release
+        leveled_combined = combine(profiles, offsets)
+
+    return PortfolioResult(
+        projects=plans,
+        release=release.astype(np.float64),
+        combined=combined,
+        conflicts=conflicts,
+        offsets=offsets.astype(np.float64),
+        leveled_combined=leveled_combined,
+        duration=float((release + durations).max(initial=0.0)),
+        leveled_duration=float((offsets + durations).max(initial=0.0)),
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Портфель проектов с общим пулом рабочей силы")
+    parser.add_argument('inputs', nargs='+', help="CSV файлы, маски (glob) или каталоги")
+    parser.add_argument('-c', '--capacity', type=float, default=None, help="общая численность рабочей силы в день")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="число процессов (по умолчанию — число ядер)")
+    parser.add_argument('--top', type=int, default=10, help="сколько конфликтов и сдвигов выводить")
+    cache.add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    import batch  # разбор масок и каталогов входных файлов
+
+    args = parse_args(argv)
+    paths = batch.expand_inputs(args.inputs)
+    if not paths:
+        print("Не найдено ни одного файла проекта")
+        return 2
+    if args.clear_cache:
+        cache.clear(args.cache_dir)
+
+    result = analyze_portfolio(paths, args.capacity, workers=args.workers,
+                               use_cache=not args.no_cache, cache_dir=args.cache_dir)
+    failed = [plan for plan in result.projects if plan.status != 'ok']
+    print(f"Проектов: {len(result.projects)}, работ: {sum(plan.tasks for plan in result.projects)}, "
+          f"с ошибками: {len(failed)}")
+    for plan in failed:
+        print(f"  ✗ {plan.path}: {plan.status} ({len(plan.errors)} ошибок)")
+    leveled = [plan.path for plan in result.projects if plan.leveled]
+    if leveled:
+        print(f"Выровнены по работам (превышают численность сами): {len(leveled)}")
+
+    print(f"\nСрок портфеля: {result.duration:.1f} дней")
+    print(f"Пиковая общая загрузка: {result.combined.max(initial=0.0):.1f} человек")
+    if args.capacity is None:
+        return 0 if not failed else 1
+
+    print(f"Конфликтов с численностью {args.capacity:g}: {len(result.conflicts)}")
+    for conflict in result.conflicts[:args.top]:
+        names = ', '.join(os.path.basename(path) for path in conflict.projects[:5])
+        more = f" и еще {len(conflict.projects) - 5}" if len(conflict.projects) > 5 else ""
+        print(f"  дни {conflict.begin}–{conflict.end}: до {conflict.peak:.1f} человек ({names}{more})")
+
+    print(f"\nПосле выравнивания: срок {result.leveled_duration:.1f} дней, пиковая загрузка "
+          f"{result.leveled_combined.max(initial=0.0):.1f} человек")
+    delays = result.offsets - result.release
+    for p in np.argsort(-delays, kind='stable')[:args.top].tolist():
+        if delays[p] > 0:
+            print(f"  {os.path.basename(result.projects[p].path)}: начало сдвинуто на {delays[p]:g} дней")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Скомпилированная модель проекта для валидации и расчета.
+
+Колонки 'Предшественники' и 'Последователи' разбиваются на идентификаторы
+один раз: каждая ссылка хранится в таблице ссылок (строка, колонка,
+позиция в списке, исходный текст, индекс работы или -1), откуда строятся
+целочисленные массивы рёбер. Проверки формата идентификаторов,
+уникальности, существования ссылок, циклов и связности выполняются
+операциями над этими массивами, а последующие этапы используют граф
+cpm.ProjectGraph, не разбирая строки повторно.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import cpm
+
+# Колонки ссылок в порядке проверки внутри строки
+PREDECESSORS, FOLLOWERS = 0, 1
+REFERENCE_COLUMNS = {PREDECESSORS: 'Предшественники', FOLLOWERS: 'Последователи'}
+
+REQUIRED_COLUMNS = ['Работа', 'Последователи', 'Предшественники', 'Продолжительность', 'Рабочая сила',
+                    'ИсходнаяСтрока']
+
+ProjectModel = namedtuple('ProjectModel', [
+    'works',          # уникальные идентификаторы работ (порядок первого появления)
+    'row_node',       # int64[rows] индекс работы каждой строки
+    'lines',          # int64[rows] номер строки исходного файла
+    'ref_row',        # int64[k] строка DataFrame, в которой записана ссылка
+    'ref_kind',       # int8[k] PREDECESSORS или FOLLOWERS
+    'ref_position',   # int64[k] позиция в списке (с 1, как при split(','))
+    'ref_token',      # object[k] исходный текст элемента списка
+    'ref_name',       # object[k] идентификатор без пробелов по краям
+    'ref_node',       # int64[k] индекс работы или -1, если работы нет
+])
+
+
+def _references(values, kind):
+    """
+    Разбиение колонки ссылок: (строка, позиция, текст, идентификатор) для
+    непустых элементов, отличных от '-'. Ячейки склеиваются и разбиваются
+    одним вызовом split, без списка на каждую ячейку.
+    """
+    values = values.reset_index(drop=True)
+    present = (values.notna() & (values != '') & (values != '-')).to_numpy()
+    cells = values[present].astype(str).tolist()
+    counts = np.fromiter((cell.count(',') for cell in cells), dtype=np.int64, count=len(cells)) + 1
+    tokens = np.array(','.join(cells).split(',') if cells else [], dtype=object)
+    names = np.array(list(map(str.strip, tokens)), dtype=object)
+
+    rows = np.repeat(np.flatnonzero(present), counts)
+    position = np.arange(tokens.size, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    keep = (names != '') & (names != '-')
+    return (rows[keep], np.full(int(keep.sum()), kind, dtype=np.int8), position[keep],
+            tokens[keep], names[keep])
+
+
+def compile_model(df):
+    """
+    Однопроходная компиляция DataFrame проекта в модель с таблицей ссылок.
+    Если в df нет обязательных колонок, возвращается None (об отсутствующих
+    колонках сообщает NONE.validate_csv_data).
+    """
+    if not set(REQUIRED_COLUMNS) <= set(df.columns):
+        return None
+
+    columns = [_references(df[REFERENCE_COLUMNS[kind]], kind) for kind in (PREDECESSORS, FOLLOWERS)]
+    ref_row, ref_kind, ref_position, ref_token, ref_name = (np.concatenate(parts) for parts in zip(*columns))
+
+    # Внутри колонки ссылки уже упорядочены по строкам и позициям, поэтому
+    # устойчивая сортировка по строке дает порядок (строка, колонка, позиция)
+    order = np.argsort(ref_row, kind='stable')
+    ref_name = ref_name[order]
+
+    # Работы и ссылки интернируются одним хешированием: работы идут первыми,
+    # поэтому коды ссылок вне диапазона работ означают несуществующие работы
+    works_column = df['Работа'].to_numpy(dtype=object)
+    codes, uniques = pd.factorize(np.concatenate([works_column, ref_name]), use_na_sentinel=False)
+    row_node = codes[:len(works_column)].astype(np.int64)
+    works = list(uniques[:row_node.max() + 1]) if len(row_node) else []
+    ref_node = codes[len(works_column):].astype(np.int64)
+    ref_node[ref_node >= len(works)] = -1
+    lines = df['ИсходнаяСтрока'].to_numpy(dtype=np.int64)
+
+    return ProjectModel(
+        works=works,
+        row_node=row_node,
+        lines=lines,
+        ref_row=ref_row[order],
+        ref_kind=ref_kind[order],
+        ref_position=ref_position[order],
+        ref_token=ref_token[order],
+        ref_name=ref_name,
+        ref_node=ref_node,
+    )
+
+
+def edges(model):
+    """
+    Рёбра (источник, цель, строка ссылки) существующих ссылок в порядке появления
+    """
+    valid = model.ref_node >= 0
+    row_node = model.row_node[model.ref_row[valid]]
+    ref_node = model.ref_node[valid]
+    is_pred = model.ref_kind[valid] == PREDECESSORS
+    sources = np.where(is_pred, ref_node, row_node)
+    targets = np.where(is_pred, row_node, ref_node)
+    return sources, targets, model.ref_row[valid]
+
+
+def networkx_graph(model):
+    """
+    Граф networkx.DiGraph по модели: работы в порядке первого появления,
+    рёбра существующих ссылок в порядке появления
+    """
+    import networkx as nx  # networkx нужен только вызывающим, работающим с его графами
+
+    sources, targets, _ = edges(model)
+    works = model.works
+    G = nx.DiGraph()
+    G.add_nodes_from(works)
+    G.add_edges_from((works[source], works[target]) for source, target in zip(sources.tolist(), targets.tolist()))
+    return G
+
+
+def first_values(df, model, column):
+    """
+    Значения колонки для каждой работы (первое вхождение) в виде float64 (NaN для нечисловых)
+    """
+    values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+    result = np.full(len(model.works), np.nan)
+    # Запись в обратном порядке оставляет значение первого вхождения
+    result[model.row_node[::-1]] = values[::-1]
+    return result
+
+
+def build_graph(df, model):
+    """
+    Граф cpm.ProjectGraph по модели. Порядок рёбер совпадает с порядком
+    рёбер графа networkx, который строился по тем же строкам.
+    """
+    sources, targets, _ = edges(model)
+    # Группировка по источнику с сохранением порядка ссылок; повторы
+    # cpm.build_graph отбрасывает, оставляя первое появление
+    order = np.argsort(sources, kind='stable')
+    return cpm.build_graph(model.works, first_values(df, model, 'Продолжительность'),
+                           sources[order], targets[order])
+
+
+def _peel(n, ptr, idx, alive):
+    """
+    Удаление узлов, не лежащих на циклах в одном направлении: узлы с нулевой
+    степенью захода по (ptr, idx) среди alive удаляются, пока такие есть
+    """
+    alive = alive.copy()
+    sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(ptr))
+    live_edges = alive[sources] & alive[idx]
+    degree = np.bincount(idx[live_edges], minlength=n)
+    current = np.flatnonzero(alive & (degree == 0))
+    while current.size:
+        alive[current] = False
+        children = cpm.gather(ptr, idx, current)
+        children = children[alive[children]]
+        np.subtract.at(degree, children, 1)
+        current = np.unique(children[degree[children] == 0])
+    return alive
+
+
+def cyclic_components(graph):
+    """
+    Сильно связные компоненты, содержащие цикл (несколько работ или петля),
+    упорядоченные по наименьшему индексу работы. Ациклическая часть графа
+    отбрасывается векторно, алгоритм Тарьяна работает только на остатке.
+    """
+    n = len(graph.works)
+    alive = _peel(n, graph.succ_ptr, graph.succ_idx, np.ones(n, dtype=bool))
+    if not alive.any():
+        return []
+    alive = _peel(n, graph.pred_ptr, graph.pred_idx, alive)
+
+    # Итеративный Тарьян на списках: cursor хранит следующее ребро каждого узла
+    succ_ptr = graph.succ_ptr.tolist()
+    succ_idx = graph.succ_idx.tolist()
+    live = alive.tolist()
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    cursor = list(succ_ptr)
+    stack = []
+    components = []
+    counter = 0
+
+    for root in np.flatnonzero(alive).tolist():
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        call = [root]
+        while call:
+            node = call[-1]
+            edge, end = cursor[node], succ_ptr[node + 1]
+            while edge < end:
+                succ = succ_idx[edge]
+                edge += 1
+                if not live[succ]:
+                    continue
+                if index[succ] < 0:
+                    break
+                if on_stack[succ] and index[succ] < low[node]:
+                    low[node] = index[succ]
+            else:
+                # Все последователи обработаны: возврат из узла
+                cursor[node] = edge
+                call.pop()
+                if call and low[node] < low[call[-1]]:
+                    low[call[-1]] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                continue
+            cursor[node] = edge
+            index[succ] = low[succ] = counter
+            counter += 1
+            stack.append(succ)
+            on_stack[succ] = True
+            call.append(succ)
+
+    cyclic = []
+    for component in components:
+        node = component[0]
+        if len(component) > 1 or node in succ_idx[succ_ptr[node]:succ_ptr[node + 1]]:
+            cyclic.append(set(component))
+    cyclic.sort(key=min)
+    return cyclic
+
+
+def shortest_cycle_through(graph, start, component):
+    """
+    Кратчайший цикл через start внутри сильно связной компоненты (BFS)
+    """
+    succ_ptr, succ_idx = graph.succ_ptr, graph.succ_idx
+    successors = succ_idx[succ_ptr[start]:succ_ptr[start + 1]].tolist()
+    if start in successors:
+        return [start]
+
+    parent = {start: None}
+    queue = [start]
+    for node in queue:
+        for succ in succ_idx[succ_ptr[node]:succ_ptr[node + 1]].tolist():
+            if succ == start:
+                # Восстанавливаем путь start -> ... -> node
+                cycle = []
+                while node is not None:
+                    cycle.append(node)
+                    node = parent[node]
+                return cycle[::-1]
+            if succ in component and succ not in parent:
+                parent[succ] = node
+                queue.append(succ)
+    return None
+
+
+def edge_lines(model, pairs):
+    """
+    Номер строки, задавшей каждое ребро (источник, цель) из pairs: последнее
+    вхождение ссылки, как при перезаписи словаря источников рёбер
+    """
+    n = len(model.works)
+    wanted = np.array([source * n + target for source, target in pairs], dtype=np.int64)
+    sources, targets, rows = edges(model)
+    found = np.flatnonzero(np.isin(sources * n + targets, wanted))
+    result = {}
+    for position in found.tolist():
+        result[(int(sources[position]), int(targets[position]))] = int(model.lines[rows[position]])
+    return result
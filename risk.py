@@ -0,0 +1,315 @@
+"""
+Вероятностный анализ сроков проекта (PERT / Монте-Карло).
+
+Для каждой работы задаются оптимистичная, наиболее вероятная и
+пессимистичная продолжительности (колонки 6-8 CSV файла). Продолжительности
+выбираются из Beta-PERT распределения, прямой и обратный проходы CPM
+выполняются над матрицей «работы x сценарии»: один проход по работам в
+топологическом порядке обрабатывает сразу все сценарии блока. Большое число
+сценариев делится между процессами.
+
+Пример:
+    python risk.py DATA.csv --samples 100000 --deadline 45
+"""
+import argparse
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import cache
+import cpm
+
+# Необязательные колонки с оценками продолжительности (после пятой)
+PERT_COLUMNS = ['Оптимистичная', 'Наиболее вероятная', 'Пессимистичная']
+
+# Процентили времени завершения проекта в отчете
+DEFAULT_PERCENTILES = (5, 10, 25, 50, 75, 80, 90, 95, 99)
+
+# Сценариев в одном блоке матрицы: ограничивает память блока
+# (работы x блок x 8 байт на матрицу)
+DEFAULT_BLOCK_SIZE = 2048
+
+# Начиная с этого числа сценариев расчет делится между процессами
+PARALLEL_MIN_SAMPLES = 20_000
+
+# Сколько сценариев резерва хранится для оценки процентилей резерва
+SLACK_SAMPLE_LIMIT = 1000
+
+# Размер таблицы квантилей Beta-PERT: число форм распределения и число квантилей
+PERT_TABLE_SHAPES = 257
+PERT_TABLE_QUANTILES = 4096
+_pert_table = None
+
+RiskResult = namedtuple('RiskResult', [
+    'works',             # идентификаторы работ
+    'completion',        # float64[samples] время завершения проекта в каждом сценарии
+    'percentiles',       # словарь процентиль -> время завершения
+    'criticality',       # float64[n] доля сценариев, в которых работа критическая
+    'slack_mean',        # float64[n] средний полный резерв
+    'slack_std',         # float64[n] стандартное отклонение резерва
+    'slack_min',         # float64[n]
+    'slack_max',         # float64[n]
+    'slack_samples',     # float32[n, k] выборка резервов для процентилей (k <= SLACK_SAMPLE_LIMIT)
+])
+
+
+def pert_estimates(graph, extra):
+    """
+    Оценки (a, m, b) для работ графа из колонок PERT_COLUMNS (cache.compile_extra).
+    Пропущенная оценка ('-') заменяется на 'Продолжительность'.
+    """
+    base = np.asarray(graph.durations, dtype=np.float64)
+    estimates = []
+    for col in PERT_COLUMNS:
+        values = extra.get(col)
+        estimates.append(base.copy() if values is None else np.where(np.isnan(values), base, values))
+    return tuple(estimates)
+
+
+def validate_estimates(works, optimistic, most_likely, pessimistic):
+    """
+    Проверка согласованности оценок: 0 < a <= m <= b
+    """
+    errors = []
+    bad = ~((optimistic > 0) & (optimistic <= most_likely) & (most_likely <= pessimistic))
+    for i in np.flatnonzero(bad):
+        errors.append(f"Работа '{works[i]}': оценки должны удовлетворять 0 < a <= m <= b "
+                      f"(получено {optimistic[i]}, {most_likely[i]}, {pessimistic[i]})")
+    return errors
+
+
+def _pert_quantile_table():
+    """
+    Квантили стандартного Beta-PERT распределения на [0, 1] для сетки
+    значений r = (m - a) / (b - a): форма распределения зависит только от r
+    (alpha = 1 + 4r, beta = 5 - 4r). Таблица строится один раз.
+    """
+    global _pert_table
+    if _pert_table is None:
+        r = np.linspace(0.0, 1.0, PERT_TABLE_SHAPES)[:, None]
+        x = np.linspace(0.0, 1.0, 8 * PERT_TABLE_QUANTILES + 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pdf = x ** (4 * r) * (1 - x) ** (4 - 4 * r)
+        # Функция распределения — накопленная трапециями плотность
+        cdf = np.concatenate([np.zeros((PERT_TABLE_SHAPES, 1)),
+                              np.cumsum((pdf[:, 1:] + pdf[:, :-1]) / 2, axis=1)], axis=1)
+        cdf /= cdf[:, -1:]
+        levels = (np.arange(PERT_TABLE_QUANTILES) + 0.5) / PERT_TABLE_QUANTILES
+        _pert_table = np.array([np.interp(levels, row, x) for row in cdf])
+    return _pert_table
+
+
+def sample_durations(rng, optimistic, most_likely, pessimistic, samples):
+    """
+    Выборка продолжительностей из Beta-PERT: матрица работы x сценарии.
+    Вместо rng.beta используется таблица квантилей: случайный номер
+    квантиля и выборка из строки таблицы, соответствующей форме работы.
+    """
+    table = _pert_quantile_table()
+    spread = pessimistic - optimistic
+    shape = np.divide(most_likely - optimistic, spread, out=np.full(len(spread), 0.5), where=spread > 0)
+    rows = np.rint(shape * (PERT_TABLE_SHAPES - 1)).astype(np.intp)
+
+    quantiles = rng.integers(0, PERT_TABLE_QUANTILES, size=(len(spread), samples), dtype=np.int16)
+    durations = np.empty((len(spread), samples))
+    for node, row in enumerate(rows):
+        np.take(table[row], quantiles[node], out=durations[node])
+
+    durations *= spread[:, None]
+    durations += optimistic[:, None]
+    return durations
+
+
+def _simulate_block(graph, order, durations):
+    """
+    Прямой и обратный проходы по матрице продолжительностей (работы x сценарии).
+    Возвращает время завершения каждого сценария и матрицу полных резервов.
+    """
+    pred_ptr, pred_idx = graph.pred_ptr, graph.pred_idx
+    succ_ptr, succ_idx = graph.succ_ptr, graph.succ_idx
+    early_finish = np.empty_like(durations)
+
+    for node in order:
+        start, end = pred_ptr[node], pred_ptr[node + 1]
+        if start == end:
+            early_finish[node] = durations[node]
+        elif end - start == 1:
+            np.add(early_finish[pred_idx[start]], durations[node], out=early_finish[node])
+        else:
+            np.add(early_finish[pred_idx[start:end]].max(axis=0), durations[node], out=early_finish[node])
+
+    completion = early_finish.max(axis=0)
+    late_finish = np.empty_like(durations)
+
+    for node in order[::-1]:
+        start, end = succ_ptr[node], succ_ptr[node + 1]
+        if start == end:
+            late_finish[node] = completion
+        elif end - start == 1:
+            succ = succ_idx[start]
+            np.subtract(late_finish[succ], durations[succ], out=late_finish[node])
+        else:
+            succ = succ_idx[start:end]
+            late_finish[node] = (late_finish[succ] - durations[succ]).min(axis=0)
+
+    # Полный резерв: LF - EF
+    late_finish -= early_finish
+    return completion, late_finish
+
+
+def _run_samples(graph, order, estimates, samples, seed, block_size, slack_limit):
+    """
+    Моделирование samples сценариев блоками; возвращает накопленные суммы
+    """
+    rng = np.random.default_rng(seed)
+    n = len(graph.works)
+    completion = []
+    critical_count = np.zeros(n)
+    slack_sum = np.zeros(n)
+    slack_sq = np.zeros(n)
+    slack_min = np.full(n, np.inf)
+    slack_max = np.full(n, -np.inf)
+    kept = []
+    kept_count = 0
+
+    for offset in range(0, samples, block_size):
+        size = min(block_size, samples - offset)
+        durations = sample_durations(rng, *estimates, size)
+        block_completion, slack = _simulate_block(graph, order, durations)
+
+        completion.append(block_completion)
+        critical_count += (np.abs(slack) < cpm.CRITICAL_EPS).sum(axis=1)
+        slack_sum += slack.sum(axis=1)
+        slack_sq += np.square(slack).sum(axis=1)
+        np.minimum(slack_min, slack.min(axis=1), out=slack_min)
+        np.maximum(slack_max, slack.max(axis=1), out=slack_max)
+        if kept_count < slack_limit:
+            take = slack[:, :slack_limit - kept_count].astype(np.float32)
+            kept.append(take)
+            kept_count += take.shape[1]
+
+    kept = np.concatenate(kept, axis=1) if kept else np.empty((n, 0), dtype=np.float32)
+    return np.concatenate(completion), critical_count, slack_sum, slack_sq, slack_min, slack_max, kept
+
+
+def simulate(graph, optimistic, most_likely, pessimistic, samples=10_000, seed=None,
+             workers=None, block_size=DEFAULT_BLOCK_SIZE, percentiles=DEFAULT_PERCENTILES):
+    """
+    Моделирование Монте-Карло расписания проекта.
+    Сценарии делятся между workers процессами, если их не меньше PARALLEL_MIN_SAMPLES.
+    """
+    order = cpm.topological_order(graph)
+    estimates = tuple(np.asarray(values, dtype=np.float64) for values in (optimistic, most_likely, pessimistic))
+
+    workers = workers or os.cpu_count() or 1
+    jobs = min(workers, max(1, samples // block_size)) if samples >= PARALLEL_MIN_SAMPLES else 1
+    seeds = np.random.SeedSequence(seed).spawn(jobs)
+    shares = [samples // jobs + (i < samples % jobs) for i in range(jobs)]
+    slack_shares = [SLACK_SAMPLE_LIMIT // jobs + (i < SLACK_SAMPLE_LIMIT % jobs) for i in range(jobs)]
+
+    if jobs == 1:
+        parts = [_run_samples(graph, order, estimates, samples, seeds[0], block_size, SLACK_SAMPLE_LIMIT)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_run_samples, graph, order, estimates, share, job_seed, block_size, slack_share)
+                       for share, job_seed, slack_share in zip(shares, seeds, slack_shares)]
+            parts = [future.result() for future in futures]
+
+    completion = np.concatenate([part[0] for part in parts])
+    critical_count = sum(part[1] for part in parts)
+    slack_sum = sum(part[2] for part in parts)
+    slack_sq = sum(part[3] for part in parts)
+    slack_mean = slack_sum / samples
+    slack_std = np.sqrt(np.maximum(slack_sq / samples - np.square(slack_mean), 0.0))
+
+    return RiskResult(
+        works=list(graph.works),
+        completion=completion,
+        percentiles={p: float(v) for p, v in zip(percentiles, np.percentile(completion, percentiles))},
+        criticality=critical_count / samples,
+        slack_mean=slack_mean,
+        slack_std=slack_std,
+        slack_min=np.minimum.reduce([part[4] for part in parts]),
+        slack_max=np.maximum.reduce([part[5] for part in parts]),
+        slack_samples=np.concatenate([part[6] for part in parts], axis=1),
+    )
+
+
+def completion_probability(result, deadline):
+    """
+    Вероятность завершить проект не позже deadline
+    """
+    return float(np.mean(result.completion <= deadline))
+
+
+def slack_percentiles(result, percentiles=(5, 50, 95)):
+    """
+    Процентили полного резерва по работам (по сохраненной выборке сценариев)
+    """
+    return np.percentile(result.slack_samples, percentiles, axis=1).T
+
+
+def load_project(csv_file_path, use_cache=True, cache_dir=None):
+    """
+    Чтение и валидация проекта с оценками PERT; возвращает граф, оценки и ошибки
+    """
+    project = cache.load_compiled(csv_file_path, PERT_COLUMNS, use_cache=use_cache, directory=cache_dir)
+    graph, errors = project.graph, project.errors
+    if graph is None:
+        return None, None, errors
+
+    estimates = pert_estimates(graph, project.extra)
+    estimate_errors = validate_estimates(graph.works, *estimates)
+    if estimate_errors:
+        return None, None, errors + estimate_errors
+    return graph, estimates, errors
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Вероятностный анализ сроков проекта (PERT / Монте-Карло)")
+    parser.add_argument('csv_file', help="CSV файл проекта с колонками оценок 6-8 (a, m, b)")
+    parser.add_argument('-n', '--samples', type=int, default=10_000, help="число сценариев")
+    parser.add_argument('-s', '--seed', type=int, default=None, help="зерно генератора случайных чисел")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="число процессов")
+    parser.add_argument('-d', '--deadline', type=float, default=None, help="директивный срок для оценки вероятности")
+    parser.add_argument('--top', type=int, default=15, help="сколько работ с наибольшим индексом критичности выводить")
+    cache.add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    args = parse_args(argv)
+    if args.clear_cache:
+        cache.clear(args.cache_dir)
+    graph, estimates, errors = load_project(args.csv_file, use_cache=not args.no_cache, cache_dir=args.cache_dir)
+    if graph is None:
+        print("✗ Невозможно выполнить моделирование:")
+        for i, error in enumerate(errors, 1):
+            print(f"  {i}. {error}")
+        return 1
+
+    result = simulate(graph, *estimates, samples=args.samples, seed=args.seed, workers=args.workers)
+
+    print(f"Сценариев: {args.samples}, работ: {len(graph.works)}")
+    print("Время завершения проекта (процентили):")
+    for p, value in result.percentiles.items():
+        print(f"  P{p:<3} {value:10.1f} дней")
+    if args.deadline is not None:
+        print(f"Вероятность завершения за {args.deadline:g} дней: {completion_probability(result, args.deadline):.1%}")
+
+    print(f"\n{'Работа':<10} {'Критичн.':<9} {'Резерв ср.':<11} {'P5':<8} {'P50':<8} {'P95':<8}")
+    quantiles = slack_percentiles(result)
+    for i in np.argsort(-result.criticality, kind='stable')[:args.top]:
+        print(f"{result.works[i]:<10} {result.criticality[i]:<9.1%} {result.slack_mean[i]:<11.1f} "
+              f"{quantiles[i, 0]:<8.1f} {quantiles[i, 1]:<8.1f} {quantiles[i, 2]:<8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
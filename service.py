@@ -0,0 +1,536 @@
+"""
+Локальный сервис расписаний: проекты загружаются один раз и держатся в памяти.
+
+Каждый CSV файл проходит read_project_data и валидаторы (NONE.load_project),
+после чего скомпилированный граф, расписание и профиль рабочей силы
+хранятся в памяти процесса. Запросы обслуживает asyncio HTTP сервер (TCP
+или Unix socket); ответы — JSON. Результаты запросов запоминаются и
+сбрасываются, когда исходный файл меняется (проверка mtime и размера при
+каждом запросе; перезагрузка идет в отдельном потоке и не блокирует
+остальные запросы).
+
+Запросы:
+    GET /projects                                  список проектов
+    GET /projects/<проект>/task/<работа>           сроки работы
+    GET /projects/<проект>/critical-path           критический путь
+    GET /projects/<проект>/slack?above=<дни>       работы с резервом больше порога
+    GET /projects/<проект>/workforce?start=<день>&end=<день>
+                                                   загрузка рабочей силы на [start, end)
+
+Пример:
+    python service.py DATA.csv other.csv --port 8765
+    curl http://127.0.0.1:8765/projects/DATA/critical-path
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import numpy as np
+
+import NONE
+import cpm
+import parallel_cpm
+import validation
+import workload
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Сколько результатов запросов запоминается для одного проекта
+MEMO_SIZE = 4096
+
+# Наибольший размер строки запроса и заголовков HTTP, байт
+MAX_HEADER_SIZE = 64 * 1024
+
+ProjectState = namedtuple('ProjectState', [
+    'path',        # путь к CSV файлу
+    'signature',   # (mtime_ns, размер) файла на момент загрузки
+    'errors',      # ошибки чтения и валидации (проект без графа, если не пусто)
+    'warnings',    # предупреждения валидации зависимостей
+    'graph',       # cpm.ProjectGraph или None
+    'workforce',   # float64[n] рабочая сила работ
+    'schedule',    # cpm.Schedule
+    'profile',     # workload.WorkforceProfile
+    'memo',        # OrderedDict запрос -> результат (LRU)
+])
+
+
+class QueryError(Exception):
+    """
+    Ошибка запроса с HTTP статусом ответа
+    """
+
+    def __init__(self, status, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+def _signature(path):
+    """
+    Отпечаток файла для обнаружения изменений
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_state(path):
+    """
+    Загрузка и расчет проекта: чтение, валидация, CPM и профиль рабочей силы
+    """
+    signature = _signature(path)
+    df, G, errors, warnings = NONE.load_project(path)
+    if G is None:
+        return ProjectState(path, signature, errors, warnings, None, None, None, None, OrderedDict())
+    graph, workforce = NONE.compile_project(df, G)
+    try:
+        # Загрузка идет в потоке пула asyncio: пул процессов из многопоточного
+        # процесса не запускаем, расчет последовательный, как в calculate_critical_path
+        schedule = parallel_cpm.compute_schedule(graph, workers=1)
+    except cpm.CycleError as e:
+        return ProjectState(path, signature, errors + [f"Ошибка расчета: {e}"], warnings,
+                            None, None, None, None, OrderedDict())
+    profile = workload.build_profile(schedule.early_start, schedule.early_finish, workforce)
+    return ProjectState(path, signature, errors, warnings, graph, workforce, schedule, profile, OrderedDict())
+
+
+def _task_record(state, node):
+    schedule = state.schedule
+    return {
+        'work': state.graph.works[node],
+        'early_start': float(schedule.early_start[node]),
+        'early_finish': float(schedule.early_finish[node]),
+        'late_start': float(schedule.late_start[node]),
+        'late_finish': float(schedule.late_finish[node]),
+        'duration': float(state.graph.durations[node]),
+        'workforce': float(state.workforce[node]),
+        'slack': float(schedule.total_slack[node]),
+        'critical': bool(abs(schedule.total_slack[node]) < cpm.CRITICAL_EPS),
+    }
+
+
+def _number(params, name, default=None):
+    """
+    Числовой параметр запроса
+    """
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise QueryError(400, f"Не задан параметр '{name}'")
+        return default
+    try:
+        return float(values[-1])
+    except ValueError:
+        raise QueryError(400, f"Параметр '{name}' должен быть числом (получено '{values[-1]}')") from None
+
+
+def query_task(state, work):
+    """
+    Сроки, резерв и рабочая сила одной работы
+    """
+    node = state.graph.index.get(work)
+    if node is None:
+        raise QueryError(404, f"Работа '{work}' не найдена")
+    return _task_record(state, node)
+
+
+def query_critical_path(state):
+    """
+    Критические работы в топологическом порядке и длительность проекта
+    """
+    schedule = state.schedule
+    is_critical = cpm.critical_mask(schedule)
+    works = state.graph.works
+    return {
+        'project_duration': schedule.project_duration,
+        'critical_path': [works[node] for node in schedule.order.tolist() if is_critical[node]],
+    }
+
+
+def query_slack(state, above):
+    """
+    Работы с полным резервом больше above (по убыванию резерва)
+    """
+    slack = state.schedule.total_slack
+    nodes = np.flatnonzero(slack > above)
+    nodes = nodes[np.argsort(-slack[nodes], kind='stable')]
+    return {'above': above, 'tasks': [_task_record(state, node) for node in nodes.tolist()]}
+
+
+def query_workforce(state, start, end):
+    """
+    Загрузка рабочей силы на интервале [start, end): средняя по дням,
+    пиковая и средняя за интервал (по точной кусочно-постоянной загрузке)
+    """
+    if end <= start:
+        raise QueryError(400, f"Пустой интервал [{start:g}, {end:g})")
+    profile = state.profile
+    first, last = max(int(np.floor(start)), 0), min(int(np.ceil(end)), profile.daily.size)
+    daily = [{'day': day, 'load': float(profile.daily[day])} for day in range(first, last)]
+
+    # Пересечение отрезков постоянной загрузки с [start, end)
+    begins = np.maximum(profile.breakpoints[:-1], start)
+    ends = np.minimum(profile.breakpoints[1:], end)
+    overlap = ends > begins
+    levels = profile.levels[overlap]
+    return {
+        'start': start,
+        'end': end,
+        'peak': float(levels.max()) if levels.size else 0.0,
+        'mean': float(np.sum(levels * (ends - begins)[overlap]) / (end - start)),
+        'daily': daily,
+    }
+
+
+class ProjectStore:
+    """
+    Загруженные проекты по именам с запоминанием результатов запросов.
+    Потокобезопасен: перезагрузка одного проекта выполняется один раз,
+    параллельные запросы к нему ждут ее завершения.
+    """
+
+    def __init__(self, paths=(), memo_size=MEMO_SIZE):
+        self.memo_size = memo_size
+        self.paths = OrderedDict()
+        self._states = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+        for path in paths:
+            self.add(path)
+
+    def add(self, path, name=None):
+        """
+        Регистрация файла проекта; имя по умолчанию — имя файла без расширения
+        """
+        if name is None:
+            stem = os.path.splitext(os.path.basename(path))[0]
+            name, count = stem, 1
+            while name in self.paths:
+                name, count = f"{stem}_{count}", count + 1
+        self.paths[name] = path
+        self._locks[name] = threading.Lock()
+        return name
+
+    def state(self, name):
+        """
+        Актуальное состояние проекта; при изменении файла проект перезагружается
+        """
+        path = self.paths.get(name)
+        if path is None:
+            raise QueryError(404, f"Проект '{name}' не найден")
+        state = self._states.get(name)
+        try:
+            current = _signature(path)
+        except OSError as e:
+            raise QueryError(404, f"Файл проекта недоступен: {e}") from None
+        if state is not None and state.signature == current:
+            return state
+        with self._locks[name]:
+            state = self._states.get(name)
+            if state is None or state.signature != _signature(path):
+                state = load_state(path)
+                self._states[name] = state
+        return state
+
+    def needs_load(self, name):
+        """
+        True, если запрос к проекту потребует (пере)загрузки файла
+        """
+        state = self._states.get(name)
+        path = self.paths.get(name)
+        if path is None:
+            return False
+        try:
+            return state is None or state.signature != _signature(path)
+        except OSError:
+            return False
+
+    def query(self, name, kind, *args):
+        """
+        Результат запроса kind к проекту name (из памяти, если уже вычислялся)
+        """
+        state = self.state(name)
+        if state.graph is None:
+            raise QueryError(422, f"Проект '{name}' не прошел валидацию",
+                             {'errors': validation.messages(state.errors),
+                              'warnings': validation.messages(state.warnings)})
+        key = (kind,) + args
+        with self._guard:
+            if key in state.memo:
+                state.memo.move_to_end(key)
+                return state.memo[key]
+        result = QUERIES[kind](state, *args)
+        with self._guard:
+            state.memo[key] = result
+            if len(state.memo) > self.memo_size:
+                state.memo.popitem(last=False)
+        return result
+
+    def projects(self):
+        """
+        Сводка по зарегистрированным проектам
+        """
+        summary = []
+        for name, path in self.paths.items():
+            state = self._states.get(name)
+            record = {'name': name, 'path': path, 'loaded': state is not None}
+            if state is not None:
+                record.update(valid=state.graph is not None, errors=validation.count(state.errors),
+                              tasks=len(state.graph.works) if state.graph is not None else None,
+                              project_duration=state.schedule.project_duration if state.schedule else None)
+            summary.append(record)
+        return summary
+
+
+QUERIES = {
+    'task': query_task,
+    'critical-path': query_critical_path,
+    'slack': query_slack,
+    'workforce': query_workforce,
+}
+
+
+def dispatch(store, target):
+    """
+    Разбор пути запроса и выполнение; возвращает (HTTP статус, данные)
+    """
+    url = urlsplit(target)
+    parts = [unquote(part) for part in url.path.strip('/').split('/')]
+    params = parse_qs(url.query)
+    try:
+        if parts == ['projects']:
+            return 200, {'projects': store.projects()}
+        if len(parts) < 3 or parts[0] != 'projects':
+            raise QueryError(404, f"Неизвестный запрос '{url.path}'")
+        name, kind, rest = parts[1], parts[2], parts[3:]
+        if kind == 'task' and len(rest) == 1:
+            return 200, store.query(name, 'task', rest[0])
+        if kind == 'critical-path' and not rest:
+            return 200, store.query(name, 'critical-path')
+        if kind == 'slack' and not rest:
+            return 200, store.query(name, 'slack', _number(params, 'above', 0.0))
+        if kind == 'workforce' and not rest:
+            return 200, store.query(name, 'workforce', _number(params, 'start'), _number(params, 'end'))
+        raise QueryError(404, f"Неизвестный запрос '{url.path}'")
+    except QueryError as e:
+        payload = {'error': str(e)}
+        if e.details:
+            payload.update(e.details)
+        return e.status, payload
+
+
+def _project_name(target):
+    """
+    Имя проекта из пути запроса (None для общих запросов)
+    """
+    parts = urlsplit(target).path.strip('/').split('/')
+    return unquote(parts[1]) if len(parts) >= 2 and parts[0] == 'projects' else None
+
+
+class ScheduleService:
+    """
+    asyncio HTTP/1.1 сервер поверх ProjectStore (keep-alive, только GET).
+    Запросы к загруженным проектам выполняются в цикле событий; загрузка
+    и перезагрузка файлов — в пуле потоков.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.server = None
+
+    async def _respond(self, target):
+        name = _project_name(target)
+        if name is not None and self.store.needs_load(name):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, dispatch, self.store, target)
+        return dispatch(self.store, target)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 431, {'error': "Слишком длинный заголовок запроса"}, False)
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    await self._write(writer, 400, {'error': "Некорректная строка запроса"}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    key, _, value = line.partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._write(writer, 400, {'error': "Некорректный заголовок Content-Length"}, False)
+                    break
+                if length:
+                    await reader.readexactly(length)
+                if method != 'GET':
+                    status, payload = 405, {'error': f"Метод {method} не поддерживается"}
+                else:
+                    try:
+                        status, payload = await self._respond(target)
+                    except Exception as e:
+                        status, payload = 500, {'error': f"Внутренняя ошибка: {e}"}
+                await self._write(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _write(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        reason = http.client.responses.get(status, '')
+        head = (f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """
+        Запуск сервера на TCP порту или Unix socket (unix_path)
+        """
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self._handle, unix_path, limit=MAX_HEADER_SIZE)
+        else:
+            self.server = await asyncio.start_server(self._handle, host, port, limit=MAX_HEADER_SIZE)
+        return self.server
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        server = await self.start(host, port, unix_path)
+        async with server:
+            await server.serve_forever()
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    """
+    HTTP соединение через Unix socket
+    """
+
+    def __init__(self, unix_path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.unix_path = unix_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class ServiceClient:
+    """
+    Клиент сервиса (одно keep-alive соединение). Методы возвращают данные
+    ответа; ответы с ошибкой — QueryError с кодом статуса.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, timeout=30):
+        if unix_path:
+            self.connection = _UnixConnection(unix_path, timeout=timeout)
+        else:
+            self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def get(self, target):
+        self.connection.request('GET', target)
+        response = self.connection.getresponse()
+        payload = json.loads(response.read().decode('utf-8'))
+        if response.status != 200:
+            raise QueryError(response.status, payload.get('error'), payload)
+        return payload
+
+    def close(self):
+        self.connection.close()
+
+    def projects(self):
+        return self.get('/projects')['projects']
+
+    def task(self, project, work):
+        return self.get(f"/projects/{quote(project, safe='')}/task/{quote(work, safe='')}")
+
+    def critical_path(self, project):
+        return self.get(f"/projects/{quote(project, safe='')}/critical-path")
+
+    def slack(self, project, above=0.0):
+        return self.get(f"/projects/{quote(project, safe='')}/slack?above={above}")
+
+    def workforce(self, project, start, end):
+        return self.get(f"/projects/{quote(project, safe='')}/workforce?start={start}&end={end}")
+
+
+class LocalClient(ServiceClient):
+    """
+    Клиент-заменитель без сети: те же методы, запросы выполняются прямо над
+    ProjectStore (для тестов и встраивания)
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, target):
+        status, payload = dispatch(self.store, target)
+        if status != 200:
+            raise QueryError(status, payload.get('error'), payload)
+        return payload
+
+    def close(self):
+        pass
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Локальный сервис запросов к расписаниям проектов")
+    parser.add_argument('inputs', nargs='+', help="CSV файлы проектов")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"адрес (по умолчанию {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"порт (по умолчанию {DEFAULT_PORT})")
+    parser.add_argument('--unix', default=None, metavar='PATH', help="слушать Unix socket вместо TCP")
+    parser.add_argument('--lazy', action='store_true', help="загружать проекты при первом запросе")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    args = parse_args(argv)
+    store = ProjectStore(args.inputs)
+    if not args.lazy:
+        for name in store.paths:
+            state = store.state(name)
+            status = "ошибки валидации" if state.graph is None else f"{len(state.graph.works)} работ"
+            print(f"Загружен проект {name}: {status}")
+    address = args.unix or f"http://{args.host}:{args.port}"
+    print(f"Сервис запущен: {address}")
+    try:
+        asyncio.run(ScheduleService(store).serve_forever(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
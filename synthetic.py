@@ -0,0 +1,274 @@
+"""
+Генератор синтетических проектов в формате CSV файлов проекта
+(Работа, Последователи, Предшественники, Продолжительность, Рабочая сила).
+
+Формы графа:
+    layered — слоистый DAG: работа зависит от случайных работ предыдущего слоя;
+    chain   — несколько длинных цепочек с редкими перекрестными связями;
+    fan     — чередование «узел-концентратор -> широкий слой работ -> концентратор»
+              (широкие разветвления и слияния).
+Граф может состоять из нескольких независимых компонент. В данные можно
+внести ошибки тех же видов, что в ERRDATA1-3 (ERROR_KINDS).
+
+Пример:
+    python synthetic.py big.csv -n 1000000 --shape chain --components 4 --error cycle --error duplicate_id:2
+"""
+import argparse
+import sys
+
+import numpy as np
+
+SHAPES = ('layered', 'chain', 'fan')
+
+# Виды вносимых ошибок: вид -> описание
+ERROR_KINDS = {
+    'bad_number': "нечисловая продолжительность ('семь')",
+    'negative_duration': "отрицательная продолжительность",
+    'zero_duration': "нулевая продолжительность",
+    'negative_workforce': "отрицательная рабочая сила",
+    'duplicate_id': "повторяющийся идентификатор работы",
+    'dash_id': "идентификатор работы '-'",
+    'bad_identifier': "недопустимые символы в идентификаторе зависимости",
+    'missing_reference': "ссылка на несуществующую работу",
+    'cycle': "циклическая зависимость",
+    'short_row': "строка с недостаточным числом колонок",
+}
+
+# Ширина слоя работ между концентраторами в форме fan
+FAN_WIDTH = 500
+
+
+def _layered_edges(n, rng, max_degree):
+    """
+    Слоистый DAG: около sqrt(n) слоев, у каждой работы 1..max_degree предшественников в предыдущем слое
+    """
+    layers = max(1, int(round(n ** 0.5)))
+    layer = np.arange(n) * layers // n
+    bounds = np.searchsorted(layer, np.arange(layers + 1))
+    nodes = np.flatnonzero(layer > 0)
+    degree = rng.integers(1, max_degree + 1, size=nodes.size)
+    targets = np.repeat(nodes, degree)
+    previous = layer[targets] - 1
+    sizes = bounds[previous + 1] - bounds[previous]
+    sources = bounds[previous] + (rng.random(targets.size) * sizes).astype(np.int64)
+
+    # Работы без последователей (кроме последнего слоя) связываются со следующим слоем
+    lonely = np.flatnonzero((np.bincount(sources, minlength=n) == 0) & (layer < layers - 1))
+    following = layer[lonely] + 1
+    sizes = bounds[following + 1] - bounds[following]
+    extra = bounds[following] + (rng.random(lonely.size) * sizes).astype(np.int64)
+    return np.concatenate([sources, lonely]), np.concatenate([targets, extra])
+
+
+def _chain_edges(n, rng, max_degree):
+    """
+    Длинные цепочки (около n^(1/4) штук) и перекрестные связи между соседними позициями
+    """
+    chains = max(1, int(round(n ** 0.25)))
+    nodes = np.arange(chains, n)
+    sources = [nodes - chains]
+    targets = [nodes]
+    if chains > 1 and max_degree > 1:
+        cross = nodes[rng.random(nodes.size) < 0.05]
+        position = cross // chains
+        sources.append((position - 1) * chains + rng.integers(0, chains, size=cross.size))
+        targets.append(cross)
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+def _fan_edges(n, rng, max_degree):
+    """
+    Концентраторы с широкими разветвлениями и слияниями: блок = концентратор + слой работ
+    """
+    width = max(1, min(FAN_WIDTH, n // 4))
+    block = np.arange(n) // (width + 1)
+    offset = np.arange(n) % (width + 1)
+    hubs = np.flatnonzero(offset == 0)
+
+    # Работы слоя зависят от концентратора своего блока
+    workers = np.flatnonzero(offset > 0)
+    sources = [hubs[block[workers]]]
+    targets = [workers]
+
+    # Концентратор следующего блока зависит от всех работ предыдущего
+    later = block[workers] + 1 < hubs.size
+    sources.append(workers[later])
+    targets.append(hubs[block[workers[later]] + 1])
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+EDGE_GENERATORS = {'layered': _layered_edges, 'chain': _chain_edges, 'fan': _fan_edges}
+
+
+def generate_edges(n, shape='layered', components=1, rng=None, max_degree=3):
+    """
+    Рёбра синтетического графа из n работ (массивы источников и целей без повторов)
+    """
+    if shape not in EDGE_GENERATORS:
+        raise ValueError(f"Неизвестная форма графа '{shape}' (допустимо: {', '.join(SHAPES)})")
+    rng = np.random.default_rng(rng)
+    components = max(1, min(components, n))
+    bounds = np.arange(components + 1) * n // components
+
+    sources, targets = [], []
+    for begin, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        if end - begin > 1:
+            s, t = EDGE_GENERATORS[shape](end - begin, rng, max_degree)
+            sources.append(s + begin)
+            targets.append(t + begin)
+    if not sources:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    sources = np.concatenate(sources).astype(np.int64)
+    targets = np.concatenate(targets).astype(np.int64)
+    _, first = np.unique(sources * n + targets, return_index=True)
+    first.sort()
+    return sources[first], targets[first]
+
+
+def _ancestor(node, pred_ptr, pred_idx, rng, steps):
+    """
+    Случайный предок работы на расстоянии до steps рёбер
+    """
+    for _ in range(steps):
+        start, end = pred_ptr[node], pred_ptr[node + 1]
+        if start == end:
+            break
+        node = int(pred_idx[rng.integers(start, end)])
+    return node
+
+
+def _dependency_lists(ids, owners, others, n):
+    """
+    Строки списков зависимостей ('A;B') для работ 0..n-1 по рёбрам owner -> other
+    """
+    order = np.argsort(owners, kind='stable')
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=n), out=ptr[1:])
+    names = [ids[i] for i in others[order].tolist()]
+    ptr = ptr.tolist()
+    return [';'.join(names[ptr[i]:ptr[i + 1]]) or '-' for i in range(n)]
+
+
+def generate_project(n, shape='layered', components=1, errors=None, seed=None, max_degree=3):
+    """
+    Строки CSV файла синтетического проекта из n работ.
+    errors — словарь вид ошибки -> количество (виды из ERROR_KINDS).
+    """
+    errors = dict(errors or {})
+    unknown = sorted(set(errors) - set(ERROR_KINDS))
+    if unknown:
+        raise ValueError(f"Неизвестные виды ошибок: {', '.join(unknown)}")
+
+    rng = np.random.default_rng(seed)
+    sources, targets = generate_edges(n, shape, components, rng, max_degree)
+    ids = [f"T{i}" for i in range(n)]
+
+    # Ошибки уровня графа добавляются как дополнительные рёбра
+    extra_sources, extra_targets = [], []
+    if errors.get('cycle') and sources.size:
+        order = np.argsort(targets, kind='stable')
+        pred_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=n), out=pred_ptr[1:])
+        pred_idx = sources[order]
+        for edge in rng.integers(0, sources.size, size=errors['cycle']).tolist():
+            ancestor = _ancestor(int(sources[edge]), pred_ptr, pred_idx, rng, int(rng.integers(0, 4)))
+            extra_sources.append(int(targets[edge]))
+            extra_targets.append(ancestor)
+    for k in range(errors.get('missing_reference', 0)):
+        # Несуществующая работа X<k> появляется только в списке предшественников
+        ids.append(f"X{k}")
+        extra_sources.append(len(ids) - 1)
+        extra_targets.append(int(rng.integers(0, n)))
+    for k in range(errors.get('bad_identifier', 0)):
+        ids.append(f"T{k}#")
+        extra_sources.append(len(ids) - 1)
+        extra_targets.append(int(rng.integers(0, n)))
+    if extra_sources:
+        sources = np.concatenate([sources, np.array(extra_sources, dtype=np.int64)])
+        targets = np.concatenate([targets, np.array(extra_targets, dtype=np.int64)])
+
+    # Рёбра от несуществующих работ попадают только в списки предшественников
+    real = sources < n
+    followers = _dependency_lists(ids, sources[real], targets[real], n)
+    predecessors = _dependency_lists(ids, targets, sources, n)
+    durations = rng.integers(1, 21, size=n).astype(str).tolist()
+    workforce = rng.integers(0, 10, size=n).astype(str).tolist()
+    works = ids[:n]
+
+    # Ошибки уровня ячеек — в разных строках, чтобы не перекрывать друг друга
+    cell_kinds = ['bad_number', 'negative_duration', 'zero_duration', 'negative_workforce',
+                  'dash_id', 'duplicate_id', 'short_row']
+    counts = [errors.get(kind, 0) for kind in cell_kinds]
+    lines = rng.choice(n, size=min(sum(counts), n), replace=False).tolist()
+    picks = {kind: lines[sum(counts[:i]):sum(counts[:i + 1])] for i, kind in enumerate(cell_kinds)}
+
+    for i in picks['bad_number']:
+        durations[i] = 'семь'
+    for i in picks['negative_duration']:
+        durations[i] = '-5'
+    for i in picks['zero_duration']:
+        durations[i] = '0'
+    for i in picks['negative_workforce']:
+        workforce[i] = '-2'
+    for i in picks['dash_id']:
+        works[i] = '-'
+    for i in picks['duplicate_id']:
+        works[i] = ids[(i + 1) % n]
+
+    rows = [list(row) for row in zip(works, followers, predecessors, durations, workforce)]
+    for i in picks['short_row']:
+        rows[i] = rows[i][:3]
+    return rows
+
+
+def write_project(path, rows):
+    """
+    Запись строк проекта в CSV файл (формат DATA.csv)
+    """
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        file.writelines(', '.join(row) + '\r\n' for row in rows)
+
+
+def parse_errors(values):
+    """
+    Разбор параметров --error вида 'cycle' или 'cycle:3'
+    """
+    errors = {}
+    for value in values or []:
+        kind, _, count = value.partition(':')
+        errors[kind] = errors.get(kind, 0) + (int(count) if count else 1)
+    return errors
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация синтетических CSV файлов проектов")
+    parser.add_argument('output', help="путь к создаваемому CSV файлу")
+    parser.add_argument('-n', '--tasks', type=int, default=1000, help="число работ")
+    parser.add_argument('--shape', choices=SHAPES, default='layered', help="форма графа зависимостей")
+    parser.add_argument('--components', type=int, default=1, help="число независимых компонент графа")
+    parser.add_argument('--max-degree', type=int, default=3, help="наибольшее число предшественников в слоистом графе")
+    parser.add_argument('--error', action='append', metavar='ВИД[:N]',
+                        help="внести ошибку: " + ', '.join(ERROR_KINDS))
+    parser.add_argument('-s', '--seed', type=int, default=None, help="зерно генератора случайных чисел")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки
+    """
+    args = parse_args(argv)
+    try:
+        rows = generate_project(args.tasks, args.shape, args.components, parse_errors(args.error),
+                                args.seed, args.max_degree)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    write_project(args.output, rows)
+    print(f"Создан файл {args.output}: {len(rows)} работ")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+Общие помощники тестов. Модули проекта лежат в корне репозитория, а не в пакете.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_dag(rng, n, density=0.25, durations=(1, 6)):
+    """
+    Случайный ациклический граф: (работы, продолжительности, источники, цели)
+    для cpm.build_graph. Рёбра идут по возрастанию случайного ранга работ.
+    """
+    works = [f"T{i}" for i in range(n)]
+    rank = rng.permutation(n)
+    pairs = [(u, v) for u in range(n) for v in range(n) if rank[u] < rank[v] and rng.random() < density]
+    sources = [u for u, _ in pairs]
+    targets = [v for _, v in pairs]
+    return works, rng.integers(*durations, n).astype(float), sources, targets
+
+
+@pytest.fixture
+def random_dag():
+    return make_dag
@@ -0,0 +1,59 @@
+"""
+Массивное ядро CPM против прежнего расчета по графу networkx
+"""
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+import NONE
+
+
+def networkx_schedule(G, durations):
+    """
+    Прежний расчет calculate_critical_path: проходы по топологическому порядку networkx
+    """
+    order = list(nx.topological_sort(G))
+    early_start, early_finish = {}, {}
+    for node in order:
+        early_start[node] = max([early_finish[pred] for pred in G.predecessors(node)], default=0)
+        early_finish[node] = early_start[node] + durations[node]
+    project_duration = max(early_finish.values())
+    late_start = {}
+    for node in reversed(order):
+        late_finish = min([late_start[succ] for succ in G.successors(node)], default=project_duration)
+        late_start[node] = late_finish - durations[node]
+    total_slack = {node: late_start[node] - early_start[node] for node in order}
+    return early_start, early_finish, total_slack
+
+
+def project(works, durations, sources, targets):
+    df = pd.DataFrame({'Работа': works, 'Продолжительность': durations})
+    G = nx.DiGraph()
+    G.add_nodes_from(works)
+    G.add_edges_from((works[u], works[v]) for u, v in zip(sources, targets))
+    return df, G
+
+
+def test_matches_networkx_schedule(random_dag):
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        works, durations, sources, targets = random_dag(rng, int(rng.integers(1, 25)))
+        # Дробные продолжительности проверяют погрешность сравнения резервов
+        durations = durations / 4
+        df, G = project(works, durations, sources, targets)
+
+        early_start, early_finish, critical_path, total_slack = NONE.calculate_critical_path(df, G)
+        expected = networkx_schedule(G, dict(zip(works, durations)))
+
+        for actual, reference in zip((early_start, early_finish, total_slack), expected):
+            assert actual.keys() == reference.keys()
+            assert all(actual[work] == pytest.approx(reference[work]) for work in works)
+        assert set(critical_path) == {work for work in works if abs(expected[2][work]) < 1e-9}
+        position = {work: i for i, work in enumerate(critical_path)}
+        assert all(position[u] < position[v] for u, v in G.edges if u in position and v in position)
+
+
+def test_cycle_returns_nothing():
+    df, G = project(['A', 'B'], [1.0, 2.0], [0, 1], [1, 0])
+    assert NONE.calculate_critical_path(df, G) == (None, None, None, None)
@@ -0,0 +1,79 @@
+"""
+Кривая «срок — затраты» на минимальных разрезах против перебора продолжительностей
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+import cpm
+import crashing
+
+
+def random_project(make_dag, rng, n):
+    works, durations, sources, targets = make_dag(rng, n, density=0.35, durations=(2, 6))
+    graph = cpm.build_graph(works, durations, sources, targets)
+    crash_durations = np.maximum(durations - rng.integers(0, 3, n), 1.0)
+    crash_costs = rng.integers(1, 10, n).astype(float) * (durations - crash_durations)
+    return graph, crash_durations, crash_costs
+
+
+def brute_force(graph, crash_durations, crash_costs):
+    """
+    Наименьшие затраты для каждого целого срока перебором целых продолжительностей
+    (для линейных затрат оптимум задачи сокращения достигается на целых значениях)
+    """
+    normal = graph.durations
+    slopes = np.divide(crash_costs, normal - crash_durations, out=np.zeros(len(normal)),
+                       where=normal > crash_durations)
+    best = {}
+    choices = [range(int(crash), int(full) + 1) for crash, full in zip(crash_durations, normal)]
+    for durations in itertools.product(*choices):
+        durations = np.array(durations, dtype=np.float64)
+        trial = graph._replace(durations=durations)
+        duration = cpm.compute_schedule(trial).project_duration
+        cost = float(np.dot(slopes, normal - durations))
+        best[duration] = min(best.get(duration, np.inf), cost)
+    # Более длинный срок не дороже более короткого
+    for duration in sorted(best, reverse=True):
+        for longer in [d for d in best if d > duration]:
+            best[longer] = min(best[longer], best[duration])
+    return best
+
+
+def test_curve_matches_brute_force(random_dag):
+    rng = np.random.default_rng(4)
+    for _ in range(60):
+        graph, crash_durations, crash_costs = random_project(random_dag, rng, int(rng.integers(1, 7)))
+        curve = crashing.time_cost_curve(graph, crash_durations, crash_costs)
+        best = brute_force(graph, crash_durations, crash_costs)
+
+        durations = np.array([point.project_duration for point in curve])
+        costs = np.array([point.cost for point in curve])
+        assert np.all(np.diff(durations) < 0)
+        assert durations[-1] == pytest.approx(min(best))
+        for duration, cost in best.items():
+            if duration >= durations[-1]:
+                assert np.interp(duration, durations[::-1], costs[::-1]) == pytest.approx(cost)
+
+
+def test_cheapest_reduction_plan_is_consistent(random_dag):
+    rng = np.random.default_rng(5)
+    for _ in range(40):
+        graph, crash_durations, crash_costs = random_project(random_dag, rng, int(rng.integers(2, 7)))
+        best = brute_force(graph, crash_durations, crash_costs)
+        normal_duration = cpm.compute_schedule(graph).project_duration
+        days = float(rng.integers(1, 4))
+        point = crashing.cheapest_reduction(graph, crash_durations, crash_costs, days)
+
+        expected = max(normal_duration - days, min(best))
+        assert point.project_duration == pytest.approx(expected)
+        assert point.cost == pytest.approx(best[expected])
+
+        # План действительно дает этот срок за эти затраты
+        durations = graph.durations.copy()
+        for work, duration in point.plan.items():
+            durations[graph.index[work]] = duration
+        assert cpm.compute_schedule(graph._replace(durations=durations)).project_duration == pytest.approx(expected)
+        slopes = crash_costs / np.where(graph.durations > crash_durations, graph.durations - crash_durations, 1.0)
+        assert float(np.dot(slopes, graph.durations - durations)) == pytest.approx(point.cost)
@@ -0,0 +1,46 @@
+"""
+Циклы-свидетели по сильно связным компонентам и ограничение их числа
+"""
+import re
+
+import NONE
+
+CYCLE = re.compile(r"Обнаружена циклическая зависимость: (.*)\. Зависимости")
+
+
+def validate(tmp_path, rows, **kwargs):
+    path = tmp_path / 'project.csv'
+    path.write_text(''.join(f"{row}\n" for row in rows), encoding='utf-8')
+    df, _ = NONE.read_project_data(str(path))
+    is_valid, errors, warnings, _ = NONE.validate_dependencies(df, **kwargs)
+    return is_valid, [str(error) for error in errors]
+
+
+def witnesses(errors):
+    return [match.group(1).split(' -> ') for match in map(CYCLE.match, errors) if match]
+
+
+def test_shortest_witness_per_component(tmp_path):
+    # Длинный цикл A..E с хордой C -> A и отдельная компонента X <-> Y
+    rows = ['A, B, E;C, 1, 1', 'B, C, A, 1, 1', 'C, D;A, B, 1, 1', 'D, E, C, 1, 1', 'E, A, D, 1, 1',
+            'X, Y;Z, Y, 1, 1', 'Y, X, X, 1, 1', 'Z, -, X, 1, 1']
+    is_valid, errors = validate(tmp_path, rows)
+    assert not is_valid
+    assert witnesses(errors) == [['A', 'B', 'C'], ['X', 'Y']]
+
+
+def test_max_cycles_cap(tmp_path):
+    rows = []
+    for i in range(30):
+        rows += [f"P{i}, Q{i}, Q{i}, 1, 1", f"Q{i}, P{i}, P{i}, 1, 1"]
+    _, errors = validate(tmp_path, rows, max_cycles=5)
+    assert witnesses(errors) == [[f"P{i}", f"Q{i}"] for i in range(5)]
+    assert "Показано 5 из 30 циклических компонент; остальные не выводятся" in errors
+
+
+def test_dense_component_is_fast(tmp_path):
+    # Полный граф из 14 работ: простых циклов миллиарды, компонента одна
+    works = [f"W{i}" for i in range(14)]
+    rows = [f"{work}, {';'.join(other for other in works if other != work)}, -, 1, 1" for work in works]
+    _, errors = validate(tmp_path, rows)
+    assert witnesses(errors) == [['W0', 'W1']]
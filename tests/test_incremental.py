@@ -0,0 +1,79 @@
+"""
+Инкрементальный пересчет против полного расчета CPM после каждой правки
+"""
+import numpy as np
+import pytest
+
+import NONE
+import cpm
+import incremental
+
+
+def full_schedule(state):
+    edges = [(u, v) for u, successors in enumerate(state.succ) for v in successors]
+    sources, targets = (list(items) for items in zip(*edges)) if edges else ([], [])
+    graph = cpm.build_graph(state.works, state.durations, sources, targets)
+    return cpm.compute_schedule(graph)
+
+
+def assert_matches(state):
+    expected = full_schedule(state)
+    actual = state.schedule()
+    for field in ('early_start', 'early_finish', 'late_start', 'late_finish', 'total_slack'):
+        np.testing.assert_allclose(getattr(actual, field), getattr(expected, field), err_msg=field)
+    assert actual.project_duration == pytest.approx(expected.project_duration)
+
+    # Порядок Пирса–Келли остается топологическим
+    position = state.position
+    assert (state.order[position] == np.arange(len(state.works))).all()
+    assert all(position[u] < position[v] for u, successors in enumerate(state.succ) for v in successors)
+
+
+def test_random_edits_match_full_recompute(random_dag):
+    rng = np.random.default_rng(1)
+    for _ in range(30):
+        n = int(rng.integers(2, 15))
+        state = incremental.IncrementalSchedule(cpm.build_graph(*random_dag(rng, n, density=0.2, durations=(1, 10))))
+        works = state.works
+        for _ in range(25):
+            u, v = (int(node) for node in rng.integers(0, n, 2))
+            action = rng.integers(0, 4)
+            if action == 0:
+                state.set_duration(works[u], float(rng.integers(1, 10)))
+            elif action == 1:
+                state.set_durations({works[u]: float(rng.integers(1, 10)), works[v]: float(rng.integers(1, 10))})
+            elif action == 2 and v in state.succ[u]:
+                state.remove_dependency(works[u], works[v])
+            else:
+                before = state.schedule()
+                try:
+                    state.add_dependency(works[u], works[v])
+                except cpm.CycleError:
+                    # Отклоненное ребро не меняет ни граф, ни расписание
+                    assert v not in state.succ[u]
+                    np.testing.assert_array_equal(state.schedule().early_start, before.early_start)
+            assert_matches(state)
+
+
+def test_cycle_is_rejected():
+    graph = cpm.build_graph(['A', 'B', 'C'], [1.0, 2.0, 3.0], [0, 1], [1, 2])
+    state = incremental.IncrementalSchedule(graph)
+    with pytest.raises(cpm.CycleError):
+        state.add_dependency('C', 'A')
+    with pytest.raises(cpm.CycleError):
+        state.add_dependency('B', 'B')
+    assert_matches(state)
+
+
+def test_from_dataframe_matches_compile_project(tmp_path):
+    path = tmp_path / 'project.csv'
+    path.write_text("A, B;C, -, 3, 1\nB, D, A, 2, 4\nC, D, A, 1, 2\nD, -, B;C, 4, 0\n", encoding='utf-8')
+    df, G, errors, _ = NONE.load_project(str(path))
+    assert not errors
+
+    graph, workforce = NONE.compile_project(df, G)
+    state = incremental.IncrementalSchedule.from_dataframe(df, G)
+    assert state.works == graph.works
+    np.testing.assert_array_equal(state.durations, graph.durations)
+    np.testing.assert_array_equal(state.workforce, workforce)
+    assert state.set_duration('C', 5.0).critical_path == ['A', 'C', 'D']
@@ -0,0 +1,33 @@
+"""
+Пик памяти вложенных этапов
+"""
+import instrument
+
+MB = 2 ** 20
+
+
+def test_nested_stage_keeps_outer_peak():
+    recorder = instrument.Recorder(memory=True)
+    with recorder.stage('outer'):
+        block = bytearray(20 * MB)
+        del block
+        with recorder.stage('inner'):
+            small = bytearray(MB)
+            del small
+        with recorder.stage('second'):
+            block = bytearray(8 * MB)
+            del block
+    outer, inner, second = recorder.stages
+    assert outer['peak_memory'] >= 20 * MB
+    assert MB <= inner['peak_memory'] < 2 * MB
+    assert 8 * MB <= second['peak_memory'] < 9 * MB
+
+
+def test_inner_peak_counts_in_outer():
+    recorder = instrument.Recorder(memory=True)
+    with recorder.stage('outer'):
+        with recorder.stage('inner'):
+            block = bytearray(10 * MB)
+            del block
+    outer, inner = recorder.stages
+    assert outer['peak_memory'] >= inner['peak_memory'] >= 10 * MB
@@ -0,0 +1,75 @@
+"""
+Выравнивание ресурсов на дереве отрезков против прямого перебора по интервалам
+"""
+import numpy as np
+
+import cpm
+import leveling
+
+
+def naive_sgs(graph, workforce, capacity):
+    """
+    Та же последовательная схема с загрузкой в обычном массиве и поиском места перебором
+    """
+    schedule = cpm.compute_schedule(graph)
+    n = len(graph.works)
+    durations = graph.durations.astype(np.int64)
+    load = np.zeros(int(durations.sum()) + 1)
+    start = np.zeros(n)
+    done = set()
+    while len(done) < n:
+        ready = [node for node in range(n) if node not in done
+                 and all(pred in done for pred in graph.pred_idx[graph.pred_ptr[node]:graph.pred_ptr[node + 1]])]
+        node = min(ready, key=lambda i: (schedule.total_slack[i], schedule.late_start[i], i))
+        preds = graph.pred_idx[graph.pred_ptr[node]:graph.pred_ptr[node + 1]]
+        first = int(max([start[pred] + durations[pred] for pred in preds], default=0))
+        if workforce[node] > 0:
+            while (load[first:first + durations[node]] + workforce[node] > capacity + leveling.CAPACITY_EPS).any():
+                first += 1
+            load[first:first + durations[node]] += workforce[node]
+        start[node] = first
+        done.add(node)
+    return start
+
+
+def test_matches_naive_sgs(random_dag):
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        n = int(rng.integers(1, 12))
+        graph = cpm.build_graph(*random_dag(rng, n))
+        workforce = rng.integers(0, 6, n).astype(float)
+        capacity = float(rng.integers(max(workforce.max(), 1), 10))
+        result = leveling.level_resources(graph, workforce, capacity)
+
+        np.testing.assert_array_equal(result.start, naive_sgs(graph, workforce, capacity))
+
+        # Допустимость: предшествование и ограничение рабочей силы
+        for node in range(n):
+            for pred in graph.pred_idx[graph.pred_ptr[node]:graph.pred_ptr[node + 1]]:
+                assert result.finish[pred] <= result.start[node]
+        load = np.zeros(int(result.project_duration))
+        for node in range(n):
+            load[int(result.start[node]):int(result.finish[node])] += workforce[node]
+        assert load.max(initial=0.0) <= capacity
+        assert result.peak == load.max(initial=0.0)
+
+
+def test_earliest_fit_matches_scan():
+    rng = np.random.default_rng(3)
+    for _ in range(300):
+        horizon = int(rng.integers(1, 40))
+        profile = leveling.ResourceProfile(horizon + 20)
+        load = np.zeros(profile.size)
+        for _ in range(int(rng.integers(0, 8))):
+            lo = int(rng.integers(0, horizon))
+            hi = int(rng.integers(lo + 1, horizon + 1))
+            value = float(rng.integers(1, 5))
+            profile.add_range(lo, hi, value)
+            load[lo:hi] += value
+        start, length, demand, capacity = (int(rng.integers(0, horizon)), int(rng.integers(1, 6)),
+                                           float(rng.integers(1, 4)), 8.0)
+
+        expected = start
+        while (load[expected:expected + length] + demand > capacity).any():
+            expected += 1
+        assert profile.earliest_fit(start, length, demand, capacity) == expected
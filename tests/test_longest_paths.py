@@ -0,0 +1,53 @@
+"""
+Ранжированные самые длинные пути против перебора всех путей
+"""
+import numpy as np
+import pytest
+
+import cpm
+import longest_paths
+
+
+def all_paths(graph):
+    """
+    Все пути от начальных работ до конечных перебором в глубину
+    """
+    succ = [graph.succ_idx[graph.succ_ptr[u]:graph.succ_ptr[u + 1]].tolist() for u in range(len(graph.works))]
+    starts = np.flatnonzero(np.diff(graph.pred_ptr) == 0).tolist()
+    paths = []
+    stack = [[node] for node in starts]
+    while stack:
+        path = stack.pop()
+        if not succ[path[-1]]:
+            paths.append(path)
+        stack.extend(path + [node] for node in succ[path[-1]])
+    return paths
+
+
+def test_ranked_order_matches_brute_force(random_dag):
+    rng = np.random.default_rng(7)
+    for _ in range(100):
+        graph = cpm.build_graph(*random_dag(rng, int(rng.integers(1, 12)), density=0.3, durations=(1, 4)))
+        expected = all_paths(graph)
+        ranked = list(longest_paths.ranked_paths(graph))
+
+        assert sorted(map(tuple, expected)) == sorted(tuple(path.nodes) for path in ranked)
+        lengths = [path.length for path in ranked]
+        assert lengths == sorted(lengths, reverse=True)
+        for path in ranked:
+            assert path.length == pytest.approx(graph.durations[path.nodes].sum())
+            assert path.works == [graph.works[node] for node in path.nodes]
+
+
+def test_max_slack_and_critical_paths(random_dag):
+    rng = np.random.default_rng(8)
+    for _ in range(100):
+        graph = cpm.build_graph(*random_dag(rng, int(rng.integers(1, 12)), density=0.3, durations=(1, 4)))
+        duration = cpm.compute_schedule(graph).project_duration
+        lengths = sorted((graph.durations[path].sum() for path in all_paths(graph)), reverse=True)
+
+        near = longest_paths.ranked_paths(graph, max_slack=2.0)
+        assert [path.length for path in near] == [length for length in lengths if length >= duration - 2.0]
+        critical = longest_paths.critical_paths(graph)
+        assert len(critical) == lengths.count(duration) and all(path.slack == 0 for path in critical)
+        assert longest_paths.top_paths(graph, 3) == list(longest_paths.ranked_paths(graph))[:3]
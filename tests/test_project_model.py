@@ -0,0 +1,91 @@
+"""
+Проверки над скомпилированной моделью проекта дают те же сообщения, что и
+прежняя построчная валидация с графом networkx
+"""
+import pytest
+
+import NONE
+import project_model
+
+CASES = {
+    'values': (
+        ['A, B;C, -, 3, 1', '-, -, A, 2, 1', 'B, C, A, 0, -2', 'B, X!;C, A, 1, 1', 'C, -, A;B, -, 1',
+         'D, -, C, 2, -'],
+        [
+            "Строка 2, колонка 'Работа': Идентификатор работы не может быть '-'",
+            "Строка 3, колонка 'Продолжительность': Продолжительность должна быть положительной (получено 0.0)",
+            "Строка 3, колонка 'Рабочая сила': Рабочая сила не может быть отрицательной (получено -2.0)",
+            "Строка 4, колонка 'Последователи': Некорректный формат идентификатора 'X!' (позиция 1)",
+            "Строка 5, колонка 'Продолжительность': Некорректный тип данных 'str'",
+            "Строка 6, колонка 'Рабочая сила': Некорректный тип данных 'str'",
+            "Дублирование идентификатора работы 'B' в строках: 3, 4",
+        ],
+        None,
+    ),
+    'dependencies': (
+        ['A, B;Q, -, 3, 1', 'B, C, A;Z, 2, 1', 'C, A;C, B, 1, 1', 'D, E, E, 2, 1', 'E, D, D, 1, 1', 'F, -, -, 1, 1'],
+        [],
+        (
+            [
+                "Строка 1: Последователь 'Q' для работы 'A' не существует",
+                "Строка 2: Предшественник 'Z' для работы 'B' не существует",
+                "Обнаружена циклическая зависимость: A -> B -> C. "
+                "Зависимости: A->B (строка 2), B->C (строка 3), C->A (строка 3)",
+                "Обнаружена циклическая зависимость: D -> E. Зависимости: D->E (строка 5), E->D (строка 5)",
+                "Работа 'C' зависит от самой себя (строка 3)",
+            ],
+            ["Граф не является слабосвязным. Обнаружено 3 компонент связности:\n"
+             "Компонент 1: A, B, C\nКомпонент 2: D, E\nКомпонент 3: F"],
+        ),
+    ),
+    'closed_loop': (
+        ['A, B, C, 1, 1', 'B, C, A, 1, 1', 'C, A, B, 1, 1'],
+        [],
+        (
+            [
+                "Обнаружена циклическая зависимость: A -> B -> C. "
+                "Зависимости: A->B (строка 2), B->C (строка 3), C->A (строка 3)",
+                "Не найдено начальных работ (без предшественников)",
+                "Не найдено конечных работ (без последователей)",
+            ],
+            [],
+        ),
+    ),
+}
+
+
+def read(tmp_path, rows):
+    path = tmp_path / 'project.csv'
+    path.write_text(''.join(f"{row}\n" for row in rows), encoding='utf-8')
+    df, _ = NONE.read_project_data(str(path))
+    return df
+
+
+@pytest.mark.parametrize('case', sorted(CASES))
+def test_messages_match_row_validation(tmp_path, case):
+    rows, data_errors, dependency_messages = CASES[case]
+    df = read(tmp_path, rows)
+    model = project_model.compile_model(df)
+
+    for given in (None, model):
+        is_valid, errors = NONE.validate_csv_data(df, model=given)
+        assert [str(error) for error in errors] == data_errors
+        assert is_valid == (not data_errors)
+        if dependency_messages is None:
+            continue
+        is_valid, errors, warnings, G = NONE.validate_dependencies(df, model=given)
+        assert ([str(error) for error in errors], [str(warning) for warning in warnings]) == dependency_messages
+        assert is_valid == (not dependency_messages[0])
+
+
+def test_graph_matches_rows(tmp_path):
+    df = read(tmp_path, ['A, B;C, -, 3, 1', 'B, D, A, 2, 1', 'C, D, A;B, 1, 1', 'D, -, -, 4, 1'])
+    _, _, _, G = NONE.validate_dependencies(df)
+    assert list(G.nodes) == ['A', 'B', 'C', 'D']
+    assert sorted(G.edges) == [('A', 'B'), ('A', 'C'), ('B', 'C'), ('B', 'D'), ('C', 'D')]
+
+    graph = project_model.build_graph(df, project_model.compile_model(df))
+    assert graph.works == ['A', 'B', 'C', 'D']
+    assert graph.durations.tolist() == [3.0, 2.0, 1.0, 4.0]
+    assert sorted((graph.works[u], graph.works[v]) for u in range(4)
+                  for v in graph.succ_idx[graph.succ_ptr[u]:graph.succ_ptr[u + 1]].tolist()) == sorted(G.edges)
@@ -0,0 +1,57 @@
+"""
+Блочное чтение CSV: результат не зависит от размера блока
+"""
+import pandas as pd
+import pytest
+
+import NONE
+import validation
+
+PROJECT = """A, B;C, -, 3, 1
+B, D, A, 1_000, 2
+
+C, D, A, два, 0
+D, -, B;C, 2.5
+E, -, -, nan, 4
+F, -, -, -, x
+"""
+
+EXPECTED_ERRORS = [
+    "Строка 5: Недостаточно колонок (ожидается 5, получено 4)",
+    "Строка 4, колонка 'Продолжительность': Некорректное числовое значение 'два'",
+    "Строка 7, колонка 'Рабочая сила': Некорректное числовое значение 'x'",
+]
+
+
+@pytest.fixture
+def project_file(tmp_path):
+    path = tmp_path / 'project.csv'
+    path.write_text(PROJECT, encoding='utf-8')
+    return str(path)
+
+
+def test_reads_cells_and_errors(project_file):
+    df, errors = NONE.read_project_data(project_file)
+    assert [str(error) for error in errors] == EXPECTED_ERRORS
+    assert df['Работа'].tolist() == ['A', 'B', 'C', 'E', 'F']
+    assert df['Последователи'].tolist() == ['B,C', 'D', 'D', '-', '-']
+    assert df['ИсходнаяСтрока'].tolist() == [1, 2, 4, 6, 7]
+    assert df['Продолжительность'].tolist()[:2] == [3.0, 1000.0]
+    assert pd.isna(df['Продолжительность'].iat[2]) and pd.isna(df['Продолжительность'].iat[3])
+    assert df['Продолжительность'].iat[4] == '-'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5])
+def test_chunk_boundaries(project_file, chunk_size):
+    expected_df, expected_errors = NONE.read_project_data(project_file)
+    df, errors = NONE.read_project_data(project_file, chunk_size=chunk_size)
+    pd.testing.assert_frame_equal(df, expected_df)
+    assert [str(error) for error in errors] == [str(error) for error in expected_errors]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 100])
+def test_fail_fast_keeps_rows_before_first_error(project_file, chunk_size):
+    limits = validation.Limits(fail_fast=True)
+    df, errors = NONE.read_project_data(project_file, chunk_size=chunk_size, limits=limits)
+    assert df['Работа'].tolist() == ['A', 'B']
+    assert [(error.line, error.code) for error in errors] == [(4, 'bad_number')]
@@ -0,0 +1,131 @@
+"""
+Запросы к сервису расписаний: LocalClient и ServiceClient по HTTP
+"""
+import asyncio
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import service
+
+PROJECT = """A, B, -, 2, 1
+B, -, A, 3, 2
+C, -, -, 1, 4
+"""
+
+CYCLE = """A, B, B, 2, 1
+B, A, A, 3, 1
+"""
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = service.ProjectStore()
+    store.add(write(tmp_path / 'plan.csv', PROJECT))
+    store.add(write(tmp_path / 'cycle.csv', CYCLE))
+    return store
+
+
+@pytest.fixture
+def http_client(store):
+    """
+    Сервер на свободном порту в отдельном потоке и клиент к нему
+    """
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(service.ScheduleService(store).start(port=0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    client = service.ServiceClient(port=server.sockets[0].getsockname()[1])
+    yield client
+    client.close()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+@pytest.fixture(params=['local', 'http'])
+def client(request, store):
+    if request.param == 'local':
+        return service.LocalClient(store)
+    return request.getfixturevalue('http_client')
+
+
+def test_critical_path(client):
+    result = client.critical_path('plan')
+    assert result == {'project_duration': 5.0, 'critical_path': ['A', 'B']}
+
+
+def test_task(client):
+    task = client.task('plan', 'B')
+    assert (task['early_start'], task['early_finish'], task['slack'], task['critical']) == (2.0, 5.0, 0.0, True)
+    with pytest.raises(service.QueryError) as error:
+        client.task('plan', 'Z')
+    assert error.value.status == 404
+
+
+def test_slack(client):
+    result = client.slack('plan', above=0.5)
+    assert [task['work'] for task in result['tasks']] == ['C']
+    assert result['tasks'][0]['slack'] == 4.0
+
+
+def test_workforce(client):
+    result = client.workforce('plan', 0, 2)
+    assert (result['peak'], result['mean']) == (5.0, 3.0)
+    assert result['daily'] == [{'day': 0, 'load': 5.0}, {'day': 1, 'load': 1.0}]
+
+
+def test_empty_interval(client):
+    with pytest.raises(service.QueryError) as error:
+        client.workforce('plan', 3, 3)
+    assert error.value.status == 400
+
+
+def test_invalid_project(client):
+    with pytest.raises(service.QueryError) as error:
+        client.critical_path('cycle')
+    assert error.value.status == 422
+    assert error.value.details['errors']
+
+
+def test_reload_after_change(client, store):
+    assert client.critical_path('plan')['project_duration'] == 5.0
+    path = store.paths['plan']
+    write_time = os.stat(path).st_mtime_ns
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(PROJECT.replace('B, -, A, 3, 2', 'B, -, A, 7, 2'))
+    # Отпечаток файла должен измениться даже при грубом разрешении mtime
+    os.utime(path, ns=(write_time + 10 ** 9, write_time + 10 ** 9))
+
+    assert client.critical_path('plan')['project_duration'] == 9.0
+    assert client.task('plan', 'C')['slack'] == 8.0
+
+
+def test_bad_content_length(http_client):
+    with socket.create_connection((http_client.connection.host, http_client.connection.port), timeout=10) as sock:
+        sock.sendall(b"GET /projects HTTP/1.1\r\nHost: localhost\r\nContent-Length: abc\r\n\r\n")
+        response = b''
+        while chunk := sock.recv(65536):
+            response += chunk
+    head, _, body = response.partition(b'\r\n\r\n')
+    assert head.startswith(b"HTTP/1.1 400 ")
+    assert json.loads(body)['error'] == "Некорректный заголовок Content-Length"
+
+
+def test_load_is_serial(store, monkeypatch):
+    calls = []
+    compute_schedule = service.parallel_cpm.compute_schedule
+    monkeypatch.setattr(service.parallel_cpm, 'compute_schedule',
+                        lambda graph, workers=None: calls.append(workers) or compute_schedule(graph, workers))
+    service.LocalClient(store).critical_path('plan')
+    assert calls == [1]
@@ -0,0 +1,86 @@
+"""
+Ограничение числа записей об ошибках, сводные записи и fail_fast
+"""
+import pytest
+
+import NONE
+import validation
+
+
+def test_caps_and_summary_records():
+    log = validation.IssueLog(validation.Limits(default=2, caps={'short_row': 1}))
+    log.add_rows('short_row', [1, 2, 3, 4, 5], values=[1, 1, 2, 1, 3])
+    log.add_rows('bad_number', [6, 7, 8], 'Продолжительность', ['x', 'y', 'z'])
+    log.add(validation.Issue(None, None, 'disconnected', 2, [['A'], ['B']]))
+
+    errors = log.records()
+    assert [(error.line, error.code) for error in errors] == [
+        (1, 'short_row'), (6, 'bad_number'), (7, 'bad_number'), (None, 'suppressed'), (None, 'suppressed')]
+    assert str(errors[0]) == "Строка 1: Недостаточно колонок (ожидается 5, получено 1)"
+    assert str(errors[3]) == "Не показано еще 4 записей с кодом 'short_row'"
+    assert str(errors[4]) == "Не показано еще 1 записей с кодом 'bad_number'"
+    assert validation.count(errors) == 8
+    assert [warning.code for warning in log.records(warnings=True)] == ['disconnected']
+    assert log.has_errors()
+
+
+def test_uncapped_log_keeps_everything():
+    log = validation.IssueLog(validation.Limits(default=None))
+    log.add_rows('short_row', list(range(1, 501)), values=[1] * 500)
+    assert len(log.records()) == 500 and validation.count(log.records()) == 500
+
+
+def test_fail_fast_stops_on_errors_only():
+    log = validation.IssueLog(validation.Limits(fail_fast=True))
+    log.add(validation.Issue(None, None, 'disconnected', 2, [['A'], ['B']]))
+    with pytest.raises(validation.FailFast) as stop:
+        log.add_rows('short_row', [3, 4], values=[1, 1])
+    assert (stop.value.issue.line, stop.value.issue.code) == (3, 'short_row')
+
+
+def test_wrong_delimiter_is_capped(tmp_path):
+    path = tmp_path / 'project.csv'
+    path.write_text(''.join(f"W{i};-;-;1;1\n" for i in range(10000)), encoding='utf-8')
+
+    df, G, errors, warnings = NONE.load_project(str(path), limits=validation.Limits(default=3))
+    assert G is None
+    # Без колонок проверка данных сообщает об отсутствующих колонках, тоже не больше трех
+    assert [(error.line, error.code) for error in errors[:4]] == [
+        (1, 'short_row'), (2, 'short_row'), (3, 'short_row'), (None, 'suppressed')]
+    assert str(errors[3]) == "Не показано еще 9997 записей с кодом 'short_row'"
+    assert [error.code for error in errors[4:]] == ['missing_column'] * 3 + ['suppressed']
+    assert validation.count(errors) == 10000 + 5
+
+    _, _, errors, _ = NONE.load_project(str(path), limits=validation.Limits(fail_fast=True))
+    assert [str(error) for error in errors] == ["Строка 1: Недостаточно колонок (ожидается 5, получено 1)"]
+
+
+def test_records_store_fields_only():
+    issue = validation.Issue(4, 'Продолжительность', 'bad_number', 'два')
+    assert not isinstance(issue, str) and tuple(issue) == (4, 'Продолжительность', 'bad_number', 'два', None)
+    assert str(issue) == issue.message == "Строка 4, колонка 'Продолжительность': Некорректное числовое значение 'два'"
+    assert validation.restore(validation.dump([issue, 'текст'])) == [issue, 'текст']
+    assert validation.messages([issue, 'текст']) == [issue.message, 'текст']
+
+
+def test_log_streams_records():
+    log = validation.IssueLog(validation.Limits(default=1))
+    log.add_rows('short_row', [1, 2], values=[1, 1])
+    assert [issue.line for issue in log.drain()] == [1]
+    log.add_rows('bad_number', [3], 'Продолжительность', ['x'])
+    assert [issue.line for issue in log.drain()] == [3]
+    assert list(log.drain()) == []
+    assert [issue.code for issue in log] == ['short_row', 'bad_number', 'suppressed']
+
+
+def test_iter_issues_yields_per_chunk(tmp_path):
+    path = tmp_path / 'project.csv'
+    path.write_text("A, B, -, 1, 1\nB, -, A, x, 1\nC;-;-;1;1\nD, -, -, 1, 1\n", encoding='utf-8')
+
+    # Записи идут по блокам: ошибка первого блока раньше короткой строки второго
+    issues = list(NONE.iter_issues(str(path), chunk_size=2))
+    assert [(issue.line, issue.code) for issue in issues] == [
+        (2, 'bad_number'), (3, 'short_row'), (2, 'missing_number')]
+
+    _, _, errors, warnings = NONE.load_project(str(path))
+    assert sorted(map(str, issues)) == sorted(map(str, errors + warnings))
@@ -0,0 +1,115 @@
+"""
+Расписание в датах по рабочим календарям и профиль рабочей силы бригад
+"""
+import numpy as np
+
+import cpm
+import work_calendar
+
+# Понедельник; среда 2026-01-07 — праздник
+START = '2026-01-05'
+HOLIDAYS = ['2026-01-07']
+
+
+def random_calendars(rng, works):
+    team = [work for work in works if rng.random() < 0.5]
+    return work_calendar.WorkCalendars(START, holidays=HOLIDAYS,
+                                       teams={'Бригада': {'weekmask': '0011111', 'works': team}})
+
+
+def day_by_day(graph, calendars, ids):
+    """
+    Прямой проход по дням: работа начинается в первый рабочий день своего
+    календаря после окончания предшественников и занимает столько рабочих дней, какова ее продолжительность
+    """
+    early_start = np.zeros(len(graph.works))
+    early_finish = np.zeros(len(graph.works))
+    for node in cpm.compute_schedule(graph).order.tolist():
+        preds = graph.pred_idx[graph.pred_ptr[node]:graph.pred_ptr[node + 1]]
+        day = int(max(early_finish[preds], default=0.0))
+        calendars._ensure(calendar_days=day + 400)
+        while not calendars.working[ids[node], day]:
+            day += 1
+        early_start[node] = day
+        left = graph.durations[node]
+        while left > 0:
+            left -= calendars.working[ids[node], day]
+            day += 1
+        early_finish[node] = day
+    return early_start, early_finish
+
+
+def sampled_load(dated, workforce, calendars, ids, step=0.25):
+    """
+    Загрузка в серединах отрезков длины step: работа загружает только рабочие дни своего календаря
+    """
+    times = np.arange(0.0, dated.project_duration, step) + step / 2
+    load = np.zeros(times.size)
+    for i in range(len(ids)):
+        busy = (dated.early_start[i] <= times) & (times < dated.early_finish[i])
+        working = calendars.working[ids[i], np.floor(times).astype(np.int64)]
+        load += workforce[i] * (busy & working)
+    return times, load
+
+
+def test_dates_skip_weekends_and_holidays():
+    graph = cpm.build_graph(['A', 'B'], [2.0, 3.0], [0], [1])
+    calendars = work_calendar.WorkCalendars(START, holidays=HOLIDAYS)
+    dated = work_calendar.dated_schedule(graph, calendars)
+
+    # A — пн и вт; B — чт, пт и следующий пн
+    assert dated.early_start.tolist() == [0.0, 3.0]
+    assert dated.early_finish.tolist() == [2.0, 8.0]
+    assert calendars.to_dates(dated.early_finish, finish=True).astype(str).tolist() == ['2026-01-06', '2026-01-12']
+    assert calendars.to_working_days(['2026-01-08', '2026-01-12']).tolist() == [2, 4]
+
+
+def test_team_calendars_match_day_by_day(random_dag):
+    rng = np.random.default_rng(9)
+    for _ in range(100):
+        works, durations, sources, targets = random_dag(rng, int(rng.integers(1, 10)))
+        graph = cpm.build_graph(works, durations, sources, targets)
+        calendars = random_calendars(rng, works)
+        dated = work_calendar.dated_schedule(graph, calendars)
+
+        early_start, early_finish = day_by_day(graph, calendars, calendars.calendar_ids(works))
+        np.testing.assert_array_equal(dated.early_start, early_start)
+        np.testing.assert_array_equal(dated.early_finish, early_finish)
+        assert (dated.total_slack >= 0).all()
+
+
+def test_daily_load_skips_non_working_days():
+    # 2026-01-16 — пятница: X работает пт и пн, Y — только в субботу
+    graph = cpm.build_graph(['X', 'Y'], [2.0, 1.0], [], [])
+    calendars = work_calendar.WorkCalendars('2026-01-16', teams={'Суббота': {'weekmask': '0000010', 'works': ['Y']}})
+    dated = work_calendar.dated_schedule(graph, calendars)
+    profile = work_calendar.build_profile(graph, dated, [5.0, 7.0], calendars)
+
+    assert profile.daily.tolist() == [5.0, 7.0, 0.0, 5.0]
+
+
+def test_peak_skips_non_working_days():
+    graph = cpm.build_graph(['X', 'Y'], [2.0, 1.0], [], [])
+    calendars = work_calendar.WorkCalendars('2026-01-16', teams={'Суббота': {'weekmask': '0000010', 'works': ['Y']}})
+    dated = work_calendar.dated_schedule(graph, calendars)
+    profile = work_calendar.build_profile(graph, dated, [5.0, 7.0], calendars)
+
+    assert profile.peak == 7.0
+    assert profile.peak_intervals == [(1.0, 2.0)]
+
+
+def test_peak_matches_sampled_load(random_dag):
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        works, durations, sources, targets = random_dag(rng, int(rng.integers(1, 8)))
+        graph = cpm.build_graph(works, durations, sources, targets)
+        calendars = random_calendars(rng, works)
+        workforce = rng.integers(1, 9, len(works)).astype(float)
+        dated = work_calendar.dated_schedule(graph, calendars)
+        profile = work_calendar.build_profile(graph, dated, workforce, calendars)
+
+        times, load = sampled_load(dated, workforce, calendars, calendars.calendar_ids(works))
+        assert np.isclose(profile.peak, load.max())
+        at_peak = np.isclose(load, profile.peak)
+        in_intervals = np.array([any(begin <= t < end for begin, end in profile.peak_intervals) for t in times])
+        assert (at_peak == in_intervals).all()
@@ -0,0 +1,39 @@
+"""
+Профиль рабочей силы с дробными сроками против прямого подсчета
+"""
+import numpy as np
+import pytest
+
+import workload
+
+
+def test_fractional_days():
+    # Работа [0.5, 2.25) с силой 4 и работа [1, 1.5) с силой 2
+    profile = workload.build_profile([0.5, 1.0], [2.25, 1.5], [4.0, 2.0])
+    np.testing.assert_allclose(profile.daily, [2.0, 5.0, 1.0])
+    assert profile.peak == 6.0
+    assert profile.peak_intervals == [(1.0, 1.5)]
+    assert profile.mean == pytest.approx((4 * 1.75 + 2 * 0.5) / 2.25)
+
+
+def test_matches_sampled_load():
+    rng = np.random.default_rng(6)
+    step = 0.125
+    for _ in range(200):
+        n = int(rng.integers(1, 10))
+        starts = rng.integers(0, 40, n) * step
+        finishes = starts + rng.integers(1, 30, n) * step
+        workforce = rng.integers(0, 6, n).astype(float)
+        profile = workload.build_profile(starts, finishes, workforce)
+
+        # Загрузка в серединах отрезков сетки шага step
+        times = np.arange(0.0, finishes.max(), step) + step / 2
+        load = ((starts[:, None] <= times) & (times < finishes[:, None])).T @ workforce
+        days = int(np.ceil(finishes.max()))
+        daily = np.bincount(np.floor(times).astype(np.int64), weights=load * step, minlength=days)
+
+        np.testing.assert_allclose(profile.daily, daily)
+        assert profile.peak == pytest.approx(max(load.max(), 0.0))
+        at_peak = np.isclose(load, profile.peak) & (load > 0)
+        in_intervals = np.array([any(begin <= t < end for begin, end in profile.peak_intervals) for t in times])
+        assert (at_peak == in_intervals).all()
@@ -0,0 +1,273 @@
+"""
+Структурированные ошибки чтения и валидации проекта.
+
+Ошибка — запись Issue с полями line, column, code, value, detail. Запись
+хранит только поля: текст сообщения (как прежние сообщения об ошибках)
+формируется по шаблону кода при обращении — str(issue) или issue.message,
+поэтому разбор испорченного файла не создает миллионы строк. Записи
+поступают в журнал IssueLog по мере обнаружения (по блокам чтения и по
+проверкам). Журнал хранит не больше заданного числа записей каждого кода:
+остальные только подсчитываются, и в конце журнала добавляется по одной
+сводной записи на код. В режиме fail_fast первая ошибка прерывает этап
+валидации. Журнал можно читать потоком: итерация по IssueLog выдает
+сохраненные и сводные записи, а drain() — записи, появившиеся после
+предыдущего вызова; NONE.iter_issues выдает записи проекта по мере чтения.
+
+Пример:
+    limits = validation.Limits(default=20, caps={'short_row': 5}, fail_fast=True)
+    df, G, errors, warnings = NONE.load_project('DATA.csv', limits=limits)
+    for issue in errors:
+        print(issue.line, issue.code, issue)
+"""
+from collections import Counter, namedtuple
+
+# Число сохраняемых записей каждого кода по умолчанию
+DEFAULT_CAP = 100
+
+# Коды предупреждений: не делают проект недопустимым и не прерывают fail_fast
+WARNING_CODES = {'disconnected'}
+
+
+def _cell(issue):
+    return f"Строка {issue.line}, колонка '{issue.column}'"
+
+
+def _source(line):
+    return "неизвестный источник" if line is None else f"строка {line}"
+
+
+def _cycle(issue):
+    works = issue.value
+    edges = ', '.join(f"{works[i]}->{works[(i + 1) % len(works)]} ({_source(line)})"
+                      for i, line in enumerate(issue.detail))
+    return f"Обнаружена циклическая зависимость: {' -> '.join(works)}. Зависимости: {edges}"
+
+
+def _disconnected(issue):
+    components = '\n'.join(f"Компонент {i}: {', '.join(component)}" for i, component in enumerate(issue.detail, 1))
+    return f"Граф не является слабосвязным. Обнаружено {issue.value} компонент связности:\n{components}"
+
+
+# Шаблоны сообщений по кодам
+MESSAGES = {
+    'missing_column': lambda issue: f"Отсутствует обязательная колонка: {issue.column}",
+    'short_row': lambda issue: f"Строка {issue.line}: Недостаточно колонок (ожидается 5, получено {issue.value})",
+    'bad_number': lambda issue: f"{_cell(issue)}: Некорректное числовое значение '{issue.value}'",
+    'empty_work': lambda issue: f"{_cell(issue)}: Идентификатор работы не может быть '-'",
+    'missing_number': lambda issue: f"{_cell(issue)}: Отсутствует числовое значение",
+    'bad_type': lambda issue: f"{_cell(issue)}: Некорректный тип данных '{issue.value}'",
+    'non_positive_duration': lambda issue: f"{_cell(issue)}: Продолжительность должна быть положительной "
+                                           f"(получено {issue.value})",
+    'negative_workforce': lambda issue: f"{_cell(issue)}: Рабочая сила не может быть отрицательной "
+                                        f"(получено {issue.value})",
+    'bad_identifier': lambda issue: f"{_cell(issue)}: Некорректный формат идентификатора '{issue.value}' "
+                                    f"(позиция {issue.detail})",
+    'duplicate_work': lambda issue: f"Дублирование идентификатора работы '{issue.value}' в строках: "
+                                    f"{', '.join(map(str, issue.detail))}",
+    'unknown_reference': lambda issue: f"Строка {issue.line}: "
+                                       f"{'Предшественник' if issue.column == 'Предшественники' else 'Последователь'} "
+                                       f"'{issue.value}' для работы '{issue.detail}' не существует",
+    'cycle': _cycle,
+    'cycles_truncated': lambda issue: f"Показано {issue.value} из {issue.detail} циклических компонент; "
+                                      f"остальные не выводятся",
+    'self_loop': lambda issue: f"Работа '{issue.value}' зависит от самой себя ({_source(issue.line)})",
+    'no_start': lambda issue: "Не найдено начальных работ (без предшественников)",
+    'no_end': lambda issue: "Не найдено конечных работ (без последователей)",
+    'disconnected': _disconnected,
+    'suppressed': lambda issue: f"Не показано еще {issue.value} записей с кодом '{issue.detail}'",
+}
+
+
+def _head(items, keep):
+    """
+    Первые keep элементов массива, Series или списка как список значений Python
+    """
+    items = items[:keep]
+    return items.tolist() if hasattr(items, 'tolist') else list(items)
+
+
+Record = namedtuple('Record', [
+    'line',    # номер строки файла или None
+    'column',  # колонка или None
+    'code',    # код вида ошибки (ключ MESSAGES)
+    'value',   # значение ячейки или основной параметр сообщения
+    'detail',  # подробности (позиция, строки, работа и т. п.)
+], defaults=(None, None))
+
+
+class Issue(Record):
+    """
+    Запись об ошибке или предупреждении. Хранит только поля Record; текст
+    сообщения формируется по шаблону кода при обращении (str(issue) или
+    issue.message)
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return self.message
+
+    @property
+    def message(self):
+        return MESSAGES[self.code](self)
+
+
+Limits = namedtuple('Limits', [
+    'default',    # число сохраняемых записей каждого кода (None — без ограничения)
+    'caps',       # словарь код -> число сохраняемых записей этого кода
+    'fail_fast',  # прервать этап на первой ошибке
+], defaults=(DEFAULT_CAP, None, False))
+
+
+class FailFast(Exception):
+    """
+    Первая ошибка в режиме fail_fast: этап валидации прерывается
+    """
+
+    def __init__(self, issue):
+        super().__init__(issue)
+        self.issue = issue
+
+
+class IssueLog:
+    """
+    Журнал записей одного этапа с ограничением числа записей каждого кода
+    """
+
+    def __init__(self, limits=None):
+        limits = limits or Limits()
+        self.default = limits.default
+        self.caps = dict(limits.caps or {})
+        self.fail_fast = limits.fail_fast
+        self.issues = []
+        self.counts = Counter()
+        self.drained = 0
+
+    def __iter__(self):
+        """
+        Поток записей журнала: сохраненные записи, затем сводные записи о непоказанных
+        """
+        yield from self.issues
+        yield from self.summary()
+
+    def room(self, code):
+        """
+        Сколько записей кода code еще будет сохранено
+        """
+        cap = self.caps.get(code, self.default)
+        return None if cap is None else max(cap - self.counts[code], 0)
+
+    def add(self, issue):
+        """
+        Добавление одной записи
+        """
+        room = self.room(issue.code)
+        self.counts[issue.code] += 1
+        if room is None or room > 0:
+            self.issues.append(issue)
+        if self.fail_fast and issue.code not in WARNING_CODES:
+            raise FailFast(issue)
+
+    def add_rows(self, code, lines, column=None, values=None, details=None, describe=None):
+        """
+        Пакет записей кода code по строкам lines (массив или список) со
+        значениями values (преобразуются функцией describe) и подробностями
+        details. Записи создаются только для сохраняемых строк, остальные
+        подсчитываются.
+        """
+        total = len(lines)
+        if not total:
+            return
+        room = self.room(code)
+        keep = total if room is None else min(total, room)
+        lines, values, details = (None if items is None else _head(items, keep) for items in (lines, values, details))
+        if values is not None and describe is not None:
+            values = [describe(value) for value in values]
+        for k in range(keep):
+            self.add(Issue(lines[k], column, code,
+                           None if values is None else values[k],
+                           None if details is None else details[k]))
+        self.skip(code, total - keep)
+
+    def skip(self, code, count):
+        """
+        Учет count записей кода code без сохранения
+        """
+        if count:
+            self.counts[code] += count
+            if self.fail_fast and code not in WARNING_CODES:
+                raise FailFast(Issue(None, None, 'suppressed', count, code))
+
+    def sort(self, key, start=0):
+        """
+        Устойчивая сортировка записей начиная с позиции start
+        """
+        self.issues[start:] = sorted(self.issues[start:], key=key)
+
+    def has_errors(self):
+        """
+        Есть ли ошибки (в том числе непоказанные)
+        """
+        return any(count for code, count in self.counts.items() if code not in WARNING_CODES)
+
+    def drain(self):
+        """
+        Записи, сохраненные после предыдущего вызова drain, в порядке
+        добавления (для выдачи потоком по мере чтения)
+        """
+        start, self.drained = self.drained, len(self.issues)
+        yield from self.issues[start:]
+
+    def clear(self):
+        """
+        Удаление всех записей и счетчиков; ограничения журнала сохраняются
+        """
+        self.issues.clear()
+        self.counts.clear()
+        self.drained = 0
+
+    def summary(self):
+        """
+        Сводные записи о непоказанных записях каждого кода
+        """
+        for code, count in self.counts.items():
+            cap = self.caps.get(code, self.default)
+            if cap is not None and count > cap:
+                yield Issue(None, None, 'suppressed', count - cap, code)
+
+    def records(self, warnings=False):
+        """
+        Сохраненные ошибки (или предупреждения при warnings=True) и сводные
+        записи о непоказанных
+        """
+        records = [issue for issue in self.issues if (issue.code in WARNING_CODES) == warnings]
+        records.extend(issue for issue in self.summary() if (issue.detail in WARNING_CODES) == warnings)
+        return records
+
+
+def count(records):
+    """
+    Число ошибок в списке записей с учетом непоказанных (сообщения-строки считаются по одной)
+    """
+    return sum(record.value if isinstance(record, Issue) and record.code == 'suppressed' else 1
+               for record in records)
+
+
+def messages(records):
+    """
+    Тексты сообщений записей (для JSON-ответов и отчетов)
+    """
+    return [str(record) for record in records]
+
+
+def dump(records):
+    """
+    Записи для JSON: поля Issue списком, прочие сообщения строками
+    """
+    return [list(record) if isinstance(record, Issue) else record for record in records]
+
+
+def restore(records):
+    """
+    Записи из JSON (dump) обратно в Issue; строки остаются строками
+    """
+    return [record if isinstance(record, str) else Issue(*record) for record in records]
@@ -0,0 +1,296 @@
+"""
+Рабочие календари: расписание проекта в датах.
+
+Календарь (дата начала проекта, рабочие дни недели, праздники)
+компилируется в массивы по календарным дням от даты начала: признак
+рабочего дня, число рабочих дней до каждого дня и индекс рабочих дней
+(номер календарного дня каждого рабочего дня). Перевод всех сроков
+расписания между рабочими днями и календарным временем — одна векторная
+выборка по этим массивам; массивы удваиваются, если горизонта не хватает.
+
+Бригады могут работать по своим календарям (другие выходные и праздники).
+Тогда сроки считаются в календарных днях от начала проекта: прямой и
+обратный проходы CPM идут по топологическим уровням, и продолжительность
+каждой работы отсчитывается по рабочим дням ее календаря.
+
+Файл определения календарей (JSON):
+    {
+        "start": "2026-01-12",
+        "weekmask": "1111100",
+        "holidays": ["2026-02-23", "2026-03-09"],
+        "teams": {
+            "Монтаж": {"weekmask": "1111110", "holidays": [], "works": ["E", "K"]}
+        }
+    }
+"""
+import json
+from collections import namedtuple
+
+import numpy as np
+
+import cpm
+import workload
+
+# Рабочие дни недели по умолчанию (понедельник — пятница)
+DEFAULT_WEEKMASK = '1111100'
+
+# Начальный горизонт компиляции календарей, календарных дней
+DEFAULT_HORIZON = 1024
+
+DatedSchedule = namedtuple('DatedSchedule', [
+    'order',             # int64[n] топологический порядок
+    'early_start',       # float64[n] сроки в календарных днях от даты начала проекта
+    'early_finish',      # float64[n]
+    'late_start',        # float64[n]
+    'late_finish',       # float64[n]
+    'total_slack',       # float64[n] полный резерв, календарных дней
+    'project_duration',  # длительность проекта, календарных дней
+    'start',             # datetime64[D] дата начала проекта
+])
+
+
+class WorkCalendars:
+    """
+    Календарь проекта (номер 0) и календари бригад, скомпилированные в
+    массивы по календарным дням от даты начала проекта
+    """
+
+    def __init__(self, start, weekmask=DEFAULT_WEEKMASK, holidays=(), teams=None, horizon=DEFAULT_HORIZON):
+        self.start = np.datetime64(start, 'D')
+        teams = teams or {}
+        self.names = [None] + list(teams)
+        self.definitions = [np.busdaycalendar(weekmask=weekmask, holidays=list(holidays))]
+        self.assignment = {}
+        for k, team in enumerate(teams.values(), 1):
+            self.definitions.append(np.busdaycalendar(weekmask=team.get('weekmask', weekmask),
+                                                      holidays=list(team.get('holidays', holidays))))
+            for work in team.get('works', ()):
+                if work in self.assignment:
+                    raise ValueError(f"Работа '{work}' назначена нескольким бригадам")
+                self.assignment[work] = k
+        if not all(definition.weekmask.any() for definition in self.definitions):
+            raise ValueError("В календаре нет ни одного рабочего дня недели")
+        self._compile(horizon)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Загрузка определения календарей из JSON файла
+        """
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+        if 'start' not in data:
+            raise ValueError("В определении календаря не задана дата начала проекта ('start')")
+        return cls(data['start'], data.get('weekmask', DEFAULT_WEEKMASK), data.get('holidays', ()), data.get('teams'))
+
+    def _compile(self, horizon):
+        """
+        Массивы календарей на horizon календарных дней: working[k, d] —
+        рабочий ли день d, cumulative[k, d] — рабочих дней до дня d,
+        days[k, j] — календарный день j-го рабочего дня (дополнен horizon)
+        """
+        dates = self.start + np.arange(horizon)
+        self.horizon = horizon
+        self.working = np.stack([np.is_busday(dates, busdaycal=definition) for definition in self.definitions])
+        self.cumulative = np.zeros((len(self.definitions), horizon + 1), dtype=np.int64)
+        np.cumsum(self.working, axis=1, out=self.cumulative[:, 1:])
+        self.days = np.full((len(self.definitions), int(self.cumulative[:, -1].max())), horizon, dtype=np.int64)
+        for k, working in enumerate(self.working):
+            index = np.flatnonzero(working)
+            self.days[k, :index.size] = index
+
+    def _ensure(self, calendar_days=0, working_days=0):
+        """
+        Расширение горизонта до calendar_days дней и working_days рабочих
+        дней в каждом календаре
+        """
+        if self.horizon >= calendar_days and self.cumulative[:, -1].min() >= working_days:
+            return
+        horizon = self.horizon
+        while horizon < calendar_days or min(np.busday_count(self.start, self.start + horizon, busdaycal=definition)
+                                             for definition in self.definitions) < working_days:
+            horizon *= 2
+        self._compile(horizon)
+
+    def calendar_ids(self, works):
+        """
+        Номер календаря каждой работы (0 — календарь проекта)
+        """
+        return np.fromiter((self.assignment.get(work, 0) for work in works), dtype=np.int64, count=len(works))
+
+    def working_time(self, calendars, times):
+        """
+        Рабочие дни календарей calendars, прошедшие от начала проекта к
+        моментам times (календарных дней от начала)
+        """
+        times = np.maximum(np.asarray(times, dtype=np.float64), 0.0)
+        day = np.floor(times).astype(np.int64)
+        self._ensure(calendar_days=int(day.max(initial=0)) + 1)
+        return self.cumulative[calendars, day] + self.working[calendars, day] * (times - day)
+
+    def start_time(self, calendars, offsets):
+        """
+        Момент начала работы по ее рабочему дню offsets: начало рабочего
+        дня floor(offsets) плюс дробная часть
+        """
+        offsets = np.maximum(np.asarray(offsets, dtype=np.float64), 0.0)
+        index = np.floor(offsets).astype(np.int64)
+        self._ensure(working_days=int(index.max(initial=0)) + 1)
+        return self.days[calendars, index] + (offsets - index)
+
+    def finish_time(self, calendars, offsets):
+        """
+        Момент окончания работы по рабочему дню offsets: окончание
+        завершается в последнем занятом рабочем дне, а не в начале следующего
+        """
+        offsets = np.maximum(np.asarray(offsets, dtype=np.float64), 0.0)
+        index = np.maximum(np.ceil(offsets).astype(np.int64) - 1, 0)
+        self._ensure(working_days=int(index.max(initial=0)) + 1)
+        return self.days[calendars, index] + (offsets - index)
+
+    def to_dates(self, times, finish=False):
+        """
+        Даты (datetime64[D]) моментов times; для окончаний (finish=True) —
+        последний занятый день
+        """
+        times = np.asarray(times, dtype=np.float64)
+        days = np.ceil(times) - 1 if finish else np.floor(times)
+        return self.start + np.maximum(days, 0).astype(np.int64)
+
+    def to_working_days(self, dates, calendar=0):
+        """
+        Число рабочих дней календаря от начала проекта до дат dates
+        """
+        days = (np.asarray(dates, dtype='datetime64[D]') - self.start).astype(np.int64)
+        self._ensure(calendar_days=int(days.max(initial=0)) + 1)
+        return self.cumulative[calendar, np.clip(days, 0, self.horizon)]
+
+
+def _calendar_passes(graph, calendars, ids):
+    """
+    Прямой и обратный проходы по топологическим уровням в календарном
+    времени: продолжительность работы отсчитывается по ее календарю
+    """
+    pred_ptr, pred_idx = graph.pred_ptr, graph.pred_idx
+    succ_ptr, succ_idx = graph.succ_ptr, graph.succ_idx
+    durations = np.asarray(graph.durations, dtype=np.float64)
+    generations = cpm.topological_generations(graph)
+    n = len(durations)
+    early_start = np.zeros(n)
+    early_finish = np.zeros(n)
+    late_start = np.zeros(n)
+    late_finish = np.zeros(n)
+
+    for level in generations:
+        counts = pred_ptr[level + 1] - pred_ptr[level]
+        has_preds = counts > 0
+        ready = np.zeros(level.size)
+        if has_preds.any():
+            finishes = early_finish[cpm.gather(pred_ptr, pred_idx, level)]
+            ready[has_preds] = np.maximum.reduceat(finishes, (np.cumsum(counts) - counts)[has_preds])
+        worked = calendars.working_time(ids[level], ready)
+        early_start[level] = calendars.start_time(ids[level], worked)
+        early_finish[level] = calendars.finish_time(ids[level], worked + durations[level])
+
+    project_duration = float(early_finish.max()) if n else 0.0
+    for level in generations[::-1]:
+        counts = succ_ptr[level + 1] - succ_ptr[level]
+        has_succs = counts > 0
+        due = np.full(level.size, project_duration)
+        if has_succs.any():
+            starts = late_start[cpm.gather(succ_ptr, succ_idx, level)]
+            due[has_succs] = np.minimum(np.minimum.reduceat(starts, (np.cumsum(counts) - counts)[has_succs]),
+                                        project_duration)
+        worked = calendars.working_time(ids[level], due)
+        late_finish[level] = calendars.finish_time(ids[level], worked)
+        late_start[level] = calendars.start_time(ids[level], worked - durations[level])
+
+    order = np.concatenate(generations) if generations else np.empty(0, dtype=np.int64)
+    return order, early_start, early_finish, late_start, late_finish, project_duration
+
+
+def dated_schedule(graph, calendars, schedule=None):
+    """
+    Расписание в календарных днях от даты начала проекта. Если все работы
+    идут по календарю проекта, сроки расписания CPM в рабочих днях
+    (schedule) переводятся одной выборкой по индексу рабочих дней; с
+    календарями бригад проходы CPM выполняются в календарном времени.
+    """
+    ids = calendars.calendar_ids(graph.works)
+    if ids.any():
+        order, early_start, early_finish, late_start, late_finish, project_duration = \
+            _calendar_passes(graph, calendars, ids)
+    else:
+        if schedule is None:
+            schedule = cpm.compute_schedule(graph)
+        order = schedule.order
+        early_start = calendars.start_time(ids, schedule.early_start)
+        early_finish = calendars.finish_time(ids, schedule.early_finish)
+        late_start = calendars.start_time(ids, schedule.late_start)
+        late_finish = calendars.finish_time(ids, schedule.late_finish)
+        project_duration = float(early_finish.max()) if early_finish.size else 0.0
+
+    return DatedSchedule(
+        order=order,
+        early_start=early_start,
+        early_finish=early_finish,
+        late_start=late_start,
+        late_finish=late_finish,
+        total_slack=late_start - early_start,
+        project_duration=project_duration,
+        start=calendars.start,
+    )
+
+
+def _calendar_steps(starts, finishes, workforce, ids, calendars):
+    """
+    Точная загрузка по календарным дням: загрузка работ каждого календаря
+    умножается на признак рабочего дня этого календаря. Моменты изменения —
+    сроки работ и границы рабочих и нерабочих дней календарей.
+    """
+    calendar_ids = np.unique(ids).tolist()
+    steps = [workload.step_function(starts[ids == k], finishes[ids == k], workforce[ids == k]) for k in calendar_ids]
+    end = int(np.ceil(finishes.max()))
+    changes = [np.flatnonzero(np.diff(calendars.working[k, :end].astype(np.int8))) + 1 for k in calendar_ids]
+    breakpoints = np.unique(np.concatenate([times for times, _ in steps] + changes))
+    breakpoints = breakpoints[(breakpoints >= starts.min()) & (breakpoints <= finishes.max())]
+
+    begins = breakpoints[:-1]
+    days = np.floor(begins).astype(np.int64)
+    levels = np.zeros(begins.size)
+    for k, (times, raw) in zip(calendar_ids, steps):
+        position = np.searchsorted(times, begins, side='right') - 1
+        inside = (position >= 0) & (position < raw.size)
+        levels[inside] += raw[position[inside]] * calendars.working[k, days[inside]]
+
+    # Соседние отрезки с одинаковой загрузкой объединяются
+    keep = np.concatenate([[True], np.abs(np.diff(levels)) > workload.PEAK_EPS]) if levels.size else np.zeros(0, bool)
+    return np.append(breakpoints[:-1][keep], breakpoints[-1:]), levels[keep]
+
+
+def build_profile(graph, dated, workforce, calendars):
+    """
+    Профиль рабочей силы по календарным дням: работа загружает только
+    рабочие дни своего календаря. Средняя загрузка — на календарный день;
+    пик и интервалы пиковой загрузки — по точной загрузке с учетом
+    календарей.
+    """
+    workforce = np.asarray(workforce, dtype=np.float64)
+    profile = workload.build_profile(dated.early_start, dated.early_finish, workforce)
+    days = profile.daily.size
+    if not days:
+        return profile
+
+    ids = calendars.calendar_ids(graph.works)
+    calendars._ensure(calendar_days=days)
+    daily = np.zeros(days)
+    for k in np.unique(ids).tolist():
+        mask = ids == k
+        daily += workload.daily_load(dated.early_start[mask], dated.early_finish[mask], workforce[mask], days) \
+            * calendars.working[k, :days]
+    breakpoints, levels = _calendar_steps(dated.early_start, dated.early_finish, workforce, ids, calendars)
+    peak, intervals = workload.peak_summary(breakpoints, levels)
+    total_work = float(np.dot(workforce, graph.durations))
+    mean = total_work / dated.project_duration if dated.project_duration > 0 else 0.0
+    return profile._replace(daily=daily, mean=mean, peak=peak, peak_intervals=intervals,
+                            breakpoints=breakpoints, levels=levels)
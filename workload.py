@@ -0,0 +1,100 @@
+"""
+Профиль загрузки рабочей силы по времени.
+
+Гистограмма по дням строится разностным массивом (префиксные суммы) по
+индексам начала и окончания работ за O(работ + дней). Дробные сроки
+учитываются долей дня, которую работа занимает, а не отбрасываются int().
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# Погрешность сравнения загрузки с пиковой
+PEAK_EPS = 1e-9
+
+WorkforceProfile = namedtuple('WorkforceProfile', [
+    'daily',           # float64[days] средняя загрузка в каждом дне [d, d+1)
+    'peak',            # максимальная одновременная загрузка
+    'mean',            # средняя загрузка за длительность проекта
+    'peak_intervals',  # список интервалов (начало, конец) с пиковой загрузкой
+    'breakpoints',     # float64[k+1] моменты изменения загрузки
+    'levels',          # float64[k] загрузка на [breakpoints[i], breakpoints[i+1])
+])
+
+
+def daily_load(starts, finishes, workforce, days):
+    """
+    Средняя загрузка по дням через разностный массив.
+    Работа [s, f) вносит в день d вклад workforce * |[s, f) ∩ [d, d+1)|.
+    """
+    diff = np.zeros(days + 1)
+    load = np.zeros(days + 1)
+
+    first_day = np.floor(starts).astype(np.int64)
+    last_day = np.floor(finishes).astype(np.int64)
+    same_day = first_day == last_day
+
+    # Работа целиком внутри одного дня
+    np.add.at(load, first_day[same_day], workforce[same_day] * (finishes - starts)[same_day])
+
+    # Неполный первый день, полные дни между ними и неполный последний день
+    spans = ~same_day
+    np.add.at(load, first_day[spans], workforce[spans] * (first_day + 1 - starts)[spans])
+    np.add.at(diff, first_day[spans] + 1, workforce[spans])
+    np.add.at(diff, last_day[spans], -workforce[spans])
+    np.add.at(load, np.minimum(last_day[spans], days), workforce[spans] * (finishes - last_day)[spans])
+
+    return (load + np.cumsum(diff))[:days]
+
+
+def step_function(starts, finishes, workforce):
+    """
+    Точная кусочно-постоянная загрузка: моменты изменения и уровни между ними
+    """
+    times, inverse = np.unique(np.concatenate([starts, finishes]), return_inverse=True)
+    deltas = np.bincount(inverse, weights=np.concatenate([workforce, -workforce]), minlength=times.size)
+    return times, np.cumsum(deltas)[:-1]
+
+
+def peak_summary(breakpoints, levels):
+    """
+    Пиковая загрузка и интервалы пиковой загрузки кусочно-постоянного профиля
+    """
+    peak = float(max(levels.max(), 0.0)) if levels.size else 0.0
+    return peak, (_peak_intervals(breakpoints, levels, peak) if peak > 0 else [])
+
+
+def _peak_intervals(breakpoints, levels, peak):
+    """
+    Объединенные интервалы, на которых загрузка равна пиковой
+    """
+    at_peak = np.abs(levels - peak) < PEAK_EPS
+    # Границы серий подряд идущих пиковых отрезков
+    edges = np.diff(np.concatenate([[False], at_peak, [False]]).astype(np.int8))
+    begins = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return [(float(breakpoints[b]), float(breakpoints[e])) for b, e in zip(begins, ends)]
+
+
+def build_profile(starts, finishes, workforce):
+    """
+    Построение профиля рабочей силы по срокам работ (массивы одной длины)
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    finishes = np.asarray(finishes, dtype=np.float64)
+    workforce = np.asarray(workforce, dtype=np.float64)
+
+    if not starts.size:
+        return WorkforceProfile(np.zeros(0), 0.0, 0.0, [], np.zeros(0), np.zeros(0))
+
+    project_duration = float(finishes.max())
+    days = int(np.ceil(project_duration))
+    daily = daily_load(starts, finishes, workforce, days)
+
+    breakpoints, levels = step_function(starts, finishes, workforce)
+    peak, intervals = peak_summary(breakpoints, levels)
+
+    total_work = float(np.dot(workforce, finishes - starts))
+    mean = total_work / project_duration if project_duration > 0 else 0.0
+
+    return WorkforceProfile(daily, peak, mean, intervals, breakpoints, levels)